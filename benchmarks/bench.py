@@ -0,0 +1,245 @@
+"""
+Tally Counter benchmarks.
+
+Run the benchmark suite, writing JSON results:
+
+    python benchmarks/bench.py run --output results.json
+
+Compare two runs, exiting with a non-zero status if any benchmark regressed by more
+than the threshold (default 20%):
+
+    python benchmarks/bench.py compare baseline.json results.json --threshold 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import gc
+import importlib.metadata
+import json
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from tally_counter import Counter
+from tally_counter.series import _Series
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    # Benchmark result: value, unit, and whether a "higher" or "lower" value is better
+    Result = dict[str, Any]
+
+
+def _best_time(function: Callable[[], object], *, repeat: int) -> float:
+    """Return the best (least) time of `repeat` calls of a function, in seconds."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def _throughput(operations: int, seconds: float) -> Result:
+    return {"value": operations / seconds, "unit": "ops/s", "better": "higher"}
+
+
+def _latency(seconds: float) -> Result:
+    return {"value": seconds, "unit": "s", "better": "lower"}
+
+
+def bench_incr(*, n: int, repeat: int) -> dict[str, Result]:
+    """Measure `_Series.incr()` throughput, with and without `ttl` and `maxlen`."""
+    results = {}
+    for name, kwargs in {
+        "incr": {},
+        "incr[ttl]": {"ttl": 60000},
+        "incr[maxlen]": {"maxlen": 1000},
+        "incr[ttl,maxlen]": {"ttl": 60000, "maxlen": 1000},
+    }.items():
+
+        def run(kwargs: dict[str, int] = kwargs) -> None:
+            incr = _Series(**kwargs).incr
+            for _ in range(n):
+                incr()
+
+        results[name] = _throughput(n, _best_time(run, repeat=repeat))
+
+    return results
+
+
+def bench_queries(*, lengths: list[int], repeat: int) -> dict[str, Result]:
+    """Measure `mean()`, `min()`, `max()` and `sum` latency, against series length."""
+    results = {}
+    calls = 1000
+    for length in lengths:
+        series = _Series()
+        series.incr_many(range(length))
+
+        for name, query in {
+            "mean": series.mean,
+            "min": series.min,
+            "max": series.max,
+            "sum": lambda series=series: series.sum,
+        }.items():
+
+            def run(query: Callable[[], object] = query) -> None:
+                for _ in range(calls):
+                    query()
+
+            results[f"{name}[{length}]"] = _latency(_best_time(run, repeat=repeat) / calls)
+
+    return results
+
+
+def bench_lookup(*, n: int, repeat: int) -> dict[str, Result]:
+    """Measure the cost of looking up an existing series, by attribute and by key."""
+    counter = Counter("requests")
+
+    def by_attribute() -> None:
+        for _ in range(n):
+            counter.requests  # noqa: B018
+
+    def by_key() -> None:
+        for _ in range(n):
+            counter["requests"]
+
+    return {
+        "lookup[attribute]": _latency(_best_time(by_attribute, repeat=repeat) / n),
+        "lookup[key]": _latency(_best_time(by_key, repeat=repeat) / n),
+    }
+
+
+def bench_contention(*, n: int, threads: int, repeat: int) -> dict[str, Result]:
+    """Measure `incr()` throughput of many threads, on one shared series and on disjoint series."""
+
+    def run(keys: list[str]) -> None:
+        counter = Counter()
+
+        def increment(key: str) -> None:
+            series = counter[key]
+            for _ in range(n):
+                series.incr()
+
+        workers = [threading.Thread(target=increment, args=(key,)) for key in keys]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    shared = ["shared"] * threads
+    disjoint = [f"series_{i}" for i in range(threads)]
+    return {
+        f"contention[shared,{threads}]": _throughput(
+            n * threads, _best_time(lambda: run(shared), repeat=repeat)
+        ),
+        f"contention[disjoint,{threads}]": _throughput(
+            n * threads, _best_time(lambda: run(disjoint), repeat=repeat)
+        ),
+    }
+
+
+def bench_memory(*, n: int) -> dict[str, Result]:
+    """Measure the memory used per stored data point."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        series = _Series()
+        for _ in range(n):
+            series.incr()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    return {"memory[bytes/point]": {"value": (after - before) / n, "unit": "bytes", "better": "lower"}}
+
+
+def run(*, quick: bool) -> dict[str, Any]:
+    """Run all benchmarks, and return their results, with details of the environment."""
+    scale = 10 if quick else 1
+    repeat = 3 if quick else 5
+
+    results: dict[str, Result] = {}
+    results.update(bench_incr(n=100_000 // scale, repeat=repeat))
+    results.update(bench_queries(lengths=[1_000, 10_000, 100_000 // scale], repeat=repeat))
+    results.update(bench_lookup(n=100_000 // scale, repeat=repeat))
+    results.update(bench_contention(n=20_000 // scale, threads=4, repeat=repeat))
+    results.update(bench_memory(n=100_000 // scale))
+
+    return {
+        "environment": {
+            "tally_counter": importlib.metadata.version("tally_counter"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "date": dt.datetime.now(tz=dt.timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], *, threshold: float) -> list[str]:
+    """Return a line per benchmark of both runs, marking those that regressed by more than `threshold`."""
+    lines = [f"{'benchmark':<32} {'baseline':>14} {'current':>14} {'unit':<6} {'change':>8}"]
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+
+        change = (result["value"] - base["value"]) / base["value"]
+        worse = -change if result["better"] == "higher" else change
+        flag = "REGRESSION" if worse > threshold else ""
+        values = f"{base['value']:>14.6g} {result['value']:>14.6g} {result['unit']:<6}"
+        lines.append(f"{name:<32} {values} {change:>+8.1%} {flag}".rstrip())
+
+    return lines
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark command line interface."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmark suite")
+    run_parser.add_argument("--output", type=Path, help="write JSON results to this file")
+    run_parser.add_argument(
+        "--quick", action="store_true", help="run smaller benchmarks, e.g. as a smoke test"
+    )
+
+    compare_parser = commands.add_parser("compare", help="compare two benchmark runs")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.2, help="regression threshold (0.2 = 20%%)"
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        text = json.dumps(run(quick=args.quick), indent=2)
+        if args.output:
+            args.output.write_text(text + "\n")
+        else:
+            sys.stdout.write(text + "\n")
+        return 0
+
+    lines = compare(
+        json.loads(args.baseline.read_text()), json.loads(args.current.read_text()), threshold=args.threshold
+    )
+    sys.stdout.write("\n".join(lines) + "\n")
+    return 1 if any(line.endswith("REGRESSION") for line in lines) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,3 +10,11 @@ PYTHON_VERSIONS = ["3.8", "3.9", "3.10", "3.11", "3.12"]
 def ci(session):
     """Run all CI checks."""
     session.run("make", "ci", external=True)
+
+
+@nox.session
+def bench(session):
+    """Run the benchmark suite, writing JSON results to `bench.json`, or to the given file."""
+    session.install(".")
+    output = session.posargs[0] if session.posargs else "bench.json"
+    session.run("python", "benchmarks/bench.py", "run", "--output", output)
@@ -2,8 +2,12 @@
 
 import importlib.metadata
 
+from .async_counter import AsyncCounter
 from .counter import Counter
+from .histogram import HistogramSeries
+from .limiter import RateLimiter
+from .shared import SharedCounter
 
-__all__ = ["Counter"]
+__all__ = ["AsyncCounter", "Counter", "HistogramSeries", "RateLimiter", "SharedCounter"]
 
 __version__ = importlib.metadata.version("tally_counter")
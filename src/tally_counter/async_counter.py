@@ -0,0 +1,137 @@
+"""The `AsyncCounter` model."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+
+from typing import TYPE_CHECKING, Any, cast
+
+from .counter import Counter
+from .series import _Series
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from contextlib import AbstractContextManager
+
+
+class _AsyncSeries(_Series):
+    """
+    A data series for use from a single asyncio event loop.
+
+    Increments and O(1) queries run synchronously, without locking. Queries that must
+    sort or copy the whole series take a snapshot of the series columns, and then do
+    that work in the event loop's default executor, so as not to block the loop.
+    """
+
+    def __init__(
+        self,
+        initial_value: int | None = None,
+        /,
+        *,
+        lock: AbstractContextManager[Any] | None = None,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        if lock is None:
+            lock = contextlib.nullcontext()  # Never contended, within one event loop
+
+        super().__init__(initial_value, lock=lock, **kwargs)
+
+    async def sum_async(self) -> int:
+        """Return the sum of this data series."""
+        return self.sum
+
+    async def len_async(self) -> int:
+        """Return the length (number of data points) of this data series."""
+        return self.len()
+
+    async def mean_async(self, percentile: int = 0) -> float:
+        """Return the mean float value for this data series."""
+        if not percentile:
+            return self.mean()
+
+        values = await self._percentile_async(percentile)
+        return sum(values) / len(values)
+
+    async def min_async(self) -> int:
+        """Return the minimum value for this data series."""
+        return self.min()
+
+    async def max_async(self, percentile: int = 0) -> int:
+        """Return the maximum value for this data series."""
+        if not percentile:
+            return self.max()
+
+        return max(await self._percentile_async(percentile))
+
+    async def quantile_async(self, q: float) -> float:
+        """Return the `q` quantile (from 0 to 1) of the values in this data series."""
+        return (await self.quantiles_async([q]))[0]
+
+    async def quantiles_async(self, qs: Iterable[float]) -> list[float]:
+        """Return the quantiles (each from 0 to 1) of the values in this data series."""
+        if self.accuracy is not None:
+            return self.quantiles(qs)  # From a sketch, so cheap
+
+        values, _ = self._snapshot()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._exact_quantiles, values, list(qs))
+
+    async def data_async(self) -> list[tuple[int, int]]:
+        """Return all series data."""
+        values, timestamps = self._snapshot()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: list(zip(values, timestamps)))
+
+    async def _percentile_async(self, percentile: int) -> list[int]:
+        values, _ = self._snapshot()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self._get_percentile, values, percentile))
+
+
+class AsyncCounter(Counter):
+    """
+    A container for any number of named data series, for use from an asyncio event loop.
+
+    Data series are accessed by attribute or key, as for a `Counter`. Series are not
+    locked, so an `AsyncCounter` must only be used from a single event loop thread.
+
+    For the same reason, an `AsyncCounter` with a `reap_interval` does not start a reaper
+    thread. Run its `run_reaper()` coroutine as a task of the event loop instead: until
+    it runs, data that has passed the TTL is not freed (though reads skip it). Call
+    `stop_reaper()` to expire data as it is added instead, as without a `reap_interval`.
+    """
+
+    _series_class = _AsyncSeries
+
+    def _start_reaper(self) -> None:
+        """Do not start a reaper thread; see `run_reaper()`."""
+
+    async def run_reaper(self) -> None:
+        """Reap this counter every `reap_interval` milliseconds, until the task is cancelled."""
+        if not self.reap_interval:
+            message = "run_reaper() requires a counter with a 'reap_interval'"
+            raise ValueError(message)
+
+        while True:
+            await asyncio.sleep(self.reap_interval / 1000)
+            self.reap()
+
+    def __getattr__(self, name: str) -> _AsyncSeries:
+        """
+        Return a data series for the given attribute name.
+
+        If no data series exists for the given name, then create an empty series and
+        return that.
+        """
+        return cast("_AsyncSeries", super().__getattr__(name))
+
+    def __getitem__(self, key: str) -> _AsyncSeries:
+        """
+        Return a data series for the given key value.
+
+        If no data series exists for the given key, then create an empty series and
+        return that.
+        """
+        return cast("_AsyncSeries", super().__getitem__(key))
@@ -2,40 +2,122 @@
 
 from __future__ import annotations
 
+import functools
+import logging
 import threading
+import time
+import weakref
 
-from typing import Any
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import ExitStack
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
 
-from .series import _Series
+from .delta import _DELTA_VERSION, _Delta
+from .histogram import HistogramSeries
+from .limiter import RateLimiter
+from .series import _SUMMARY_STATS, _Series, _summary_stats
+from .snapshot import _read_snapshot, _read_wal, _rotated_logs, _write_snapshot, _WriteAheadLog
+from .stats import _instrumented
+
+if TYPE_CHECKING:
+    import os
+
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+
+    import numpy as np
+
+_logger = logging.getLogger(__name__)
 
 
 class Counter:
-    """A container for any number of named data series."""
+    """
+    A container for any number of named data series.
+
+    Each data series has its own lock, so that threads working on different series do
+    not contend with each other. The counter lock only guards the creation of series,
+    unless series may be evicted (see `max_series` and `idle_ttl`), when it also guards
+    their order of use.
+    """
 
-    def __init__(self, *args: str, **kwargs: int) -> None:
-        # Thread safety lock
+    _series_class: type[_Series] = _Series
+
+    def __init__(
+        self, *args: str, on_evict: Callable[[str, _Series], object] | None = None, **kwargs: float
+    ) -> None:
+        # Thread safety lock, for the series dictionary
         self._lock = threading.RLock()
 
-        ttl = self._get_int_or_none(kwargs, "ttl")
-        maxlen = self._get_int_or_none(kwargs, "maxlen")
+        with self._lock:
+            self.__ttl = self._get_int_or_none(kwargs, "ttl")
+            self.__maxlen = self._get_int_or_none(kwargs, "maxlen")
+            self.__accuracy = self._get_float_or_none(kwargs, "accuracy")
+            self.__resolution = self._get_int_or_none(kwargs, "resolution")
+            self.__buffer_size = self._get_int_or_none(kwargs, "buffer_size")
+            self.__reap_interval = self._get_int_or_none(kwargs, "reap_interval")
+            if self.__reap_interval is not None and self.__reap_interval <= 0:
+                message = f"Reap interval must be positive, not {self.__reap_interval}."
+                raise ValueError(message)
+            self.__reaped = self.__reap_interval is not None
+            instrument = self._get_int_or_none(kwargs, "instrument")
+            self.__series_class = _instrumented(self._series_class) if instrument else self._series_class
+            self.__series_created: int | None = 0 if instrument else None
+            self.__wal: _WriteAheadLog | None = None
+            self.__limiters: dict[str, RateLimiter] = {}
+            self.__histograms: dict[str, HistogramSeries] = {}
+            self.__deltas = False
 
-        init_data: dict[str, _Series] = {}
-        for k in args:
-            init_data[str(k)] = _Series(None, ttl=ttl, maxlen=maxlen, lock=self._lock)
+            self.__max_series = self._get_int_or_none(kwargs, "max_series") or None
+            self.__idle_ttl = self._get_int_or_none(kwargs, "idle_ttl")
+            self.__evicting = self.__max_series is not None or self.__idle_ttl is not None
+            self.__on_evict = on_evict
+            self.__series_evicted = 0
+            # Labelled children, by series and in total, counted against max_series
+            self.__child_counts: dict[str, int] = {}
+            self.__series_children = 0
+            self.__last_used: dict[str, int] = {}
 
-        for k, v in kwargs.items():
-            init_data[str(k)] = _Series(int(v), ttl=ttl, maxlen=maxlen, lock=self._lock)
+            # Series are kept in least to most recently used order, if any may be evicted
+            init_data: dict[str, _Series] = OrderedDict() if self.__evicting else {}
+            for k in args:
+                init_data[str(k)] = self._new_series(str(k), None)
+
+            for k, v in kwargs.items():
+                init_data[str(k)] = self._new_series(str(k), int(v))
 
-        with self._lock:
             self.__data = init_data
-            self.__ttl = ttl
-            self.__maxlen = maxlen
+            now = time.monotonic_ns() if self.__idle_ttl is not None else None
+            if now is not None:
+                self.__last_used = dict.fromkeys(init_data, now)
+
+            evicted = self._evict(now) if self.__evicting else []
+
+            self._reaper: threading.Thread | None = None
+            self.__reaper_stop = threading.Event()
+            if self.__reap_interval:
+                self._start_reaper()
+
+        self._notify_evicted(evicted)
 
     @property
     def data(self) -> dict[str, list[tuple[int, int]]]:
         """Return all data for this counter."""
-        with self._lock:
-            return {k: v.data for k, v in self.__data.items()}
+        return {k: v.data for k, v in self._items()}
+
+    def iter_data(
+        self, since_ns: int | None = None, chunk_size: int = 1024
+    ) -> Iterator[tuple[str, int, int]]:
+        """
+        Yield the `(key, value, timestamp)` data points of all series of this counter.
+
+        Series are yielded one after another, each through its `iter_points()`, so that
+        only a chunk of data points is held in memory, and each series lock is taken
+        once per chunk. The counter lock is only taken to list the series.
+        """
+        for key, series in self._items():
+            for value, timestamp in series.iter_points(since_ns, chunk_size):
+                yield key, value, timestamp
 
     @property
     def ttl(self) -> int | None:
@@ -43,6 +125,389 @@ class Counter:
         with self._lock:
             return self.__ttl
 
+    @property
+    def reap_interval(self) -> int | None:
+        """Return the interval at which series are reaped, in milliseconds, if any."""
+        return self.__reap_interval
+
+    @property
+    def max_series(self) -> int | None:
+        """Return the maximum number of series, beyond which the least recently used are evicted."""
+        return self.__max_series
+
+    @property
+    def idle_ttl(self) -> int | None:
+        """Return the time after which an unused series is evicted, in milliseconds, if any."""
+        return self.__idle_ttl
+
+    def reap(self) -> int:
+        """
+        Expire all data points that have passed the TTL (or exceed the maxlen) of each series.
+
+        This is called by the reaper of a counter with a `reap_interval`, but may also be
+        called directly. Labelled child series are reaped too, and series that have not
+        been used for `idle_ttl` are evicted. Rate limiters with no requests left in their
+        window are dropped, as they would behave as new limiters. Return the number of
+        rows expired.
+        """
+        if self.__limiters:
+            now = time.monotonic_ns()
+            with self._lock:
+                self.__limiters = {k: v for k, v in self.__limiters.items() if not v._idle(now)}  # noqa: SLF001
+
+        if self.__idle_ttl is not None:
+            with self._lock:
+                evicted = self._evict(time.monotonic_ns())
+            self._notify_evicted(evicted)
+
+        expired = 0
+        for _, series in self._items():
+            expired += series._prune()  # noqa: SLF001
+            expired += sum(child._prune() for _, child in series._children())  # noqa: SLF001
+
+        return expired
+
+    def _start_reaper(self) -> None:
+        """Start a daemon thread, that reaps this counter every `reap_interval` milliseconds."""
+        self._reaper = threading.Thread(
+            target=_reap_forever,
+            args=(weakref.ref(self), self.__reaper_stop, self.__reap_interval),
+            name="tally-counter-reaper",
+            daemon=True,
+        )
+        self._reaper.start()
+
+    def stop_reaper(self) -> None:
+        """
+        Stop the reaper of this counter, if it has one.
+
+        Its series then expire data by TTL as data is added or read again, as without a
+        `reap_interval`, so that expired data is still freed.
+        """
+        self.__reaper_stop.set()
+        with self._lock:
+            self.__reaped = False
+
+        for _, series in self._items():
+            series._stop_reaping()  # noqa: SLF001
+
+    def update(self, data: Mapping[str, int] | Iterable[tuple[str, int, int | None]]) -> None:
+        """
+        Increment many data series at once.
+
+        `data` may be a mapping of series keys to increment values, or an iterable of
+        `(key, value, timestamp)` tuples. Increments are grouped by series, so that each
+        series lock is taken once. Values without a timestamp are stamped with the time
+        of this call.
+        """
+        now = time.monotonic_ns()
+        items = ((k, v, now) for k, v in data.items()) if isinstance(data, Mapping) else data
+
+        batches: dict[str, tuple[list[int], list[int]]] = {}
+        for key, value, timestamp in items:
+            values, timestamps = batches.setdefault(key, ([], []))
+            values.append(value)
+            timestamps.append(now if timestamp is None else timestamp)
+
+        for key, (values, timestamps) in batches.items():
+            self._get_or_create_series(key=key).incr_many(values, timestamps)
+
+    def limit(self, key: str, limit: int, window_ms: int) -> RateLimiter:
+        """
+        Return the rate limiter for the given key, allowing `limit` requests per `window_ms`.
+
+        Rate limiters are held apart from data series, one per key, and each is created
+        on first use. A limiter holds constant memory, however many requests it sees,
+        and is dropped by `reap()` once it has no requests left in its window.
+        """
+        limiter = self.__limiters.get(key)
+        if limiter is None:
+            with self._lock:
+                limiter = self.__limiters.setdefault(key, RateLimiter(limit, window_ms))
+
+        if (limiter.limit, limiter.window) != (int(limit), int(window_ms)):
+            message = (
+                f"Rate limiter '{key}' exists, with a limit of {limiter.limit} per {limiter.window} ms."
+            )
+            raise ValueError(message)
+
+        return limiter
+
+    def histogram(
+        self, key: str, *, significant_figures: int = 2, buckets: Sequence[int] | None = None
+    ) -> HistogramSeries:
+        """
+        Return the histogram series for the given key, with this counter's `ttl`.
+
+        Histograms are held apart from data series, one per key, and each is created on
+        first use, with log-linear buckets of the given `significant_figures`, or with the
+        given `buckets` upper bounds. See `HistogramSeries`.
+        """
+        histogram = self.__histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.__histograms.setdefault(
+                    key,
+                    HistogramSeries(
+                        significant_figures=significant_figures, buckets=buckets, ttl=self.__ttl
+                    ),
+                )
+
+        bounds = None if buckets is None else tuple(int(bound) for bound in buckets)
+        if (histogram.significant_figures, histogram.bounds) != (significant_figures, bounds):
+            message = f"Histogram '{key}' exists, with other buckets."
+            raise ValueError(message)
+
+        return histogram
+
+    def _histograms(self) -> list[tuple[str, HistogramSeries]]:
+        """Return a snapshot of the keys and histogram series of this counter."""
+        with self._lock:
+            return list(self.__histograms.items())
+
+    def summary(
+        self, keys: Iterable[str] | None = None, stats: Sequence[str] = _SUMMARY_STATS
+    ) -> dict[str, tuple[float | None, ...]]:
+        """
+        Return the given statistics of many data series, in one pass.
+
+        Returns a mapping of each series key to a tuple of its statistics, in the order
+        of `stats`: any of "sum", "len", "mean", "min" and "max". These come from the
+        running aggregates of each series, which is locked and pruned once. The `mean`,
+        `min` and `max` of an empty series are `None`.
+
+        If no `keys` are given, then all series are summarised. Keys of series that do
+        not exist are left out, rather than creating those series.
+        """
+        stats = _summary_stats(stats)
+
+        with self._lock:
+            if keys is None:
+                items = list(self.__data.items())
+            else:
+                items = [(key, self.__data[key]) for key in keys if key in self.__data]
+
+        return {key: series._summary(stats) for key, series in items}  # noqa: SLF001
+
+    def to_numpy(
+        self,
+    ) -> dict[str, tuple[np.ndarray[Any, np.dtype[np.int64]], np.ndarray[Any, np.dtype[np.int64]]]]:
+        """Return the values and timestamps of each data series, as NumPy int64 arrays."""
+        return {k: v.to_numpy() for k, v in self._items()}
+
+    def stats(self) -> Counter:
+        """
+        Return statistics of this counter, as a new counter of single value series.
+
+        For each data series, and in total, these are the number of live data points
+        (`points`), of allocated data points (`points_allocated`, which includes expired
+        points not yet compacted), and an estimate of memory used (`bytes`). Per-series
+        statistics are named `<key>.<statistic>`.
+
+        If the counter was created with `instrument=True`, then its series record their
+        lock waits and prunes, and the totals of those are also given: the number of
+        series auto-created on access (`series_created`), lock acquisitions that had to
+        wait (`lock_waits`) and the time spent waiting (`lock_wait_ns`), and the number of
+        prunes (`prunes`), time spent pruning (`prune_ns`) and rows expired
+        (`points_expired`). Otherwise, recording these costs nothing.
+
+        If the counter was created with a `max_series` or `idle_ttl`, then the number of
+        series evicted (`series_evicted`) is also given.
+        """
+        totals = dict.fromkeys(("points", "points_allocated", "bytes"), 0)
+        if self.__evicting:
+            totals.update(series_evicted=self.__series_evicted)
+        if self.__series_created is not None:
+            totals.update(series_created=self.__series_created)
+            totals.update(
+                dict.fromkeys(("lock_waits", "lock_wait_ns", "prunes", "prune_ns", "points_expired"), 0)
+            )
+
+        stats = Counter()
+        for key, series in self._items():
+            with series._lock:  # noqa: SLF001
+                footprint = dict(zip(("points", "points_allocated", "bytes"), series._footprint()))  # noqa: SLF001
+                series_stats = getattr(series, "_series_stats", None)
+                if series_stats is not None:
+                    footprint.update(
+                        lock_waits=series_stats.lock_waits,
+                        lock_wait_ns=series_stats.lock_wait_ns,
+                        prunes=series_stats.prunes,
+                        prune_ns=series_stats.prune_ns,
+                        points_expired=series_stats.expired,
+                    )
+
+            for name, value in footprint.items():
+                stats[f"{key}.{name}"].incr(value)
+                totals[name] += value
+
+        for name, value in totals.items():
+            stats[name].incr(value)
+
+        return stats
+
+    def snapshot(self, path: str | os.PathLike[str]) -> None:
+        """
+        Write all data for this counter to a binary snapshot file at `path`.
+
+        Each series, and each labelled child (under its series key and label values, which
+        must be JSON serializable), is written as packed int64 value and timestamp columns.
+        Series are copied with all their locks held, so the snapshot is consistent across
+        series, and any write-ahead log is then rotated, as its records are in the snapshot.
+        The file is written after the locks are released, and the rotated log is only
+        deleted once the file has replaced any previous snapshot.
+        """
+        with ExitStack() as stack:
+            stack.enter_context(self._lock)
+            items = list(self.__data.items())
+            for _, series in items:
+                stack.enter_context(series._lock)  # noqa: SLF001
+
+            children = [(k, *child) for k, v in items for child in v._children()]  # noqa: SLF001
+            for *_, child in children:
+                stack.enter_context(child._lock)  # noqa: SLF001
+
+            rows = {k: v._rows() for k, v in items}  # noqa: SLF001
+            child_rows = {(k, labels): child._rows() for k, labels, child in children}  # noqa: SLF001
+            wal = self.__wal
+            log_id = 0 if wal is None else wal.rotate()
+
+        _write_snapshot(
+            path,
+            ttl=self.__ttl,
+            maxlen=self.__maxlen,
+            resolution=self.__resolution,
+            accuracy=self.__accuracy,
+            log_id=log_id,
+            rows=rows,
+            children=child_rows,
+        )
+        if wal is not None:
+            wal.discard(log_id)
+
+    @classmethod
+    def restore(cls, path: str | os.PathLike[str], wal: str | os.PathLike[str] | None = None) -> Counter:
+        """
+        Return a new counter, with the options and data of a snapshot file at `path`.
+
+        The snapshot file is memory-mapped, and each series column is copied directly
+        from it, along with the running aggregates of the series. If a write-ahead log
+        path is given, then its records are replayed on top of the snapshot, to recover
+        data added after the snapshot was written. Those of any rotated logs not covered
+        by the snapshot (e.g. as writing a later snapshot failed) are replayed first.
+        """
+        snapshot = _read_snapshot(path)
+        options = {
+            "ttl": snapshot.ttl,
+            "maxlen": snapshot.maxlen,
+            "resolution": snapshot.resolution,
+            "accuracy": snapshot.accuracy,
+        }
+        counter = cls(on_evict=None, **{k: v for k, v in options.items() if v is not None})
+
+        for key, rows in snapshot.rows.items():
+            counter._get_or_create_series(key=key)._load(rows)  # noqa: SLF001
+        for (key, labels), rows in snapshot.children.items():
+            counter._get_or_create_series(key=key).labels(**dict(labels))._load(rows)  # noqa: SLF001
+
+        if wal is not None:
+            logs = [rotated for log_id, rotated in _rotated_logs(wal) if log_id > snapshot.log_id]
+            for log in [*logs, Path(wal)]:
+                for key, labels, values, timestamps in _read_wal(log):
+                    series = counter._get_or_create_series(key=key)  # noqa: SLF001
+                    (series.labels(**dict(labels)) if labels else series).incr_many(values, timestamps)
+
+        return counter
+
+    def delta(self) -> dict[str, Any]:
+        """
+        Return a summary of the data added to this counter since the last call, to be merged elsewhere.
+
+        For each series with data added, this is its count, sum, minimum and maximum
+        value, and (if the counter has an `accuracy`) the state of a quantile sketch of
+        the values added. The first call gives a summary of all live data. The summary is
+        a JSON serializable dictionary (given JSON serializable label values), whose size
+        does not depend on the number of values added; pass it to the `merge()` method of
+        another counter. The deltas of labelled children are given with their label
+        values, under the `children` of their series.
+        """
+        with self._lock:
+            self.__deltas = True
+            items = list(self.__data.items())
+
+        series = {}
+        for key, value in items:
+            data = value._take_delta().to_dict()  # noqa: SLF001
+            children = []
+            for labels, child in value._children():  # noqa: SLF001
+                delta = child._take_delta()  # noqa: SLF001
+                if delta.count:
+                    children.append([[list(label) for label in labels], delta.to_dict()])
+
+            if children:
+                data["children"] = children
+            if data["count"] or children:
+                series[key] = data
+
+        return {"version": _DELTA_VERSION, "series": series}
+
+    def merge(self, delta: Mapping[str, Any]) -> None:
+        """
+        Add a summary of data, from the `delta()` method of another counter, to this counter.
+
+        The data of each series is added to its current time bucket, as a single row, so
+        this counter must have a `resolution`. With an `accuracy`, quantile sketches are
+        merged; values from a counter without one are added to the sketch at their mean.
+
+        The deltas of labelled children are merged into the children of the same labels.
+        The whole delta is checked, and all series found or created, before any series
+        is changed, so a delta that cannot be merged is not partly merged.
+        """
+        if delta.get("version") != _DELTA_VERSION:
+            message = (
+                f"Unsupported counter delta version {delta.get('version')!r}; expected {_DELTA_VERSION}."
+            )
+            raise ValueError(message)
+
+        if self.__resolution is None:
+            message = "merge() requires a counter with a 'resolution'"
+            raise ValueError(message)
+
+        deltas: list[tuple[str, list[list[Any]], _Delta]] = []
+        for key, data in delta["series"].items():
+            deltas.append((key, [], _Delta.from_dict(data)))
+            deltas.extend(
+                (key, labels, _Delta.from_dict(child)) for labels, child in data.get("children", ())
+            )
+
+        for _, _, series_delta in deltas:
+            series_delta.check_accuracy(self.__accuracy)
+
+        merges = []
+        for key, labels, series_delta in deltas:
+            series = self._get_or_create_series(key=key)
+            merges.append((series.labels(**dict(labels)) if labels else series, series_delta))
+
+        now = time.monotonic_ns()
+        for series, series_delta in merges:
+            series._merge_delta(series_delta, now)  # noqa: SLF001
+
+    def open_wal(self, path: str | os.PathLike[str]) -> None:
+        """
+        Append all data added to this counter, and to labelled children, to a write-ahead log file at `path`.
+
+        Pass the log to `restore()`, with the last snapshot, to recover from a crash.
+        """
+        with self._lock:
+            if self.__wal is not None:
+                self.__wal.close()
+
+            self.__wal = _WriteAheadLog(path)
+            for key, series in self.__data.items():
+                series._log = functools.partial(self.__wal.write, key)  # noqa: SLF001
+                for labels, child in series._children():  # noqa: SLF001
+                    child._log = functools.partial(self.__wal.write, key, labels=labels)  # noqa: SLF001
+
     def __getattr__(self, name: str) -> _Series:
         """
         Return a data series for the given attribute name.
@@ -71,9 +536,171 @@ class Counter:
             message = f"'int' expected for argument '{key}'"
             raise TypeError(message) from e
 
+    @staticmethod
+    def _get_float_or_none(container: dict[str, Any], key: str) -> float | None:
+        try:
+            return float(container.pop(key))
+        except KeyError:
+            return None
+        except ValueError as e:
+            message = f"'float' expected for argument '{key}'"
+            raise TypeError(message) from e
+
+    def _new_series(self, key: str, initial_value: int | None) -> _Series:
+        """Return a new data series, with this counter's series options (and log)."""
+        series = self.__series_class(
+            initial_value,
+            ttl=self.__ttl,
+            maxlen=self.__maxlen,
+            accuracy=self.__accuracy,
+            resolution=self.__resolution,
+            buffer_size=self.__buffer_size,
+            reaped=self.__reaped,
+            max_children=None if self.__max_series is None else self.__max_series - 1,
+        )
+        if self.__max_series is not None:
+            series._on_child = functools.partial(self._child_created, key, series)  # noqa: SLF001
+        if self.__wal is not None:
+            series._log = functools.partial(self.__wal.write, key)  # noqa: SLF001
+        if self.__deltas:
+            series._delta = _Delta(self.__accuracy)  # noqa: SLF001
+
+        return series
+
+    def _items(self) -> list[tuple[str, _Series]]:
+        """Return a snapshot of the keys and data series of this counter."""
+        with self._lock:
+            return list(self.__data.items())
+
     def _get_or_create_series(self, key: str) -> _Series:
+        if self.__evicting:
+            return self._use_series(key)
+
+        # Lock-free fast path, for series that already exist
+        series = self.__data.get(key)
+        if series is not None:
+            return series
+
+        with self._lock:
+            if self.__series_created is not None and key not in self.__data:
+                self.__series_created += 1
+
+            # Another thread may have created the series, since the fast path
+            return self.__data.setdefault(key, self._new_series(key, None))
+
+    def _use_series(self, key: str) -> _Series:
+        """
+        Return the data series for a key, creating it if need be, and mark it as most recently used.
+
+        Any series beyond `max_series`, or unused for `idle_ttl`, are then evicted. Each
+        access takes the counter lock, as the order of use must be updated.
+        """
+        with self._lock:
+            data = cast("OrderedDict[str, _Series]", self.__data)
+            series = data.get(key)
+            if series is None:
+                if self.__series_created is not None:
+                    self.__series_created += 1
+                series = data[key] = self._new_series(key, None)
+            else:
+                data.move_to_end(key)
+
+            now = None
+            if self.__idle_ttl is not None:
+                now = self.__last_used[key] = time.monotonic_ns()
+
+            evicted = self._evict(now)
+
+        self._notify_evicted(evicted)
+        return series
+
+    def _evict(self, now: int | None) -> list[tuple[str, _Series]]:
+        """
+        Remove and return the least recently used series beyond `max_series`, or unused for `idle_ttl`.
+
+        A series is unused if it has been neither looked up, nor written (e.g. through a
+        held reference), for `idle_ttl`. Called with the counter lock held. Each eviction
+        is O(1), from the least recently used end of the series dictionary.
+        """
+        data = cast("OrderedDict[str, _Series]", self.__data)
+        evicted = []
+
+        while self.__max_series is not None and len(data) + self.__series_children > self.__max_series:
+            evicted.append(data.popitem(last=False))
+            self.__series_children -= self.__child_counts.pop(evicted[-1][0], 0)
+
+        if self.__idle_ttl is not None and now is not None:
+            cutoff = now - self.__idle_ttl * 1_000_000
+            while data:
+                key, series = next(iter(data.items()))
+                if self.__last_used[key] >= cutoff:
+                    break
+                written = self._written(series)
+                if written is not None and written >= cutoff:
+                    # Written through a held reference since it was last looked up
+                    self.__last_used[key] = written
+                    data.move_to_end(key)
+                    continue
+                evicted.append((key, data.pop(key)))
+                self.__series_children -= self.__child_counts.pop(key, 0)
+
+        for key, _ in evicted:
+            self.__last_used.pop(key, None)
+        self.__series_evicted += len(evicted)
+
+        return evicted
+
+    @staticmethod
+    def _written(series: _Series) -> int | None:
+        """Return the latest time that a series, or any of its labelled children, was written, if any."""
+        written = [series._written()] + [child._written() for _, child in series._children()]  # noqa: SLF001
+        return max((t for t in written if t is not None), default=None)
+
+    def _child_created(self, key: str, series: _Series) -> None:
+        """
+        Count a new labelled child of a series against `max_series`, and mark the series as used.
+
+        The least recently used series are then evicted, along with their children,
+        until the series and children of this counter are within `max_series`.
+        """
         with self._lock:
-            if key not in self.__data:
-                self.__data[key] = _Series(None, ttl=self.__ttl, maxlen=self.__maxlen, lock=self._lock)
+            data = cast("OrderedDict[str, _Series]", self.__data)
+            if data.get(key) is not series:
+                return  # Evicted since the child was created
+
+            self.__child_counts[key] = self.__child_counts.get(key, 0) + 1
+            self.__series_children += 1
+            data.move_to_end(key)
+
+            now = None
+            if self.__idle_ttl is not None:
+                now = self.__last_used[key] = time.monotonic_ns()
+
+            evicted = self._evict(now)
+
+        self._notify_evicted(evicted)
 
-            return self.__data[key]
+    def _notify_evicted(self, evicted: list[tuple[str, _Series]]) -> None:
+        """Call the `on_evict` callback for each evicted series, without the counter lock held."""
+        if self.__on_evict is not None:
+            for key, series in evicted:
+                self.__on_evict(key, series)
+
+
+def _reap_forever(ref: weakref.ReferenceType[Counter], stop: threading.Event, interval: int) -> None:
+    """
+    Reap a counter every `interval` milliseconds, until stopped, or the counter is deleted.
+
+    An exception from a reap (e.g. from an `on_evict` callback) is logged, and reaping
+    continues, so that series still expire.
+    """
+    while not stop.wait(interval / 1000):
+        counter = ref()
+        if counter is None:
+            return
+
+        try:
+            counter.reap()
+        except Exception:
+            _logger.exception("Failed to reap counter")
+        del counter  # Do not hold the counter while waiting
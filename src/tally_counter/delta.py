@@ -0,0 +1,97 @@
+"""Mergeable deltas, of the data added to counter data series."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .sketch import _Sketch
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+_DELTA_VERSION = 1
+
+
+class _Delta:
+    """
+    The count, sum, extrema and (optional) quantile sketch of values added to a series.
+
+    A delta holds constant memory (or, with a sketch, memory bounded by its bins),
+    however many values it counts, and may be merged with other deltas.
+    """
+
+    __slots__ = ("count", "high", "low", "sketch", "sum")
+
+    def __init__(self, accuracy: float | None = None) -> None:
+        self.count = 0
+        self.sum = 0
+        self.low = 0
+        self.high = 0
+        self.sketch = None if accuracy is None else _Sketch(accuracy)
+
+    def add(self, value: int) -> None:
+        """Count a value."""
+        self.low = min(self.low, value) if self.count else value
+        self.high = max(self.high, value) if self.count else value
+        self.count += 1
+        self.sum += value
+        if self.sketch is not None:
+            self.sketch.add(value)
+
+    def add_many(self, values: Sequence[int]) -> None:
+        """Count many values."""
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: _Delta) -> None:
+        """Add the counts (and sketch) of another delta to this delta."""
+        if not other.count:
+            return
+
+        self.low = min(self.low, other.low) if self.count else other.low
+        self.high = max(self.high, other.high) if self.count else other.high
+        self.count += other.count
+        self.sum += other.sum
+        if self.sketch is not None:
+            other.merge_into(self.sketch)
+
+    def check_accuracy(self, accuracy: float | None) -> None:
+        """Raise a `ValueError` if this delta cannot be merged into sketches of an `accuracy`."""
+        if accuracy is not None and self.sketch is not None and self.sketch.relative_accuracy != accuracy:
+            message = "Cannot merge sketches of differing relative accuracy."
+            raise ValueError(message)
+
+    def merge_into(self, sketch: _Sketch) -> None:
+        """
+        Add the values counted by this (non-empty) delta to a quantile sketch.
+
+        Without a sketch of its own, the values of this delta are added at their mean
+        value, as their distribution is not known.
+        """
+        if self.sketch is not None:
+            sketch.merge(self.sketch)
+        else:
+            sketch.add(round(self.sum / self.count), count=self.count)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return this delta, as a JSON serializable dictionary."""
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.low,
+            "max": self.high,
+            "sketch": None if self.sketch is None else self.sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> _Delta:
+        """Return a delta, from a dictionary given by `to_dict()`."""
+        delta = cls()
+        delta.count = int(data["count"])
+        delta.sum = int(data["sum"])
+        delta.low = int(data["min"])
+        delta.high = int(data["max"])
+        if data.get("sketch") is not None:
+            delta.sketch = _Sketch.from_dict(data["sketch"])
+
+        return delta
@@ -0,0 +1,206 @@
+"""Exporters, of counter data series to monitoring systems."""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Sequence
+
+    from .counter import Counter
+    from .histogram import HistogramSeries
+    from .series import _Series
+
+_PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+_OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Label values escape backslashes, double quotes and line feeds
+_LABEL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+
+
+class PrometheusExporter:
+    """
+    Renders the data series of a counter in the Prometheus (or OpenMetrics) text format.
+
+    Each series is rendered as a summary, of its count, sum and quantiles, along with
+    gauges of its minimum and maximum values. These all come from the running
+    aggregates (or quantile sketch) of the series, not from its data points, so
+    quantiles are only rendered for a counter with an `accuracy`.
+
+    The count and sum of a series with a `ttl` or `maxlen` fall as data expires, which
+    Prometheus would take for a counter reset, so such a series is rendered as gauges
+    (of its quantiles, count and sum) instead of a summary.
+
+    The rendered text of each series is cached, along with the version of the series it
+    was rendered from, so that series that have not changed since the last render (or
+    scrape) are not rendered again.
+
+    The labelled children of a series are rendered as samples of the same metrics,
+    with their label values.
+
+    Histogram series of the counter are rendered as histograms, of their cumulative
+    bucket counts, sum and count.
+    """
+
+    def __init__(
+        self, counter: Counter, *, prefix: str = "tally", quantiles: Sequence[float] = (0.5, 0.9, 0.99)
+    ) -> None:
+        self.counter = counter
+        self.prefix = prefix
+        self.quantiles = tuple(quantiles)
+
+        self._lock = threading.Lock()
+        self.__cache: dict[str, tuple[_Series, tuple[int, ...], str]] = {}
+
+    def render(self, *, openmetrics: bool = False) -> str:
+        """Return the text exposition of all series of the counter."""
+        with self._lock:
+            cache = {}
+            for key, series in self.counter._items():  # noqa: SLF001
+                children = series._children()  # noqa: SLF001
+                for _, child in children:
+                    child.len()  # Prunes the child, which may change its version
+
+                with series._lock:  # noqa: SLF001
+                    series.len()  # Prunes the series, which may change its version
+                    version = (series._version, *(child._version for _, child in children))  # noqa: SLF001
+                    cached = self.__cache.get(key)
+                    if cached is None or cached[0] is not series or cached[1] != version:
+                        cached = (series, version, self._render_series(key, series, children))
+
+                cache[key] = cached
+
+            self.__cache = cache  # Forget series that are no longer in the counter
+
+        text = "".join(text for _, _, text in cache.values())
+        text += "".join(
+            self._render_histogram(key, histogram)
+            for key, histogram in self.counter._histograms()  # noqa: SLF001
+        )
+        return f"{text}# EOF\n" if openmetrics else text
+
+    def _render_series(
+        self, key: str, series: _Series, children: Sequence[tuple[tuple[tuple[str, Hashable], ...], _Series]]
+    ) -> str:
+        """Return the text exposition of a series, and its labelled children, with its lock held."""
+        name = self._metric_name(key)
+        windowed = series.ttl is not None or series.maxlen is not None
+
+        # The labels, count, sum, quantiles and extrema of the series, then of each child
+        samples = []
+        for labels, sample in [((), series), *children]:
+            count = sample.len()
+            values = sample.quantiles(self.quantiles) if count and sample.accuracy is not None else []
+            extrema = (sample.min(), sample.max()) if count else None
+            samples.append((labels, count, sample.sum, values, extrema))
+
+        lines = [f"# TYPE {name} {'gauge' if windowed else 'summary'}"]
+        for labels, count, total, values, _ in samples:
+            lines.extend(
+                f"{name}{self._labels(labels, quantile=q)} {value}"
+                for q, value in zip(self.quantiles, values)
+            )
+            if not windowed:
+                lines += [
+                    f"{name}_sum{self._labels(labels)} {total}",
+                    f"{name}_count{self._labels(labels)} {count}",
+                ]
+
+        if windowed:
+            lines.append(f"# TYPE {name}_sum gauge")
+            lines.extend(f"{name}_sum{self._labels(labels)} {total}" for labels, _, total, _, _ in samples)
+            lines.append(f"# TYPE {name}_count gauge")
+            lines.extend(f"{name}_count{self._labels(labels)} {count}" for labels, count, _, _, _ in samples)
+
+        for index, suffix in enumerate(("min", "max")):
+            gauges = [
+                (labels, extrema[index]) for labels, _, _, _, extrema in samples if extrema is not None
+            ]
+            if gauges:
+                lines.append(f"# TYPE {name}_{suffix} gauge")
+                lines.extend(f"{name}_{suffix}{self._labels(labels)} {value}" for labels, value in gauges)
+
+        return "\n".join(lines) + "\n"
+
+    def _render_histogram(self, key: str, histogram: HistogramSeries) -> str:
+        """Return the text exposition of a histogram series."""
+        name = self._metric_name(key)
+        lines = [f"# TYPE {name} histogram"]
+
+        count = 0
+        for upper, bucket_count in histogram.bucket_counts():
+            count += bucket_count
+            if upper != math.inf:
+                lines.append(f'{name}_bucket{{le="{upper}"}} {count}')
+
+        lines += [
+            f'{name}_bucket{{le="+Inf"}} {count}',
+            f"{name}_sum {histogram.sum}",
+            f"{name}_count {count}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _labels(labels: Sequence[tuple[str, Hashable]], quantile: float | None = None) -> str:
+        """Return the label set of a sample, e.g. `{method="GET",status="200"}`, or an empty string."""
+        pairs = [(re.sub(r"[^a-zA-Z0-9_]", "_", name), str(value)) for name, value in labels]
+        if quantile is not None:
+            pairs.append(("quantile", str(quantile)))
+
+        if not pairs:
+            return ""
+
+        return "{" + ",".join(f'{name}="{value.translate(_LABEL_ESCAPES)}"' for name, value in pairs) + "}"
+
+    def _metric_name(self, key: str) -> str:
+        """Return a valid metric name, for a series key."""
+        name = re.sub(r"[^a-zA-Z0-9_:]", "_", f"{self.prefix}_{key}" if self.prefix else key)
+        return f"_{name}" if name[0].isdigit() else name
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the text exposition of an exporter's counter, at any path."""
+
+    exporter: PrometheusExporter
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Respond with the text exposition, in OpenMetrics format if it is accepted."""
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body = self.exporter.render(openmetrics=openmetrics).encode()
+
+        self.send_response(200)
+        self.send_header(
+            "Content-Type", _OPENMETRICS_CONTENT_TYPE if openmetrics else _PROMETHEUS_CONTENT_TYPE
+        )
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        """Do not log each scrape."""
+
+
+def start_http_server(
+    counter: Counter, port: int, addr: str = "", *, prefix: str = "tally"
+) -> ThreadingHTTPServer:
+    """
+    Serve the text exposition of a counter over HTTP, from a daemon thread.
+
+    Returns the server; call its `shutdown()` method to stop it. Pass a `port` of `0`
+    to serve on any free port, which is then given by the server's `server_port`.
+    """
+    handler = type(
+        "MetricsHandler", (_MetricsHandler,), {"exporter": PrometheusExporter(counter, prefix=prefix)}
+    )
+    server = ThreadingHTTPServer((addr, port), handler)
+    server.daemon_threads = True
+
+    thread = threading.Thread(target=server.serve_forever, name="tally-counter-exporter", daemon=True)
+    thread.start()
+
+    return server
@@ -0,0 +1,328 @@
+"""The `HistogramSeries` model."""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+
+from collections import deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+
+class _Slice:
+    """The bucket counts, and running aggregates, of the values recorded in one time slice."""
+
+    __slots__ = ("count", "counts", "high", "low", "start", "sum")
+
+    def __init__(self, start: int) -> None:
+        self.start = start
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.sum = 0
+        self.low = 0
+        self.high = 0
+
+    def add(self, index: int, value: int, count: int = 1) -> None:
+        """Count `count` occurrences of a value, in the bucket of the given index."""
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.low = min(self.low, value) if self.count else value
+        self.high = max(self.high, value) if self.count else value
+        self.count += count
+        self.sum += value * count
+
+    def merge(self, other: _Slice) -> None:
+        """Add the counts and aggregates of another slice, of the same buckets, to this slice."""
+        if not other.count:
+            return
+
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.low = min(self.low, other.low) if self.count else other.low
+        self.high = max(self.high, other.high) if self.count else other.high
+        self.count += other.count
+        self.sum += other.sum
+
+
+class HistogramSeries:
+    """
+    A histogram of integer values (such as latencies), counted in buckets rather than stored.
+
+    By default, buckets are log-linear, as in an HDR histogram: values below a power of
+    two are counted exactly, and each power of two above that is split into buckets of
+    equal width, so that every bucket is within a relative width of
+    `10 ** -significant_figures`. Values must then not be negative. Otherwise, give the
+    (inclusive) upper bounds of the `buckets`, in increasing order; values above the
+    last bound are counted in a final, unbounded bucket.
+
+    Recording a value is a constant time bucket increment, and memory is bounded by the
+    number of buckets, however many values are recorded. Quantiles are estimated from
+    the bucket counts, and the exact minimum and maximum values are also kept.
+
+    With a `ttl` (in milliseconds), values are counted in rotating sub-histograms, each
+    covering `ttl / slices` of time. A sub-histogram is expired as a whole, once all of
+    its time has passed the TTL.
+    """
+
+    def __init__(
+        self,
+        *,
+        significant_figures: int = 2,
+        buckets: Sequence[int] | None = None,
+        ttl: int | None = None,
+        slices: int = 6,
+    ) -> None:
+        if not 1 <= significant_figures <= 5:  # noqa: PLR2004
+            message = f"Significant figures must be from 1 to 5, not {significant_figures}."
+            raise ValueError(message)
+
+        bounds = None if buckets is None else tuple(int(bound) for bound in buckets)
+        if bounds is not None and (not bounds or any(a >= b for a, b in zip(bounds, bounds[1:]))):
+            message = f"Histogram buckets must be strictly increasing, not {list(bounds)}."
+            raise ValueError(message)
+
+        self._lock = threading.RLock()
+        self.__significant_figures = significant_figures
+        self.__bounds = bounds
+
+        # Values below 2 ** bits are counted exactly, and each power of two above that
+        # in 2 ** (bits - 1) buckets, so that each bucket is within 2 ** (1 - bits) wide
+        self.__bits = (2 * 10**significant_figures - 1).bit_length()
+
+        self.__ttl = ttl * 1000000 if ttl else 0  # 1 ms = 1000000 ns
+        self.__width = math.ceil(self.__ttl / max(int(slices), 1)) if ttl else 0
+        self.__slices: deque[_Slice] = deque([] if ttl else [_Slice(0)])
+
+    @property
+    def significant_figures(self) -> int:
+        """Return the significant figures of the log-linear buckets of this histogram."""
+        return self.__significant_figures
+
+    @property
+    def bounds(self) -> tuple[int, ...] | None:
+        """Return the upper bounds of the buckets of this histogram, if given."""
+        return self.__bounds
+
+    @property
+    def ttl(self) -> int | None:
+        """Return the TTL of this histogram, in milliseconds, if any."""
+        return self.__ttl // 1000000 or None
+
+    def incr(self, value: int, /, *, timestamp: int | None = None) -> None:
+        """Record a value (such as an elapsed time) in this histogram."""
+        value = int(value)
+        index = self._index(value)
+        with self._lock:
+            if not self.__ttl:
+                self.__slices[0].add(index, value)
+                return
+
+            now = time.monotonic_ns()
+            slice_ = self._slice(now if timestamp is None else int(timestamp), now)
+            if slice_ is not None:
+                slice_.add(index, value)
+
+    def merge(self, other: HistogramSeries) -> None:
+        """
+        Add the live counts of another histogram, with the same buckets, to this histogram.
+
+        Sub-histograms are merged by their time slice, so merged counts expire as if they
+        had been recorded in this histogram.
+        """
+        if other._layout() != self._layout():  # noqa: SLF001
+            message = "Cannot merge histograms of differing buckets, or time slices."
+            raise ValueError(message)
+
+        with other._lock:  # noqa: SLF001
+            others = list(other._live())  # noqa: SLF001
+
+        with self._lock:
+            now = time.monotonic_ns()
+            for other_slice in others:
+                slice_ = self._slice(other_slice.start, now)
+                if slice_ is not None:
+                    slice_.merge(other_slice)
+
+    @property
+    def sum(self) -> int:
+        """Return the sum of the values in this histogram."""
+        with self._lock:
+            return self._total().sum
+
+    def len(self) -> int:
+        """Return the number of values in this histogram."""
+        with self._lock:
+            return self._total().count
+
+    def mean(self) -> float:
+        """Return the mean value of this histogram."""
+        with self._lock:
+            total = self._total()
+            return total.sum / total.count
+
+    def min(self) -> int:
+        """Return the minimum value of this histogram."""
+        with self._lock:
+            total = self._total()
+            if not total.count:
+                message = "min() arg is an empty sequence"
+                raise ValueError(message)
+
+            return total.low
+
+    def max(self) -> int:
+        """Return the maximum value of this histogram."""
+        with self._lock:
+            total = self._total()
+            if not total.count:
+                message = "max() arg is an empty sequence"
+                raise ValueError(message)
+
+            return total.high
+
+    def quantile(self, q: float) -> float:
+        """Return an estimate of the `q` quantile, where `q` is from 0 to 1."""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Iterable[float]) -> list[float]:
+        """
+        Return estimates of many quantiles, from one walk of the bucket counts.
+
+        Each estimate is the middle of the bucket of that quantile, bounded by the
+        minimum and maximum values.
+        """
+        qs = list(qs)
+        for q in qs:
+            if not 0 <= q <= 1:
+                message = f"Quantile must be from 0 to 1, not {q}."
+                raise ValueError(message)
+
+        with self._lock:
+            total = self._total()
+            counts, count, low, high = dict(total.counts), total.count, total.low, total.high
+
+        if not count:
+            message = "quantile() arg is an empty sequence"
+            raise ValueError(message)
+
+        indexes = sorted(counts)
+        results = []
+        for q in qs:
+            rank = q * (count - 1)
+            seen = 0
+            for index in indexes:  # pragma: no branch
+                seen += counts[index]
+                if seen > rank:
+                    break
+
+            lower, upper = self._range(index)
+            results.append((max(lower, low) + min(upper, high)) / 2)
+
+        return results
+
+    def bucket_counts(self) -> list[tuple[float, int]]:
+        """
+        Return the (inclusive) upper bound and count of each bucket, in order.
+
+        For log-linear buckets, only non-empty buckets are given. For given `buckets`,
+        every bucket is, with an infinite upper bound for the final bucket.
+        """
+        with self._lock:
+            counts = dict(self._total().counts)
+
+        indexes = sorted(counts) if self.__bounds is None else range(len(self.__bounds) + 1)
+        return [(self._range(index)[1], counts.get(index, 0)) for index in indexes]
+
+    def _layout(self) -> tuple[int, tuple[int, ...] | None, int]:
+        """Return the bucket and time slice layout of this histogram, which merges must share."""
+        return self.__bits, self.__bounds, self.__width
+
+    def _index(self, value: int) -> int:
+        """Return the index of the bucket for a value."""
+        if self.__bounds is not None:
+            return bisect.bisect_left(self.__bounds, value)
+
+        if value < 0:
+            message = f"Histogram values must not be negative, not {value}."
+            raise ValueError(message)
+
+        shift = value.bit_length() - self.__bits
+        if shift <= 0:
+            return value
+
+        # The top `bits` bits of the value, in the buckets of its power of two
+        return (shift << (self.__bits - 1)) + (value >> shift)
+
+    def _range(self, index: int) -> tuple[float, float]:
+        """Return the (inclusive) lower and upper bounds of the bucket of an index."""
+        if self.__bounds is not None:
+            lower = self.__bounds[index - 1] + 1 if index else -math.inf
+            upper = self.__bounds[index] if index < len(self.__bounds) else math.inf
+            return lower, upper
+
+        if index < 1 << self.__bits:
+            return index, index
+
+        shift = (index >> (self.__bits - 1)) - 1
+        top = index - (shift << (self.__bits - 1))
+        return top << shift, ((top + 1) << shift) - 1
+
+    def _slice(self, timestamp: int, now: int) -> _Slice | None:
+        """
+        Return the sub-histogram for a timestamp, with the lock held, after expiring any.
+
+        Return `None` for a timestamp that has already passed the TTL.
+        """
+        slices = self.__slices
+        if not self.__ttl:
+            return slices[0]
+
+        self._expire(now)
+        start = timestamp - timestamp % self.__width
+        if start + self.__width <= now - self.__ttl:
+            return None
+
+        # Most timestamps are in the latest slice, so search from the right
+        position = len(slices)
+        while position and slices[position - 1].start > start:
+            position -= 1
+
+        if position and slices[position - 1].start == start:
+            return slices[position - 1]
+
+        slice_ = _Slice(start)
+        slices.insert(position, slice_)
+        return slice_
+
+    def _expire(self, now: int) -> None:
+        """Expire the sub-histograms whose time has all passed the TTL, with the lock held."""
+        slices = self.__slices
+        while slices and slices[0].start + self.__width <= now - self.__ttl:
+            slices.popleft()
+
+    def _live(self) -> deque[_Slice]:
+        """Return the live sub-histograms, with the lock held."""
+        if self.__ttl:
+            self._expire(time.monotonic_ns())
+
+        return self.__slices
+
+    def _total(self) -> _Slice:
+        """Return the merged counts and aggregates of the live sub-histograms, with the lock held."""
+        slices = self._live()
+        if len(slices) == 1:
+            return slices[0]
+
+        total = _Slice(0)
+        for slice_ in slices:
+            total.merge(slice_)
+
+        return total
+
+    def __repr__(self) -> str:
+        """Return the representation of this instance."""
+        return f"{self.sum}"
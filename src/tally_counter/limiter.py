@@ -0,0 +1,80 @@
+"""The `RateLimiter` model."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    A sliding window rate limiter, allowing at most `limit` requests per `window_ms`.
+
+    This is a generic cell rate algorithm (GCRA) limiter: rather than holding a data
+    point per request, it holds only a "theoretical arrival time", which each allowed
+    request advances by `window_ms / limit`. A request is allowed if that time would not
+    then run more than one window ahead of now. Every check is constant time, and each
+    limiter holds constant memory, so that one limiter per client key stays cheap.
+    """
+
+    def __init__(self, limit: int, window_ms: int) -> None:
+        limit, window_ms = int(limit), int(window_ms)
+        if limit < 1 or window_ms < 1:
+            message = f"Rate limits must be positive, not {limit} per {window_ms} ms."
+            raise ValueError(message)
+
+        self._lock = threading.Lock()
+        self.__limit = limit
+        self.__window = window_ms * 1000000  # 1 ms = 1000000 ns
+        self.__tat = 0  # Theoretical arrival time, in monotonic nanoseconds
+
+    @property
+    def limit(self) -> int:
+        """Return the number of requests allowed per window."""
+        return self.__limit
+
+    @property
+    def window(self) -> int:
+        """Return the window length, in milliseconds."""
+        return self.__window // 1000000
+
+    def allow(self, *, timestamp: int | None = None) -> bool:
+        """Record, and return `True` for, a request if it is within the limit; else return `False`."""
+        return self.try_acquire(1, timestamp=timestamp)
+
+    def try_acquire(self, n: int = 1, /, *, timestamp: int | None = None) -> bool:
+        """
+        Record, and return `True` for, `n` requests if they are all within the limit.
+
+        Otherwise record nothing, and return `False`. The check and the record are made
+        in one lock hold, so that concurrent callers may not both take the last request.
+        """
+        n = int(n)
+        if n < 1:
+            message = f"Requests must be positive, not {n}."
+            raise ValueError(message)
+
+        with self._lock:
+            now = time.monotonic_ns() if timestamp is None else int(timestamp)
+            tat = max(self.__tat, now) + n * self.__window // self.__limit
+            if tat - now > self.__window:
+                return False
+
+            self.__tat = tat
+            return True
+
+    def remaining(self, *, timestamp: int | None = None) -> int:
+        """Return the number of requests that would now be allowed."""
+        with self._lock:
+            now = time.monotonic_ns() if timestamp is None else int(timestamp)
+            used = max(self.__tat - now, 0)
+            return (self.__window - used) * self.__limit // self.__window
+
+    def _idle(self, now: int) -> bool:
+        """Return whether this limiter has no requests recorded within the window, as a new limiter."""
+        with self._lock:
+            return self.__tat <= now
+
+    def __repr__(self) -> str:
+        """Return the representation of this instance."""
+        return f"RateLimiter({self.__limit}, {self.window})"
@@ -13,15 +13,8 @@ class _Point:
     point.
     """
 
-    def __init__(
-        self,
-        value: int,
-        timestamp: int,
-        lock: threading.RLock | None = None,
-    ) -> None:
-        if lock is None:
-            lock = threading.RLock()
-        self._lock = lock
+    def __init__(self, value: int, timestamp: int) -> None:
+        self._lock = threading.RLock()
 
         self.__value = int(value)
         self.__timestamp = int(timestamp)
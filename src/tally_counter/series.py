@@ -2,24 +2,108 @@
 
 from __future__ import annotations
 
+import bisect
+import functools
+import itertools
 import math
+import operator
 import threading
 import time
 
+from array import array
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from .delta import _Delta
 from .point import _Point
+from .sketch import _Sketch
+from .window import _Window
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+    from contextlib import AbstractContextManager
+    from types import ModuleType
+
+    import numpy as np
+
+# Moving rates are updated on a 5 s tick, with 1, 5 and 15 minute decay, as a load average
+_TICK_NS = 5 * 1000000000  # 1 s = 1000000000 ns
+_RATE_ALPHAS = tuple(1 - math.exp(-5 / (60 * minutes)) for minutes in (1, 5, 15))
+# Sorts (and selections) of at least this many values are done with NumPy, if installed
+_NUMPY_MIN_LENGTH = 1024
+
+# Statistics that may be given by `_Series._summary()`
+_SUMMARY_STATS = ("sum", "len", "mean", "min", "max")
+
+_RATE_UNITS = {"ms": 1000000, "s": 1000000000, "m": 60000000000, "h": 3600000000000}
+
+
+def _summary_stats(stats: Iterable[str]) -> tuple[str, ...]:
+    """Return the given summary statistic names, as a tuple, checking that each is known."""
+    stats = tuple(stats)
+    for stat in stats:
+        if stat not in _SUMMARY_STATS:
+            message = f"Unknown summary statistic '{stat}'; expected any of {', '.join(_SUMMARY_STATS)}."
+            raise ValueError(message)
+
+    return stats
+
+
+def _numpy() -> ModuleType | None:
+    """Return the NumPy module, if it is installed."""
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+
+    return np
+
+
+def _shift(column: array[int], shift: int) -> None:
+    """Add `shift` to each value of an int64 column, in place and in a single pass."""
+    np = _numpy() if len(column) >= _NUMPY_MIN_LENGTH else None
+    if np is not None:
+        view = np.frombuffer(column, dtype=np.int64)
+        view += shift
+    elif shift:
+        column[:] = array("q", [value + shift for value in column])
+
+
+class _Rows(NamedTuple):
+    """
+    The live row columns of a series, as from `_Series._rows()`, with its running aggregates.
+
+    The min and max deque entries are given as row offsets, so that a loaded series
+    needs neither to scan its rows nor to rebuild its deques.
+    """
+
+    columns: list[array[int]]
+    total: int
+    length: int
+    min_offsets: array[int]
+    max_offsets: array[int]
 
 
 class _Series:
-    """A data series, a linear sequence of data points, ordered by time."""
+    """
+    A data series, a linear sequence of data points, ordered by time.
+
+    Data points are stored in packed int64 columns, with running aggregates; see the
+    "Data Series Internals" section of `docs/DEV.md`.
+    """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         initial_value: int | _Point | None = None,
         /,
         *,
         ttl: int | None = None,
         maxlen: int | None = None,
-        lock: threading.RLock | None = None,
+        accuracy: float | None = None,
+        resolution: int | None = None,
+        buffer_size: int | None = None,
+        reaped: bool = False,
+        max_children: int | None = None,
+        lock: AbstractContextManager[Any] | None = None,
     ) -> None:
         if lock is None:
             lock = threading.RLock()
@@ -27,7 +111,62 @@ class _Series:
 
         self.__ttl = ttl
         self.__maxlen = maxlen
-        self.__data_points: list[_Point] = []
+        self.__reaped = reaped
+        self.__values = array("q")
+        self.__timestamps = array("q")
+        self.__start = 0  # Column offset of the first live (unexpired) data point
+        self.__base = 0  # Absolute index of the first data point in the columns
+        self.__shifts = 0  # Incremented when rows are inserted before others, shifting their index
+
+        # Time bucket columns, if the series has a resolution
+        self.__resolution_ns = resolution * 1000000 if resolution else 0  # 1 ms = 1000000 ns
+        self.__counts = array("q")
+        self.__lows = array("q") if resolution else self.__values
+        self.__highs = array("q") if resolution else self.__values
+        self.__accuracy = accuracy
+        self.__bucket_sketches: list[_Sketch] = []
+
+        # Running aggregates
+        self.__sum = 0
+        self.__count = 0
+        self.__min_indexes = array("q")
+        self.__max_indexes = array("q")
+        self.__min_head = 0
+        self.__max_head = 0
+        self.__sketch = None if accuracy is None or resolution else _Sketch(accuracy)
+
+        # Thread-local write buffers, if the series is buffered
+        self.__buffer_size = buffer_size or 0
+        self.__local = threading.local()
+        self.__buffers: list[tuple[threading.Thread, list[tuple[int, int]]]] = []
+
+        # Rate meter: the total and first timestamp, uncounted total since the last tick,
+        # and the moving rates (per ns) as of that tick, once the first tick has passed
+        self.__total = 0
+        self.__first_timestamp: int | None = None
+        self.__uncounted = 0
+        self.__tick = 0
+        self.__rates: list[float] | None = None
+
+        # Labelled child series, by sorted label set, and by label set as looked up
+        self.__children: dict[tuple[tuple[str, Hashable], ...], _Series] = {}
+        self.__labelled: dict[tuple[tuple[str, Hashable], ...], _Series] = {}
+        self.__max_children = max_children
+
+        # Called (without the lock held) when a labelled child is created, e.g. to count it
+        self._on_child: Callable[[], object] | None = None
+
+        # Incremented whenever data is added or expired, e.g. to cache rendered output
+        self._version = 0
+        # Absolute index of the first live data point last seen by a reaped series' reads
+        self.__live_index = 0
+
+        # Called (with the lock held) with all values and timestamps added, e.g. by a log.
+        # Labelled children call it with their `labels`, by keyword.
+        self._log: Callable[..., None] | None = None
+
+        # Counts all values added since the last `_take_delta()`, once that is first called
+        self._delta: _Delta | None = None
 
         if initial_value is not None:
             with self._lock:
@@ -54,39 +193,455 @@ class _Series:
 
     def _append(self, value: int = 1, /, *, timestamp: int | None = None) -> None:
         """Only use this method to mutate (append to) the data points list."""
-        if timestamp is None:
-            timestamp = time.monotonic_ns()
+        value = int(value)
+        timestamp = time.monotonic_ns() if timestamp is None else int(timestamp)
+
+        if self.__buffer_size:
+            self._buffer(value, timestamp)
+            return
+
+        with self._lock:
+            late = self._add_row(value, timestamp)
+            if late is not None:
+                self._repair_extrema(late)
+            self._meter(value, timestamp, timestamp)
+            self._version += 1
+            if self._log is not None:
+                self._log((value,), (timestamp,))
+
+            if self.__maxlen or (self.__ttl and not self.__reaped):
+                self._prune(ttl=not self.__reaped)  # Pruned after adding data
+
+    def _buffer(self, value: int, timestamp: int) -> None:
+        """Append a data point to the calling thread's write buffer, without locking."""
+        try:
+            buffer = self.__local.buffer
+        except AttributeError:
+            buffer = self.__local.buffer = []
+            with self._lock:
+                self.__buffers.append((threading.current_thread(), buffer))
+
+        buffer.append((value, timestamp))
+        if len(buffer) >= self.__buffer_size:
+            with self._lock:
+                self._prune(ttl=not self.__reaped)  # Merges all write buffers
+
+    def _merge_buffers(self) -> None:
+        """Merge all thread write buffers into the columns, with the lock held."""
+        buffers = self.__buffers
+        # Forget the buffers of threads that have finished, once they are merged
+        self.__buffers = [(thread, buffer) for thread, buffer in buffers if thread.is_alive()]
+
+        points: list[tuple[int, int]] = []
+        for _, buffer in buffers:
+            # Other threads may append while this runs, so only take what is there now
+            size = len(buffer)
+            points.extend(buffer[:size])
+            del buffer[:size]
+
+        if points:
+            points.sort(key=operator.itemgetter(1))
+            self._add_many(
+                array("q", [value for value, _ in points]),
+                array("q", [timestamp for _, timestamp in points]),
+                ordered=True,
+            )
+
+    def incr_many(self, values: Iterable[int], timestamps: Iterable[int] | None = None) -> None:
+        """
+        Increment the count for this data series by each of `values`, in bulk.
+
+        The lock is taken, and the series is pruned, once for the whole batch. If no
+        `timestamps` are given, then all values are stamped with the current time.
+        """
+        try:
+            batch = values if isinstance(values, array) and values.typecode == "q" else array("q", values)
+        except TypeError as e:
+            message = "incr_many() argument must be an iterable of integers"
+            raise TypeError(message) from e
+
+        if timestamps is None:
+            stamps = array("q", [time.monotonic_ns()]) * len(batch)
+        else:
+            stamps = array("q", timestamps)
+            if len(stamps) != len(batch):
+                message = "incr_many() values and timestamps must be of equal length"
+                raise ValueError(message)
 
         with self._lock:
-            self.__data_points.append(_Point(int(value), timestamp, lock=self._lock))
-            self._prune()  # Pruned after adding data
+            if self.__buffers:
+                self._merge_buffers()  # Merge older, buffered data points first
+
+            self._add_many(batch, stamps, ordered=timestamps is None or stamps == array("q", sorted(stamps)))
+            self._prune(ttl=not self.__reaped)  # Pruned after adding data
+
+    def _add_many(self, batch: array[int], stamps: array[int], *, ordered: bool) -> None:
+        """
+        Add many data points to the columns and running aggregates, with the lock held.
+
+        An unordered batch is sorted by timestamp first, so that it is merged into the
+        columns at once, and the min and max deques are repaired once for the batch.
+        """
+        if not ordered:
+            rows = sorted(zip(batch, stamps), key=operator.itemgetter(1))
+            batch = array("q", [value for value, _ in rows])
+            stamps = array("q", [timestamp for _, timestamp in rows])
+
+        if batch:
+            first, last = stamps[0], stamps[-1]
+            if last - first < _TICK_NS:
+                self._meter(sum(batch), first, last)
+            else:
+                # The batch spans moving rate ticks, so meter each data point at its own tick
+                for value, timestamp in zip(batch, stamps):
+                    self._meter(value, timestamp, timestamp)
+
+        self._version += 1
+        if self._log is not None:
+            self._log(batch, stamps)
+
+        if not batch:
+            return
+
+        if self.__resolution_ns:
+            self._add_buckets(batch, stamps)
+        else:
+            self._merge_rows(batch, stamps)
+
+    def _add_buckets(self, batch: array[int], stamps: array[int]) -> None:
+        """Add a time-ordered batch of data points to their time buckets, with the lock held."""
+        late = None
+        for value, timestamp in zip(batch, stamps):
+            offset = self._add_row(value, timestamp)
+            if late is None:
+                late = offset  # Later rows are at or after the first late row
+
+        if late is not None:
+            self._repair_extrema(late)
+
+    def _merge_rows(self, batch: array[int], stamps: array[int]) -> None:
+        """Merge a time-ordered batch of data points into the columns, with the lock held."""
+        values, timestamps = self.__values, self.__timestamps
+        offset = bisect.bisect_right(timestamps, stamps[0], self.__start)
+        if offset == len(timestamps):
+            # Time-ordered batch, appended after the latest data point
+            values.extend(batch)
+            timestamps.extend(stamps)
+        else:
+            # Merge the batch with the later rows, in one (stable, so run merging) sort
+            rows = sorted(
+                itertools.chain(zip(values[offset:], timestamps[offset:]), zip(batch, stamps)),
+                key=operator.itemgetter(1),
+            )
+            del values[offset:], timestamps[offset:]
+            self.__shifts += 1
+            values.extend(array("q", [value for value, _ in rows]))
+            timestamps.extend(array("q", [timestamp for _, timestamp in rows]))
+
+        self._repair_extrema(offset)
+        self.__sum += sum(batch)
+        self.__count += len(batch)
+        if self.__sketch is not None:
+            for value in batch:
+                self.__sketch.add(value)
+        if self._delta is not None:
+            self._delta.add_many(batch)
+
+    def _add_row(self, value: int, timestamp: int) -> int | None:
+        """
+        Add a data point to the columns and running aggregates, with the lock held.
+
+        Return the column offset of a row inserted (or updated) out of time order, from
+        which the min and max deques must then be repaired, or `None` if they are up to date.
+        """
+        timestamps = self.__timestamps
+        end = len(timestamps)
+        late = None
+        if not self.__resolution_ns:
+            if end == self.__start or timestamp >= timestamps[-1]:
+                # In time order, as most data points are
+                self.__values.append(value)
+                timestamps.append(timestamp)
+                self._push_extrema(self.__base + end, value, value)
+            else:
+                # Out of order: insert at the time-ordered position (O(n), but rare)
+                late = bisect.bisect_right(timestamps, timestamp, self.__start)
+                self._insert_row(late, value, timestamp)
+                self.__shifts += 1
+        else:
+            timestamp -= timestamp % self.__resolution_ns  # Start of the time bucket
+            if end == self.__start or timestamp > timestamps[-1]:
+                self._insert_row(end, value, timestamp)
+                self._push_extrema(self.__base + end, value, value)
+            elif timestamp == timestamps[-1]:
+                # Update the latest time bucket (the most recently pushed extrema)
+                self._update_row(end - 1, value)
+                self._push_extrema(self.__base + end - 1, self.__lows[-1], self.__highs[-1])
+            else:
+                # Out of order: add to, or insert, the time bucket at its time-ordered position
+                late = bisect.bisect_left(timestamps, timestamp, self.__start)
+                if timestamps[late] == timestamp:
+                    self._update_row(late, value)
+                else:
+                    self._insert_row(late, value, timestamp)
+                    self.__shifts += 1
+
+        self.__sum += value
+        self.__count += 1
+        if self.__sketch is not None:
+            self.__sketch.add(value)
+        if self._delta is not None:
+            self._delta.add(value)
+
+        return late
+
+    def _insert_row(self, offset: int, value: int, timestamp: int) -> None:
+        """Insert a data point (or time bucket) row into the columns."""
+        self.__values.insert(offset, value)
+        self.__timestamps.insert(offset, timestamp)
+        if self.__resolution_ns:
+            self.__counts.insert(offset, 1)
+            self.__lows.insert(offset, value)
+            self.__highs.insert(offset, value)
+
+            if self.__accuracy is not None:
+                sketch = _Sketch(self.__accuracy)
+                sketch.add(value)
+                self.__bucket_sketches.insert(offset, sketch)
+
+    def _update_row(self, offset: int, value: int) -> None:
+        """Add a value to an existing time bucket row."""
+        self.__values[offset] += value
+        self.__counts[offset] += 1
+        self.__lows[offset] = min(self.__lows[offset], value)
+        self.__highs[offset] = max(self.__highs[offset], value)
+        if self.__accuracy is not None:
+            self.__bucket_sketches[offset].add(value)
+
+    def _push_extrema(self, index: int, low: int, high: int) -> None:
+        """Push the latest row's absolute index, and its `low` and `high`, onto the min and max deques."""
+        base = self.__base
+
+        lows, min_indexes, min_head = self.__lows, self.__min_indexes, self.__min_head
+        while len(min_indexes) > min_head and lows[min_indexes[-1] - base] >= low:
+            min_indexes.pop()
+        min_indexes.append(index)
+
+        highs, max_indexes, max_head = self.__highs, self.__max_indexes, self.__max_head
+        while len(max_indexes) > max_head and highs[max_indexes[-1] - base] <= high:
+            max_indexes.pop()
+        max_indexes.append(index)
+
+    def _meter(self, total: int, first: int, last: int) -> None:
+        """Count the total of values added, from `first` to `last` timestamp, with the lock held."""
+        first_timestamp = self.__first_timestamp
+        if first_timestamp is None:
+            self.__first_timestamp = self.__tick = first
+        elif first < first_timestamp or last - self.__tick >= _TICK_NS:
+            # Only out of order data, or data that crosses a tick, changes more than the totals
+            self.__first_timestamp = min(first_timestamp, first)
+            self._advance(last)
+
+        self.__total += total
+        self.__uncounted += total
+
+    def _advance(self, now: int) -> None:
+        """Apply all moving rate ticks that have passed by `now`, with the lock held."""
+        ticks = (now - self.__tick) // _TICK_NS
+        if ticks <= 0:
+            return
+
+        instant = self.__uncounted / _TICK_NS
+        self.__uncounted = 0
+        self.__tick += ticks * _TICK_NS
+
+        if self.__rates is None:
+            rates = [instant] * len(_RATE_ALPHAS)  # The first tick starts the moving rates
+        else:
+            rates = [rate + alpha * (instant - rate) for rate, alpha in zip(self.__rates, _RATE_ALPHAS)]
+
+        # Any later ticks saw no data, so they only decay the moving rates
+        self.__rates = [rate * (1 - alpha) ** (ticks - 1) for rate, alpha in zip(rates, _RATE_ALPHAS)]
+
+    def _extend_extrema(self, offset: int) -> None:
+        """Push the rows appended from the `offset` column onwards onto the min and max deques."""
+        base = self.__base
+        lows, highs = self.__lows, self.__highs
+        end = len(lows)
+
+        # Only the suffix minima (and maxima) of the new rows may become deque entries
+        suffix_lows = [end - 1]
+        suffix_highs = [end - 1]
+        low, high = lows[end - 1], highs[end - 1]
+        if lows is highs:
+            for i, value in zip(range(end - 2, offset - 1, -1), reversed(lows[offset : end - 1])):
+                if value < low:
+                    suffix_lows.append(i)
+                    low = value
+                elif value > high:
+                    suffix_highs.append(i)
+                    high = value
+        else:
+            # Time bucket rows, of distinct minimum and maximum values
+            rows = zip(
+                range(end - 2, offset - 1, -1),
+                reversed(lows[offset : end - 1]),
+                reversed(highs[offset : end - 1]),
+            )
+            for i, row_low, row_high in rows:
+                if row_low < low:
+                    suffix_lows.append(i)
+                    low = row_low
+                if row_high > high:
+                    suffix_highs.append(i)
+                    high = row_high
+
+        min_indexes, min_head = self.__min_indexes, self.__min_head
+        while len(min_indexes) > min_head and lows[min_indexes[-1] - base] >= low:
+            min_indexes.pop()
+        min_indexes.extend(base + i for i in reversed(suffix_lows))
+
+        max_indexes, max_head = self.__max_indexes, self.__max_head
+        while len(max_indexes) > max_head and highs[max_indexes[-1] - base] <= high:
+            max_indexes.pop()
+        max_indexes.extend(base + i for i in reversed(suffix_highs))
+
+    def _repair_extrema(self, offset: int) -> None:
+        """
+        Repair the min and max deques, after rows from the `offset` column onwards were changed.
+
+        Deque entries before the offset stay valid, as a row that was dropped from a deque
+        is still dominated by a later row, so only the changed rows need to be pushed.
+        """
+        index = self.__base + offset
+        del self.__min_indexes[bisect.bisect_left(self.__min_indexes, index, self.__min_head) :]
+        del self.__max_indexes[bisect.bisect_left(self.__max_indexes, index, self.__max_head) :]
+        self._extend_extrema(offset)
 
     def mean(self, percentile: int = 0) -> float:
         """Return the mean float value for this data series."""
         with self._lock:
-            data_points = self._pruned(percentile)
-            return sum([dp.value for dp in data_points]) / len(data_points)
+            if percentile:
+                values = self._pruned(percentile)
+                return sum(values) / len(values)
+
+            total, count = self._aggregates(self._live())
+            return total / count
 
     def min(self) -> int:
         """Return the minimum value for this data series."""
         with self._lock:
-            data_points = self._pruned()
-            return min([dp.value for dp in data_points])
+            return self._extremum("min", self._live())
 
     def max(self, percentile: int = 0) -> int:
         """Return the maximum value for this data series."""
         with self._lock:
-            data_points = self._pruned(percentile)
-            return max([dp.value for dp in data_points])
+            if percentile:
+                return max(self._pruned(percentile))
+
+            return self._extremum("max", self._live())
+
+    def _extremum(self, name: str, start: int) -> int:
+        """Return the column value of the first "min" or "max" deque entry, from the `start` offset."""
+        if name == "min":
+            column, indexes, head = self.__lows, self.__min_indexes, self.__min_head
+        else:
+            column, indexes, head = self.__highs, self.__max_indexes, self.__max_head
+
+        first = self.__base + start
+        position = bisect.bisect_left(indexes, first, head)  # Past expired data points not yet reaped
+        if position < len(indexes):
+            return column[indexes[position] - self.__base]
+
+        message = f"{name}() arg is an empty sequence"
+        raise ValueError(message)
+
+    def _aggregates(self, start: int) -> tuple[int, int]:
+        """Return the sum and count of the data points from the `start` column offset."""
+        if start == self.__start:
+            return self.__sum, self.__count
+
+        # Subtract expired data points that are not yet reaped
+        expired = self.__values[self.__start : start]
+        count = sum(self.__counts[self.__start : start]) if self.__resolution_ns else len(expired)
+        return self.__sum - sum(expired), self.__count - count
+
+    def quantile(self, q: float) -> float:
+        """
+        Return the `q` quantile (from 0 to 1) of the values in this data series.
+
+        This is an estimate from the series quantile sketch, if the series has an
+        `accuracy`. Otherwise, it is computed exactly, by sorting the series values. The
+        values of a series with a `resolution` are not kept, so it needs an `accuracy`.
+        """
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Iterable[float]) -> list[float]:
+        """Return the quantiles (each from 0 to 1) of the values in this data series."""
+        qs = list(qs)
+        with self._lock:
+            start = self._live()
+            if self.__sketch is not None:
+                if start != self.__start:
+                    self._prune()  # The sketch must follow the window, so reap now
+
+                return [self.__sketch.quantile(q) for q in qs]
+
+            if self.__resolution_ns:
+                if self.__accuracy is None:
+                    message = "Quantiles of a series with a resolution require an accuracy."
+                    raise ValueError(message)
+
+                sketch = _Sketch(self.__accuracy)
+                for bucket_sketch in self.__bucket_sketches[start:]:
+                    sketch.merge(bucket_sketch)
+                return [sketch.quantile(q) for q in qs]
+
+            values = self.__values[start:]
+
+        return self._exact_quantiles(values, qs)
+
+    @staticmethod
+    def _exact_quantiles(values: Sequence[int], qs: list[float]) -> list[float]:
+        """
+        Return the quantiles of the given values, by sorting them.
+
+        If NumPy is installed, then many values are instead partitioned, in linear time,
+        around the quantile ranks.
+        """
+        for q in qs:
+            if not 0 <= q <= 1:
+                message = f"Quantile must be from 0 to 1, not {q}."
+                raise ValueError(message)
+
+        if not values:
+            message = "quantile() arg is an empty sequence"
+            raise ValueError(message)
+
+        ranks = [int(q * (len(values) - 1)) for q in qs]
+        np = _numpy() if len(values) >= _NUMPY_MIN_LENGTH else None
+        if np is not None:
+            partitioned = np.partition(np.asarray(values, dtype=np.int64), ranks)
+            return [float(partitioned[rank]) for rank in ranks]
+
+        ordered = sorted(values)
+        return [float(ordered[rank]) for rank in ranks]
 
     def len(self) -> int:
-        """Return the length (number of data points) of this data series."""
+        """
+        Return the length (number of data points) of this data series.
+
+        For a series with a `resolution`, this is the number of increments (and
+        decrements) counted in its time buckets.
+        """
         with self._lock:
-            return len(self._pruned())
+            return self._aggregates(self._live())[1]
 
     def age(self) -> int:
         """Return the age of this data series, in nanoseconds."""
-        return time.monotonic_ns() - self._pruned()[0].timestamp
+        with self._lock:
+            start = self._live()
+            return time.monotonic_ns() - self.__timestamps[start]
 
     def span(self) -> int:
         """
@@ -96,59 +651,666 @@ class _Series:
         series.
         """
         with self._lock:
-            data_points = self._pruned()
+            start = self._live()
+            return self.__timestamps[-1] - self.__timestamps[start]
 
-            return data_points[-1].timestamp - data_points[0].timestamp
+    def rate(self, per: str = "s") -> float:
+        """
+        Return the mean rate of this data series, as the total of values added per `per`.
+
+        The total, and the time it is taken over, runs from the first data point ever
+        added to now, regardless of any `ttl` or `maxlen`. The `per` time unit is one of
+        "ms", "s", "m" or "h".
+        """
+        unit = self._rate_unit(per)
+        with self._lock:
+            self._live()  # Merges any write buffers
+            now = time.monotonic_ns()
+            if self.__first_timestamp is None or now <= self.__first_timestamp:
+                return 0.0
+
+            return self.__total * unit / (now - self.__first_timestamp)
+
+    def rates(self, per: str = "s") -> tuple[float, float, float]:
+        """
+        Return the 1, 5 and 15 minute exponentially weighted moving rates of this data series.
+
+        As with a load average, the rates are updated on a 5 second tick, so they are
+        zero until the first tick has passed. The `per` time unit is as for `rate()`.
+        """
+        unit = self._rate_unit(per)
+        with self._lock:
+            self._live()  # Merges any write buffers
+            if self.__first_timestamp is not None:
+                self._advance(time.monotonic_ns())
+
+            if self.__rates is None:
+                return (0.0, 0.0, 0.0)
+
+            one, five, fifteen = (rate * unit for rate in self.__rates)
+            return (one, five, fifteen)
+
+    @staticmethod
+    def _rate_unit(per: str) -> int:
+        """Return the length of a rate time unit, in nanoseconds."""
+        try:
+            return _RATE_UNITS[per]
+        except KeyError:
+            message = f"Rate time units must be one of 'ms', 's', 'm' or 'h', not '{per}'."
+            raise ValueError(message) from None
+
+    def window(self, last_ms: int) -> _Window:
+        """
+        Return a view of the data points of this series, from the last `last_ms` milliseconds.
+
+        The window starts `last_ms` before this call, and is open-ended. Its queries
+        (`sum`, `len()`, `mean()`, `min()` and `max()`) neither copy nor prune the series.
+        """
+        return _Window(self, time.monotonic_ns() - int(last_ms) * 1000000, None)
+
+    def between(self, start_ns: int | None = None, end_ns: int | None = None) -> _Window:
+        """
+        Return a view of the data points of this series, with timestamps from `start_ns` to `end_ns`.
+
+        The start is inclusive and the end exclusive, and a bound of `None` is open. As
+        for `window()`, its queries neither copy nor prune the series.
+        """
+        return _Window(self, start_ns, end_ns)
+
+    def _range(
+        self, start_ns: int | None, end_ns: int | None, *, extrema: bool = False
+    ) -> tuple[int, int, int | None, int | None]:
+        """
+        Return the sum and count of the live data points with timestamps in a range.
+
+        The bounds of the range are bisected from the timestamp column. Its sum and count
+        are then taken from the rows of the range, or from the running aggregates less the
+        rows outside of it, whichever is fewer rows. If `extrema` is true, then the minimum
+        and maximum values of the range are also returned (or `None`, if it is empty).
+        """
+        with self._lock:
+            if self.__buffers:
+                self._merge_buffers()
+
+            timestamps = self.__timestamps
+            end = len(timestamps)
+            lo = self._cutoff(ttl=True)
+            if start_ns is not None:
+                lo = bisect.bisect_left(timestamps, start_ns, lo, end)
+            hi = end
+            if end_ns is not None:
+                hi = bisect.bisect_left(timestamps, end_ns, lo, end)
+
+            values, counts = self.__values, self.__counts
+            if hi - lo <= (lo - self.__start) + (end - hi):
+                total = sum(values[lo:hi])
+                count = sum(counts[lo:hi]) if self.__resolution_ns else hi - lo
+            else:
+                total = self.__sum - sum(values[self.__start : lo]) - sum(values[hi:])
+                outside = (lo - self.__start) + (end - hi)
+                if self.__resolution_ns:
+                    outside = sum(counts[self.__start : lo]) + sum(counts[hi:])
+                count = self.__count - outside
+
+            if not extrema or lo == hi:
+                return total, count, None, None
+
+            return total, count, min(self.__lows[lo:hi]), max(self.__highs[lo:hi])
 
     @property
     def data(self) -> list[tuple[int, int]]:
-        """Return all series data."""
+        """
+        Return all series data.
+
+        For a series with a `resolution`, this is the sum and start time of each time
+        bucket.
+        """
+        return list(zip(*self._snapshot()))
+
+    def iter_points(self, since_ns: int | None = None, chunk_size: int = 1024) -> Iterator[tuple[int, int]]:
+        """
+        Yield the `(value, timestamp)` data points of this series, in time order.
+
+        Data points are copied `chunk_size` at a time, taking the lock once per chunk, so
+        that writers are not blocked for the whole series, and only a chunk is held in
+        memory. If `since_ns` is given, then only data points from that timestamp on are
+        yielded. As for `data`, these are the time buckets of a series with a `resolution`.
+        """
+        for values, timestamps in self.iter_chunks(since_ns, chunk_size):
+            yield from zip(values, timestamps)
+
+    def iter_chunks(
+        self, since_ns: int | None = None, chunk_size: int = 1024
+    ) -> Iterator[tuple[array[int], array[int]]]:
+        """
+        Yield the data points of this series as packed chunks, of value and timestamp columns.
+
+        As for `iter_points()`, each chunk of up to `chunk_size` rows is copied with the
+        lock held. Between chunks, the series may change: chunks resume from the absolute
+        row index after the last row yielded, so rows that expire meanwhile are skipped,
+        and no live row is. Data points inserted out of time order shift that index, so
+        after such an insert, chunks resume after the latest timestamp yielded instead.
+        """
+        if chunk_size < 1:
+            message = f"Chunk size must be positive, not {chunk_size}."
+            raise ValueError(message)
+
+        position = None  # The absolute index of the next row to yield
+        latest = shifts = 0  # The latest timestamp yielded, and the shifts as of then
+        while True:
+            with self._lock:
+                timestamps = self.__timestamps
+                end = len(timestamps)
+                start = self._live()
+                if position is None:
+                    if since_ns is not None:
+                        start = bisect.bisect_left(timestamps, since_ns, start, end)
+                elif shifts == self.__shifts:
+                    start = min(max(position - self.__base, start), end)
+                else:
+                    start = bisect.bisect_right(timestamps, latest, start, end)
+
+                stop = min(start + chunk_size, end)
+                values, stamps = self.__values[start:stop], timestamps[start:stop]
+                position, shifts = self.__base + stop, self.__shifts
+
+            if not stamps:
+                return
+
+            latest = stamps[-1]
+            yield values, stamps
+
+    @property
+    def ttl(self) -> int | None:
+        """Return the TTL of this data series, in milliseconds, if any."""
+        return self.__ttl
+
+    @property
+    def maxlen(self) -> int | None:
+        """Return the maximum length of this data series, if any."""
+        return self.__maxlen
+
+    @property
+    def accuracy(self) -> float | None:
+        """Return the relative accuracy of this data series' quantile sketch, if any."""
+        return self.__accuracy
+
+    @property
+    def resolution(self) -> int | None:
+        """Return the time bucket width of this data series, in milliseconds, if any."""
+        return self.__resolution_ns // 1000000 or None
+
+    def _rows(self) -> _Rows:
+        """
+        Return copies of the live row columns of this series, with its running aggregates.
+
+        The columns are the value and timestamp columns, followed (for a series with a
+        `resolution`) by the count, minimum and maximum value columns.
+        """
+        with self._lock:
+            start = self._live()
+            columns = [self.__values, self.__timestamps]
+            if self.__resolution_ns:
+                columns += [self.__counts, self.__lows, self.__highs]
+
+            first = self.__base + start
+            offsets = []
+            for indexes, head in (
+                (self.__min_indexes, self.__min_head),
+                (self.__max_indexes, self.__max_head),
+            ):
+                live = indexes[bisect.bisect_left(indexes, first, head) :]
+                _shift(live, -first)
+                offsets.append(live)
+
+            return _Rows([column[start:] for column in columns], *self._aggregates(start), *offsets)
+
+    def _load(self, rows: _Rows) -> None:
+        """
+        Replace the data in this series with the given row columns, as from `_rows()`.
+
+        The running aggregates and min and max deques are loaded as they were, but
+        sketches are rebuilt from the rows. The values within a time bucket are not
+        kept, so a bucket's sketch is rebuilt from its mean value.
+        """
         with self._lock:
-            return [dp.data for dp in self._pruned()]
+            self._version += 1
+            values, timestamps, *buckets = rows.columns
+            self.__shifts += 1
+            self.__values[:] = values
+            self.__timestamps[:] = timestamps
+            self.__start = 0
+            self.__sum = rows.total
+            self.__count = rows.length
+
+            if self.__resolution_ns:
+                counts, lows, highs = buckets
+                self.__counts[:] = counts
+                self.__lows[:] = lows
+                self.__highs[:] = highs
+
+                if self.__accuracy is not None:
+                    self.__bucket_sketches = []
+                    for value, count in zip(values, counts):
+                        sketch = _Sketch(self.__accuracy)
+                        sketch.add(round(value / count), count=count)
+                        self.__bucket_sketches.append(sketch)
+            elif self.__accuracy is not None:
+                self.__sketch = _Sketch(self.__accuracy)
+                for value in values:
+                    self.__sketch.add(value)
+
+            self.__min_indexes[:] = rows.min_offsets
+            self.__max_indexes[:] = rows.max_offsets
+            _shift(self.__min_indexes, self.__base)
+            _shift(self.__max_indexes, self.__base)
+            self.__min_head = self.__max_head = 0
+            self._prune()
+
+    def _take_delta(self) -> _Delta:
+        """
+        Return a delta of the values added to this series since the last call, and start another.
+
+        The first call returns a delta of all live data in the series, from its running
+        aggregates (and sketches), as no values were counted before it.
+        """
+        with self._lock:
+            if self.__buffers:
+                self._merge_buffers()
+
+            delta = self._delta
+            self._delta = _Delta(self.__accuracy)
+            if delta is not None:
+                return delta
+
+            delta = _Delta()
+            start = self._live()
+            total, count = self._aggregates(start)
+            if count:
+                delta.count, delta.sum = count, total
+                delta.low = self._extremum("min", start)
+                delta.high = self._extremum("max", start)
+
+            if self.__accuracy is not None:
+                if start != self.__start:
+                    self._prune()  # The sketch follows the pruned series
+                delta.sketch = _Sketch(self.__accuracy)
+                for sketch in [self.__sketch, *self.__bucket_sketches[self.__start :]]:
+                    if sketch is not None:
+                        delta.sketch.merge(sketch)
+
+            return delta
+
+    def _merge_delta(self, delta: _Delta, timestamp: int) -> None:
+        """
+        Add the values counted by a delta, to the time bucket of `timestamp`.
+
+        The bucket then has the count, sum, extrema and sketch of those values, without
+        their data points. This requires a series with a `resolution`. Merged values are
+        not written to any log.
+        """
+        if not self.__resolution_ns:
+            message = "Merging deltas requires a series with a 'resolution'"
+            raise ValueError(message)
+
+        delta.check_accuracy(self.__accuracy)  # Before any row is changed
+        if not delta.count:
+            return
+
+        with self._lock:
+            if self.__buffers:
+                self._merge_buffers()
+
+            timestamp -= timestamp % self.__resolution_ns  # Start of the time bucket
+            timestamps = self.__timestamps
+            offset = bisect.bisect_left(timestamps, timestamp, self.__start)
+            if offset < len(timestamps) and timestamps[offset] == timestamp:
+                self.__values[offset] += delta.sum
+                self.__counts[offset] += delta.count
+                self.__lows[offset] = min(self.__lows[offset], delta.low)
+                self.__highs[offset] = max(self.__highs[offset], delta.high)
+            else:
+                if offset < len(timestamps):
+                    self.__shifts += 1
+                self.__values.insert(offset, delta.sum)
+                self.__timestamps.insert(offset, timestamp)
+                self.__counts.insert(offset, delta.count)
+                self.__lows.insert(offset, delta.low)
+                self.__highs.insert(offset, delta.high)
+                if self.__accuracy is not None:
+                    self.__bucket_sketches.insert(offset, _Sketch(self.__accuracy))
+
+            if self.__accuracy is not None:
+                delta.merge_into(self.__bucket_sketches[offset])
+
+            self._repair_extrema(offset)
+
+            self.__sum += delta.sum
+            self.__count += delta.count
+            self._meter(delta.sum, timestamp, timestamp)
+            self._version += 1
+            if self._delta is not None:
+                self._delta.merge(delta)
+
+            self._prune(ttl=not self.__reaped)
+
+    def _stop_reaping(self) -> None:
+        """Expire data by TTL as data is added or read, as a series that is not reaped, from now on."""
+        with self._lock:
+            self.__reaped = False
+            self._prune()
+            children = list(self.__children.values())
+
+        for child in children:
+            child._stop_reaping()  # noqa: SLF001
+
+    def _summary(self, stats: Sequence[str]) -> tuple[float | None, ...]:
+        """
+        Return the given statistics of this data series, from its running aggregates.
+
+        The series is pruned once, and no live data is scanned. The statistics are named
+        as in `_SUMMARY_STATS`, and the `mean`, `min` and `max` of an empty series are `None`.
+        """
+        with self._lock:
+            start = self._live()
+            total, count = self._aggregates(start)
+            values: dict[str, float | None] = {
+                "sum": total,
+                "len": count,
+                "mean": None,
+                "min": None,
+                "max": None,
+            }
+            if count:
+                values["mean"] = total / count
+                values["min"] = self._extremum("min", start)
+                values["max"] = self._extremum("max", start)
+
+        return tuple(values[stat] for stat in stats)
+
+    def labels(self, **labels: Hashable) -> _Series:
+        """
+        Return the child data series of this series, for the given label values.
+
+        Children have the options of this series, and are created on first use. Label
+        sets are interned, so that a repeated lookup is a single dictionary hit, whatever
+        the order of the labels, with no key building or formatting.
+
+        Raise a `ValueError` if the series already has `max_children` children.
+        """
+        key = tuple(labels.items())
+
+        # Lock-free fast path, for label sets that have been looked up before
+        child = self.__labelled.get(key)
+        if child is not None:
+            return child
+
+        with self._lock:
+            labels_key = tuple(sorted(key, key=operator.itemgetter(0)))
+            child = self.__children.get(labels_key)
+            created = child is None
+            if child is None:
+                if self.__max_children is not None and len(self.__children) >= self.__max_children:
+                    message = f"Series has the maximum of {self.__max_children} labelled children."
+                    raise ValueError(message)
+
+                child = self.__children[labels_key] = type(self)(
+                    ttl=self.__ttl,
+                    maxlen=self.__maxlen,
+                    accuracy=self.__accuracy,
+                    resolution=self.__resolution_ns // 1000000 or None,
+                    buffer_size=self.__buffer_size or None,
+                    reaped=self.__reaped,
+                    max_children=self.__max_children,
+                )
+                if self._log is not None:
+                    child._log = functools.partial(self._log, labels=labels_key)  # noqa: SLF001
+
+            self.__labelled[key] = child
+
+        if created and self._on_child is not None:
+            self._on_child()
+
+        return child
+
+    def aggregate(
+        self, stats: Sequence[str] = _SUMMARY_STATS, **labels: Hashable
+    ) -> tuple[float | None, ...]:
+        """
+        Return the given statistics across the labelled children of this series.
+
+        Only children with all of the given label values are included, so that e.g.
+        `aggregate(["sum"], method="GET")` is the sum over all other labels. The data of
+        this series itself is not included. Statistics are named as in `Counter.summary()`,
+        and come from the running aggregates of each child, without scanning its data.
+        """
+        stats = _summary_stats(stats)
+        matches = labels.items()
+        summary = self._combine(child for key, child in self._children() if matches <= dict(key).items())
+        return tuple(summary[stat] for stat in stats)
+
+    def group_by(
+        self, label: str, stats: Sequence[str] = _SUMMARY_STATS
+    ) -> dict[Hashable, tuple[float | None, ...]]:
+        """
+        Return the given statistics across the labelled children of this series, by the value of a label.
+
+        Children without the label are left out. Statistics are named as in `Counter.summary()`.
+        """
+        stats = _summary_stats(stats)
+        groups: dict[Hashable, list[_Series]] = {}
+        for key, child in self._children():
+            labels = dict(key)
+            if label in labels:
+                groups.setdefault(labels[label], []).append(child)
+
+        result = {}
+        for value, children in groups.items():
+            summary = self._combine(children)
+            result[value] = tuple(summary[stat] for stat in stats)
+
+        return result
+
+    def _written(self) -> int | None:
+        """Return the time of the latest data point (or end of the latest time bucket) written, if any."""
+        with self._lock:
+            if self.__buffers:
+                self._merge_buffers()
+
+            return self.__timestamps[-1] + self.__resolution_ns if self.__timestamps else None
+
+    def _children(self) -> list[tuple[tuple[tuple[str, Hashable], ...], _Series]]:
+        """Return a snapshot of the sorted label sets and child series of this series."""
+        with self._lock:
+            return list(self.__children.items())
+
+    @staticmethod
+    def _combine(children: Iterable[_Series]) -> dict[str, float | None]:
+        """Return all summary statistics across many data series, from their running aggregates."""
+        total: float = 0
+        count: float = 0
+        lows: list[float] = []
+        highs: list[float] = []
+        for child in children:
+            child_total, child_count, low, high = child._summary(("sum", "len", "min", "max"))  # noqa: SLF001
+            total += child_total or 0
+            count += child_count or 0
+            if low is not None and high is not None:
+                lows.append(low)
+                highs.append(high)
+
+        return {
+            "sum": total,
+            "len": count,
+            "mean": total / count if count else None,
+            "min": min(lows) if lows else None,
+            "max": max(highs) if highs else None,
+        }
+
+    def to_numpy(self) -> tuple[np.ndarray[Any, np.dtype[np.int64]], np.ndarray[Any, np.dtype[np.int64]]]:
+        """
+        Return the values and timestamps of this data series, as NumPy int64 arrays.
+
+        The series columns are copied once, in bulk, and the arrays are then views of
+        those copies, through the buffer protocol. (Views of the live columns would stop
+        the columns from growing, for as long as the views exist.) For a series with a
+        `resolution`, these are the sum and start time of each time bucket.
+        """
+        np = _numpy()
+        if np is None:
+            message = "to_numpy() requires NumPy, e.g. from `pip install tally-counter[numpy]`"
+            raise ImportError(message)
+
+        values, timestamps = self._snapshot()
+        return np.frombuffer(values, dtype=np.int64), np.frombuffer(timestamps, dtype=np.int64)
+
+    def _footprint(self) -> tuple[int, int, int]:
+        """
+        Return the number of live rows, and of allocated rows, in this series' columns.
+
+        Also return an estimate of the memory used by the columns and deques, in bytes.
+        Expired rows stay allocated until the columns are compacted.
+        """
+        with self._lock:
+            allocated = len(self.__values)
+            columns = 5 if self.__resolution_ns else 2
+            indexes = len(self.__min_indexes) + len(self.__max_indexes)
+            return allocated - self.__start, allocated, (allocated * columns + indexes) * 8
+
+    def _snapshot(self) -> tuple[array[int], array[int]]:
+        """Return copies of the live value and timestamp columns of this series."""
+        with self._lock:
+            start = self._live()
+            return self.__values[start:], self.__timestamps[start:]
 
     @property
     def sum(self) -> int:
         """Return the sum of this data series."""
         with self._lock:
-            return sum([dp.value for dp in self._pruned()])
+            return self._aggregates(self._live())[0]
 
-    def _prune(self) -> None:
+    def _live(self) -> int:
+        """
+        Return the column offset of the first live data point, with the lock held.
+
+        This prunes the series, unless it is reaped; then expired data points that are
+        not yet reaped are found by their timestamp, and left in place.
+        """
+        if not self.__reaped:
+            self._prune()
+            return self.__start
+
+        if self.__buffers:
+            self._merge_buffers()
+
+        start = self._cutoff(ttl=True)
+        if self.__base + start > self.__live_index:
+            # Data points have expired, though they are not yet reaped
+            self.__live_index = self.__base + start
+            self._version += 1
+
+        return start
+
+    def _cutoff(self, *, ttl: bool) -> int:
+        """Return the column offset of the first data point within the maxlen (and TTL)."""
+        timestamps = self.__timestamps
+        start = self.__start
+        end = len(timestamps)
+
+        # Prune by age
+        if ttl and self.__ttl:
+            ttl_in_ns = self.__ttl * 1000000  # 1 ms = 1000000 ns
+            prune_ts = time.monotonic_ns() - ttl_in_ns
+
+            if start < end and timestamps[start] < prune_ts:
+                start = bisect.bisect_left(timestamps, prune_ts, start, end)
+
+        # Prune length
+        if self.__maxlen and end - start > self.__maxlen:
+            start = end - self.__maxlen
+
+        return start
+
+    def _prune(self, *, ttl: bool = True) -> int:
         """
         Prune data from the series, that has.
 
-        - passed TTL from series, if a TTL is specified. Or,
+        - passed TTL from series, if a TTL is specified (and `ttl` is true). Or,
         - exceeds the maximum series length, ordered by time descending.
+
+        Return the number of rows expired.
         """
         with self._lock:
-            # Prune by age
-            if self.__ttl:
-                ttl_in_ns = self.__ttl * 1000000  # 1 ms = 1000000 ns
-                prune_ts = time.monotonic_ns() - ttl_in_ns
+            if self.__buffers:
+                self._merge_buffers()
+
+            start = self._cutoff(ttl=ttl)
+            expired = start - self.__start
+            if expired:
+                self._expire(start)
+
+            return expired
+
+    def _expire(self, start: int) -> None:
+        """Expire all data points before the `start` column offset."""
+        self._version += 1
+        expired = self.__values[self.__start : start]
+        self.__sum -= sum(expired)
+        if self.__resolution_ns:
+            self.__count -= sum(self.__counts[self.__start : start])
+        else:
+            self.__count -= len(expired)
+        if self.__sketch is not None:
+            for value in expired:
+                self.__sketch.remove(value)
+
+        first_index = self.__base + start
+        self.__min_head = bisect.bisect_left(self.__min_indexes, first_index, self.__min_head)
+        if self.__min_head * 2 >= len(self.__min_indexes):
+            del self.__min_indexes[: self.__min_head]
+            self.__min_head = 0
+        self.__max_head = bisect.bisect_left(self.__max_indexes, first_index, self.__max_head)
+        if self.__max_head * 2 >= len(self.__max_indexes):
+            del self.__max_indexes[: self.__max_head]
+            self.__max_head = 0
 
-                self.__data_points = [dp for dp in self.__data_points if dp.timestamp >= prune_ts]
+        if start * 2 >= len(self.__values):
+            # Compact, once at least half of the columns have expired
+            del self.__values[:start]
+            del self.__timestamps[:start]
+            if self.__resolution_ns:
+                del self.__counts[:start]
+                del self.__lows[:start]
+                del self.__highs[:start]
+                del self.__bucket_sketches[:start]
+            self.__base += start
+            start = 0
 
-            # Prune length
-            if self.__maxlen and len(self.__data_points) > self.__maxlen:
-                self.__data_points = self.__data_points[-self.__maxlen :]
+        self.__start = start
 
-    def _pruned(self, percentile: int = 0) -> list[_Point]:
-        self._prune()
+    def _pruned(self, percentile: int = 0) -> Sequence[int]:
+        """Return a copy of the live value column of this series."""
+        values = self.__values[self._live() :]
         if percentile:
-            return self._get_percentile(self.__data_points, percentile=percentile)
+            return self._get_percentile(values, percentile=percentile)
 
-        return self.__data_points
+        return values
 
-    def _get_percentile(self, data_points: list[_Point], percentile: int) -> list[_Point]:
-        """Return the requested percentile from the given data series."""
+    def _get_percentile(self, values: Sequence[int], percentile: int) -> list[int]:
+        """Return the values, in value order, up to (and including) the requested percentile."""
         if not 100 > percentile > 1:  # noqa: PLR2004
             message = f"Percentile must be an integer from 1 to 99, not {percentile}."
             raise ValueError(message)
 
         with self._lock:
-            size = len(data_points)  # Length of the data series
-            percentile_point = math.floor(size * (percentile / 100))  # percentile point
+            np = _numpy() if len(values) >= _NUMPY_MIN_LENGTH else None
+            ordered = (
+                np.sort(np.asarray(values, dtype=np.int64)).tolist() if np is not None else sorted(values)
+            )
+            # Up to the value at the rank of the percentile, as for exact quantiles
+            rank = int(percentile / 100 * (len(ordered) - 1))
 
-            return data_points[0 : percentile_point - 1]
+            return ordered[: rank + 1]
 
     def __eq__(self, other: object) -> bool:
         """Overloads the `==` operator."""
@@ -0,0 +1,378 @@
+"""The `SharedCounter` model."""
+
+from __future__ import annotations
+
+import multiprocessing
+import time
+import weakref
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any, cast
+
+from .counter import Counter
+from .series import _Series
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from multiprocessing.context import BaseContext
+
+# Shared memory layout, in int64 words
+_MAGIC = 0x54414C4C59  # "TALLY"
+_HEADER_WORDS = 8  # magic, max_series, capacity, ttl, maxlen, series count, (reserved) x 2
+_NAME_BYTES = 64  # Fixed size, NUL padded, UTF-8 series names
+_SLOT_HEADER_WORDS = 3  # head, tail, sum
+
+_MAX_SERIES, _CAPACITY, _TTL, _MAXLEN, _SERIES_COUNT = 1, 2, 3, 4, 5
+_HEAD, _TAIL, _SUM = 0, 1, 2
+
+
+class _SharedSeries:
+    """
+    A data series held in shared memory, so that it may be used by many processes.
+
+    The series is a ring buffer of `capacity` data points, in parallel value and
+    timestamp columns, with a head and tail index and a running sum. All access is under
+    the counter's cross-process lock. Data points are timestamped while that lock is
+    held, so that the ring stays in timestamp order, and expiry only drops a prefix.
+
+    Only a `maxlen` expires data points to make room. Without one, adding a data point
+    to a ring that is full of live data points raises a `ValueError`, rather than
+    silently dropping the oldest.
+    """
+
+    def __init__(self, words: memoryview, lock: Any, slot: int) -> None:  # noqa: ANN401
+        self.__words = words
+        self._lock = lock
+
+        capacity = words[_CAPACITY]
+        self.__capacity = capacity
+        self.__header = (
+            _HEADER_WORDS
+            + words[_MAX_SERIES] * (_NAME_BYTES // 8)
+            + slot * (_SLOT_HEADER_WORDS + 2 * capacity)
+        )
+        self.__values = self.__header + _SLOT_HEADER_WORDS
+        self.__timestamps = self.__values + capacity
+        self.__ttl = words[_TTL]
+        self.__maxlen = words[_MAXLEN] or None
+
+    def incr(self, value: int = 1, /, *, timestamp: int | None = None) -> None:
+        """Increment the count for this data series by default of `1` or `value`."""
+        try:
+            self._append(+(value), timestamp=timestamp)
+        except TypeError as e:
+            message = f"incr() argument must be an integer, not '{value.__class__.__name__}'"
+            raise TypeError(message) from e
+
+    def decr(self, value: int = 1, /, *, timestamp: int | None = None) -> None:
+        """Decrement the count for this data series by default of `-1` or `value`."""
+        try:
+            self._append(-(value), timestamp=timestamp)
+        except TypeError as e:
+            message = f"decr() argument must be an integer, not '{value.__class__.__name__}'"
+            raise TypeError(message) from e
+
+    def _append(self, value: int, /, *, timestamp: int | None = None) -> None:
+        value = int(value)
+        with self._lock:
+            if timestamp is None:
+                timestamp = time.monotonic_ns()
+
+            words = self.__words
+            header = self.__header
+            head, tail = words[header + _HEAD], words[header + _TAIL]
+
+            if tail - head == self.__maxlen:
+                self._expire(head + 1)  # Make room
+                head += 1
+            elif tail - head == self.__capacity:
+                self._prune()  # Data points may have passed the TTL since the last prune
+                head = words[header + _HEAD]
+                if tail - head == self.__capacity:
+                    message = (
+                        f"SharedCounter series is full, with {self.__capacity} live data points; "
+                        "give a larger 'capacity', or a 'maxlen'."
+                    )
+                    raise ValueError(message)
+
+            # Insert at the time-ordered position (a scan, only for out of order data)
+            position = tail
+            while position > head and words[self._timestamp(position - 1)] > timestamp:
+                words[self._value(position)] = words[self._value(position - 1)]
+                words[self._timestamp(position)] = words[self._timestamp(position - 1)]
+                position -= 1
+
+            words[self._value(position)] = value
+            words[self._timestamp(position)] = int(timestamp)
+            words[header + _TAIL] = tail + 1
+            words[header + _SUM] += value
+
+            self._prune()
+
+    def _value(self, index: int) -> int:
+        """Return the word offset of the value at a ring index."""
+        return self.__values + index % self.__capacity
+
+    def _timestamp(self, index: int) -> int:
+        """Return the word offset of the timestamp at a ring index."""
+        return self.__timestamps + index % self.__capacity
+
+    def _prune(self) -> None:
+        """Prune data that has passed the TTL, or exceeds the maximum length."""
+        with self._lock:
+            words = self.__words
+            head, tail = words[self.__header + _HEAD], words[self.__header + _TAIL]
+            start = head
+
+            if self.__ttl:
+                prune_ts = time.monotonic_ns() - self.__ttl * 1000000  # 1 ms = 1000000 ns
+                while start < tail and words[self._timestamp(start)] < prune_ts:
+                    start += 1
+
+            if self.__maxlen:
+                start = max(start, tail - self.__maxlen)
+            if start != head:
+                self._expire(start)
+
+    def _expire(self, start: int) -> None:
+        """Expire all data points before the `start` ring index."""
+        words = self.__words
+        head = words[self.__header + _HEAD]
+        words[self.__header + _SUM] -= sum(words[self._value(i)] for i in range(head, start))
+        words[self.__header + _HEAD] = start
+
+    def _columns(self) -> tuple[list[int], list[int]]:
+        """Prune the series, then return copies of its live value and timestamp columns."""
+        with self._lock:
+            self._prune()
+            words = self.__words
+            indexes = range(words[self.__header + _HEAD], words[self.__header + _TAIL])
+            return [words[self._value(i)] for i in indexes], [words[self._timestamp(i)] for i in indexes]
+
+    @property
+    def sum(self) -> int:
+        """Return the sum of this data series."""
+        with self._lock:
+            self._prune()
+            return self.__words[self.__header + _SUM]
+
+    def len(self) -> int:
+        """Return the length (number of data points) of this data series."""
+        with self._lock:
+            self._prune()
+            words = self.__words
+            return words[self.__header + _TAIL] - words[self.__header + _HEAD]
+
+    def mean(self) -> float:
+        """Return the mean float value for this data series."""
+        with self._lock:
+            return self.sum / self.len()
+
+    def min(self) -> int:
+        """Return the minimum value for this data series."""
+        return min(self._columns()[0])
+
+    def max(self) -> int:
+        """Return the maximum value for this data series."""
+        return max(self._columns()[0])
+
+    def quantile(self, q: float) -> float:
+        """Return the `q` quantile (from 0 to 1) of the values in this data series."""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Iterable[float]) -> list[float]:
+        """Return the quantiles (each from 0 to 1) of the values in this data series."""
+        return _Series._exact_quantiles(self._columns()[0], list(qs))  # noqa: SLF001
+
+    def age(self) -> int:
+        """Return the age of this data series, in nanoseconds."""
+        return time.monotonic_ns() - self._columns()[1][0]
+
+    def span(self) -> int:
+        """Return the time span of this data series, in nanoseconds."""
+        timestamps = self._columns()[1]
+        return timestamps[-1] - timestamps[0]
+
+    @property
+    def data(self) -> list[tuple[int, int]]:
+        """Return all series data."""
+        return list(zip(*self._columns()))
+
+    def __eq__(self, other: object) -> bool:
+        """Overloads the `==` operator."""
+        if isinstance(other, (_SharedSeries, _Series)):
+            return self.sum == other.sum
+
+        if isinstance(other, int):
+            return self.sum == other
+
+        return False
+
+    def __hash__(self) -> int:
+        """Return an identity hash, as the series sum may change."""
+        return id(self)
+
+    def __repr__(self) -> str:
+        """Return the representation of this instance."""
+        return f"{self.sum}"
+
+
+class SharedCounter:
+    """
+    A container for named data series, shared by many processes on one host.
+
+    Series are held in a `multiprocessing.shared_memory` block, and guarded by a
+    `multiprocessing` lock. Create a `SharedCounter` before forking worker processes
+    (e.g. in a pre-fork server's master process), or pass it to a `multiprocessing`
+    process, and all processes then see, and increment, the same set of series. The
+    lock is made by the default `multiprocessing` context; to pass the counter to
+    processes of another start method (such as "spawn"), give their `context`.
+
+    Memory is allocated up front: `max_series` (default 64) series, each a ring buffer of
+    `capacity` (default 4096) data points. A `maxlen` must not exceed the `capacity`.
+    Without a `maxlen`, the `capacity` must hold all live data points (those within the
+    `ttl`), or incrementing a full series raises a `ValueError`. Series names must be at
+    most 64 bytes long, in UTF-8.
+
+    Each process unmaps the block once it is done with its counter, by `close()` (or a
+    `with` block), or else once the counter is garbage collected or the process exits.
+    """
+
+    def __init__(self, *args: str, context: BaseContext | None = None, **kwargs: int) -> None:
+        ttl = Counter._get_int_or_none(kwargs, "ttl")  # noqa: SLF001
+        maxlen = Counter._get_int_or_none(kwargs, "maxlen")  # noqa: SLF001
+        max_series = Counter._get_int_or_none(kwargs, "max_series") or 64  # noqa: SLF001
+        capacity = Counter._get_int_or_none(kwargs, "capacity") or 4096  # noqa: SLF001
+        if maxlen is not None and maxlen > capacity:
+            message = f"SharedCounter maxlen must not exceed its capacity of {capacity}, not {maxlen}."
+            raise ValueError(message)
+
+        words = _HEADER_WORDS + max_series * (_NAME_BYTES // 8 + _SLOT_HEADER_WORDS + 2 * capacity)
+        self._lock = (context or multiprocessing).RLock()
+        self.__memory = SharedMemory(create=True, size=words * 8)
+        self._attach()
+
+        self._words[0] = _MAGIC
+        self._words[_MAX_SERIES] = max_series
+        self._words[_CAPACITY] = capacity
+        self._words[_TTL] = ttl or 0
+        self._words[_MAXLEN] = maxlen or 0
+
+        for k in args:
+            self._get_or_create_series(str(k))
+
+        for k, v in kwargs.items():
+            self._get_or_create_series(str(k)).incr(int(v))
+
+    def _attach(self) -> None:
+        """Map the shared memory block into this process, until closed (or collected)."""
+        self.__buffer = cast("memoryview", self.__memory.buf)
+        self._words = self.__buffer.cast("q")
+        self.__series: dict[str, _SharedSeries] = {}
+        self.__finalizer = weakref.finalize(self, _detach, self._words, self.__memory)
+
+    @property
+    def name(self) -> str:
+        """Return the name of the shared memory block."""
+        return self.__memory.name
+
+    @property
+    def data(self) -> dict[str, list[tuple[int, int]]]:
+        """Return all data for this counter."""
+        with self._lock:
+            return {name: self._get_or_create_series(name).data for name in self._names()}
+
+    @property
+    def ttl(self) -> int | None:
+        """Return the `ttl` property."""
+        return self._words[_TTL] or None
+
+    def close(self) -> None:
+        """Unmap the shared memory block from this process. Further calls do nothing."""
+        self.__series.clear()
+        self.__finalizer()
+
+    def __enter__(self) -> SharedCounter:  # noqa: PYI034
+        """Return this counter, to be closed on leaving a `with` block."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close this counter."""
+        self.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory block. Call this once, when all processes are done with it."""
+        self.__memory.unlink()
+
+    def __getattr__(self, name: str) -> _SharedSeries:
+        """
+        Return a data series for the given attribute name.
+
+        If no data series exists for the given name, then create an empty series and
+        return that.
+        """
+        if name.startswith("__"):
+            raise AttributeError(name)  # Not a series; e.g. a pickle protocol method
+
+        return self._get_or_create_series(key=name)
+
+    def __getitem__(self, key: str) -> _SharedSeries:
+        """
+        Return a data series for the given key value.
+
+        If no data series exists for the given key, then create an empty series and
+        return that.
+        """
+        return self._get_or_create_series(key=key)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle by shared memory block (and lock), for passing to other processes."""
+        return {"memory": self.__memory, "lock": self._lock}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Attach to the pickled shared memory block."""
+        self._lock = state["lock"]
+        self.__memory = state["memory"]
+        self._attach()
+
+    def _names(self) -> list[str]:
+        """Return the names of all series, in slot order."""
+        names = self.__buffer[
+            _HEADER_WORDS * 8 : (_HEADER_WORDS * 8) + self._words[_MAX_SERIES] * _NAME_BYTES
+        ]
+        return [
+            bytes(names[i * _NAME_BYTES : (i + 1) * _NAME_BYTES]).rstrip(b"\0").decode()
+            for i in range(self._words[_SERIES_COUNT])
+        ]
+
+    def _get_or_create_series(self, key: str) -> _SharedSeries:
+        series = self.__series.get(key)
+        if series is not None:
+            return series
+
+        encoded = key.encode()
+        if not 0 < len(encoded) <= _NAME_BYTES:
+            message = f"Series names must be 1 to {_NAME_BYTES} bytes long, not {len(encoded)}."
+            raise ValueError(message)
+
+        with self._lock:
+            names = self._names()
+            if key in names:
+                slot = names.index(key)  # Created by another process
+            else:
+                slot = self._words[_SERIES_COUNT]
+                if slot == self._words[_MAX_SERIES]:
+                    message = f"SharedCounter is full, with {slot} series."
+                    raise ValueError(message)
+
+                offset = _HEADER_WORDS * 8 + slot * _NAME_BYTES
+                self.__buffer[offset : offset + len(encoded)] = encoded
+                self._words[_SERIES_COUNT] = slot + 1
+
+            return self.__series.setdefault(key, _SharedSeries(self._words, self._lock, slot))
+
+
+def _detach(words: memoryview, memory: SharedMemory) -> None:
+    """Release the int64 view of a shared memory block, which must be released first, then close it."""
+    words.release()
+    memory.close()
@@ -0,0 +1,174 @@
+"""The `_Sketch` model."""
+
+from __future__ import annotations
+
+import math
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+
+class _Sketch:
+    """
+    A mergeable, streaming quantile sketch, with a relative accuracy guarantee.
+
+    This is a DDSketch: values are counted in logarithmically sized bins, so that any
+    quantile estimate is within `relative_accuracy` of the true value. Memory is bounded
+    by `max_bins` per sign; once exceeded, the bins of smallest magnitude are collapsed
+    together. Values may also be removed, which allows a sketch to follow a window.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048) -> None:
+        if not 0 < relative_accuracy < 1:
+            message = f"Relative accuracy must be between 0 and 1, not {relative_accuracy}."
+            raise ValueError(message)
+
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+
+        self.__gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.__log_gamma = math.log(self.__gamma)
+
+        self.__positive: dict[int, int] = {}
+        self.__negative: dict[int, int] = {}
+        self.__zero_count = 0
+        self.__count = 0
+
+        # Lowest bin index in each store, once bins have been collapsed
+        self.__positive_floor: int | None = None
+        self.__negative_floor: int | None = None
+
+    @property
+    def count(self) -> int:
+        """Return the number of values in this sketch."""
+        return self.__count
+
+    def add(self, value: int, count: int = 1) -> None:
+        """Add `count` occurrences of `value` to this sketch."""
+        self.__count += count
+        if value > 0:
+            self.__positive_floor = self._add_to(
+                self.__positive, self._index(value), count, self.__positive_floor
+            )
+        elif value < 0:
+            self.__negative_floor = self._add_to(
+                self.__negative, self._index(-value), count, self.__negative_floor
+            )
+        else:
+            self.__zero_count += count
+
+    def remove(self, value: int, count: int = 1) -> None:
+        """Remove `count` occurrences of a previously added `value` from this sketch."""
+        self.__count -= count
+        if value > 0:
+            self._remove_from(self.__positive, self._index(value), count, self.__positive_floor)
+        elif value < 0:
+            self._remove_from(self.__negative, self._index(-value), count, self.__negative_floor)
+        else:
+            self.__zero_count -= count
+
+    def merge(self, other: _Sketch) -> None:
+        """Merge another sketch, of the same relative accuracy, into this sketch."""
+        if other.relative_accuracy != self.relative_accuracy:
+            message = "Cannot merge sketches of differing relative accuracy."
+            raise ValueError(message)
+
+        for index, count in other.__positive.items():  # noqa: SLF001
+            self.__positive_floor = self._add_to(self.__positive, index, count, self.__positive_floor)
+        for index, count in other.__negative.items():  # noqa: SLF001
+            self.__negative_floor = self._add_to(self.__negative, index, count, self.__negative_floor)
+        self.__zero_count += other.__zero_count  # noqa: SLF001
+        self.__count += other.__count  # noqa: SLF001
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the state of this sketch, as a JSON serializable dictionary."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_bins": self.max_bins,
+            "positive": sorted(self.__positive.items()),
+            "negative": sorted(self.__negative.items()),
+            "zero_count": self.__zero_count,
+            "floors": [self.__positive_floor, self.__negative_floor],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> _Sketch:
+        """Return a sketch, with the state given by `to_dict()`."""
+        sketch = cls(data["relative_accuracy"], data["max_bins"])
+        sketch._set_state(data)  # noqa: SLF001
+        return sketch
+
+    def _set_state(self, data: Mapping[str, Any]) -> None:
+        """Replace the state of this sketch with that given by `to_dict()`."""
+        self.__positive = {int(index): int(count) for index, count in data["positive"]}
+        self.__negative = {int(index): int(count) for index, count in data["negative"]}
+        self.__zero_count = int(data["zero_count"])
+        self.__count = self.__zero_count + sum(self.__positive.values()) + sum(self.__negative.values())
+        self.__positive_floor, self.__negative_floor = data["floors"]
+
+    def quantile(self, q: float) -> float:
+        """Return an estimate of the `q` quantile, where `q` is from 0 to 1."""
+        if not 0 <= q <= 1:
+            message = f"Quantile must be from 0 to 1, not {q}."
+            raise ValueError(message)
+
+        if not self.__count:
+            message = "quantile() arg is an empty sequence"
+            raise ValueError(message)
+
+        rank = q * (self.__count - 1)
+        seen = 0
+
+        # Most negative values first, then zeros, then positive values
+        for index in sorted(self.__negative, reverse=True):
+            seen += self.__negative[index]
+            if seen > rank:
+                return -self._value(index)
+
+        seen += self.__zero_count
+        if seen > rank:
+            return 0.0
+
+        for index in sorted(self.__positive):  # pragma: no branch
+            seen += self.__positive[index]
+            if seen > rank:
+                return self._value(index)
+
+        raise AssertionError  # pragma: no cover
+
+    def _index(self, magnitude: int) -> int:
+        """Return the bin index for a (positive) value magnitude."""
+        return math.ceil(math.log(magnitude) / self.__log_gamma)
+
+    def _value(self, index: int) -> float:
+        """Return the representative value of a bin."""
+        return 2 * self.__gamma**index / (self.__gamma + 1)
+
+    def _add_to(self, bins: dict[int, int], index: int, count: int, floor: int | None) -> int | None:
+        """Add a count to a bin store, and return the store's (new) floor index."""
+        if floor is not None and index < floor:
+            index = floor
+
+        bins[index] = bins.get(index, 0) + count
+
+        if len(bins) > self.max_bins:
+            # Collapse the bins of smallest magnitude into one
+            indexes = sorted(bins)
+            floor = indexes[-self.max_bins]
+            bins[floor] += sum(bins.pop(i) for i in indexes[: -self.max_bins])
+
+        return floor
+
+    @staticmethod
+    def _remove_from(bins: dict[int, int], index: int, count: int, floor: int | None) -> None:
+        """Remove a count from a bin store."""
+        if floor is not None and index < floor:
+            index = floor
+
+        remaining = bins[index] - count
+        if remaining:
+            bins[index] = remaining
+        else:
+            del bins[index]
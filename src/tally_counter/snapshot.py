@@ -0,0 +1,328 @@
+"""Binary snapshots, and write-ahead logs, of counter data."""
+
+from __future__ import annotations
+
+import glob
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, NamedTuple
+
+from .series import _Rows, _shift
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterator, Mapping, Sequence
+
+# File header: magic, version, clock offset, ttl, maxlen, resolution, accuracy, log ID, series count
+_SNAPSHOT_HEADER = struct.Struct("<8sHqqqqdqI")
+_SNAPSHOT_MAGIC = b"TALLYSNP"
+_SNAPSHOT_VERSION = 4
+
+# Series header: name length, labels length, row count, sum (as a 128-bit integer), value
+# count, min and max deque lengths. Followed by the name, then the labels of a labelled child
+# (as JSON), then each row column, then the min and max deque offsets.
+_SERIES_HEADER = struct.Struct("<HHq16sqqq")
+
+# Log record header: key length, labels length, value count. Followed by the key, the labels
+# of a labelled child (as JSON), then the values and timestamps.
+_RECORD_HEADER = struct.Struct("<HHI")
+
+
+class _Snapshot(NamedTuple):
+    """The options and series row columns of a counter, read from a snapshot file."""
+
+    ttl: int | None
+    maxlen: int | None
+    resolution: int | None
+    accuracy: float | None
+    log_id: int
+    rows: dict[str, _Rows]
+    children: dict[tuple[str, tuple[tuple[str, Hashable], ...]], _Rows]
+
+
+def _clock_offset() -> int:
+    """Return the offset of the monotonic clock from the wall clock, in nanoseconds."""
+    return time.time_ns() - time.monotonic_ns()
+
+
+def _to_bytes(column: array[int]) -> bytes:
+    """Return the little-endian bytes of an int64 column."""
+    if sys.byteorder == "big":  # pragma: no cover
+        column = array("q", column)
+        column.byteswap()
+
+    return column.tobytes()
+
+
+def _from_bytes(data: bytes | memoryview) -> array[int]:
+    """Return an int64 column from its little-endian bytes."""
+    column = array("q")
+    column.frombytes(data)
+    if sys.byteorder == "big":  # pragma: no cover
+        column.byteswap()
+
+    return column
+
+
+def _to_json(labels: tuple[tuple[str, Hashable], ...]) -> bytes:
+    """Return the JSON bytes of the label set of a labelled child, or none for a series."""
+    return json.dumps([list(label) for label in labels]).encode() if labels else b""
+
+
+def _from_json(data: bytes) -> tuple[tuple[str, Hashable], ...]:
+    """Return a label set from its JSON bytes."""
+    return tuple((name, value) for name, value in json.loads(data)) if data else ()
+
+
+def _write_snapshot(  # noqa: PLR0913
+    path: str | os.PathLike[str],
+    *,
+    ttl: int | None,
+    maxlen: int | None,
+    resolution: int | None,
+    accuracy: float | None,
+    log_id: int = 0,
+    rows: Mapping[str, _Rows],
+    children: Mapping[tuple[str, tuple[tuple[str, Hashable], ...]], _Rows] | None = None,
+) -> None:
+    """
+    Write a snapshot file, atomically replacing any existing file at `path`.
+
+    The `children` rows are those of labelled children, by series key and label set.
+    Label values must be JSON serializable.
+
+    Timestamps are monotonic clock values, so the offset of that clock from the wall
+    clock is also written, for timestamps to be rebased when they are read. The ID of
+    the last rotated write-ahead log covered by the snapshot is written with it.
+
+    The file is synced to disk before it replaces `path`, and the directory after, so
+    that a covered log may then be deleted.
+    """
+    entries = [(key, b"", series) for key, series in rows.items()]
+    entries += [(key, _to_json(labels), series) for (key, labels), series in (children or {}).items()]
+
+    path = Path(path)
+    temporary = path.with_name(f"{path.name}.tmp")
+    with temporary.open("wb") as f:
+        f.write(
+            _SNAPSHOT_HEADER.pack(
+                _SNAPSHOT_MAGIC,
+                _SNAPSHOT_VERSION,
+                _clock_offset(),
+                ttl or 0,
+                maxlen or 0,
+                resolution or 0,
+                accuracy or 0.0,
+                log_id,
+                len(entries),
+            )
+        )
+        for key, labels, series in entries:
+            name = key.encode()
+            f.write(
+                _SERIES_HEADER.pack(
+                    len(name),
+                    len(labels),
+                    len(series.columns[0]),
+                    series.total.to_bytes(16, "little", signed=True),
+                    series.length,
+                    len(series.min_offsets),
+                    len(series.max_offsets),
+                )
+            )
+            f.write(name)
+            f.write(labels)
+            f.writelines(
+                _to_bytes(column) for column in (*series.columns, series.min_offsets, series.max_offsets)
+            )
+
+        f.flush()
+        os.fsync(f.fileno())
+
+    temporary.replace(path)
+    _fsync_directory(path.parent)
+
+
+def _fsync_directory(path: Path) -> None:
+    """Sync a directory to disk, so that a file renamed into it survives a crash of the host."""
+    try:
+        descriptor = os.open(path, os.O_RDONLY)
+    except OSError:  # pragma: no cover
+        return  # Directories cannot be opened on Windows
+
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def _read_snapshot(path: str | os.PathLike[str]) -> _Snapshot:
+    """
+    Read a snapshot file, through a memory map, and rebase its timestamps to this boot.
+
+    Each timestamp column is rebased in a single pass (with NumPy, if installed). Time
+    bucket start times are rebased by a whole number of buckets.
+    """
+    with Path(path).open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        magic, version, clock_offset, ttl, maxlen, resolution, accuracy, log_id, count = (
+            _SNAPSHOT_HEADER.unpack_from(data)
+        )
+        if magic != _SNAPSHOT_MAGIC or version != _SNAPSHOT_VERSION:
+            message = f"'{os.fspath(path)}' is not a version {_SNAPSHOT_VERSION} counter snapshot"
+            raise ValueError(message)
+
+        shift = clock_offset - _clock_offset()
+        if resolution:
+            # Rebase by whole time buckets, so that bucket start times stay on the bucket grid
+            shift -= shift % (resolution * 1000000)  # 1 ms = 1000000 ns
+        width = 5 if resolution else 2  # Row columns per series
+        offset = _SNAPSHOT_HEADER.size
+        rows: dict[str, _Rows] = {}
+        children: dict[tuple[str, tuple[tuple[str, Hashable], ...]], _Rows] = {}
+        for _ in range(count):
+            name_length, labels_length, length, total, values, min_length, max_length = (
+                _SERIES_HEADER.unpack_from(data, offset)
+            )
+            offset += _SERIES_HEADER.size
+            key = bytes(data[offset : offset + name_length]).decode()
+            offset += name_length
+            labels = _from_json(data[offset : offset + labels_length])
+            offset += labels_length
+
+            with memoryview(data) as view:
+                columns = []
+                for column_length in (*(length,) * width, min_length, max_length):
+                    columns.append(_from_bytes(view[offset : offset + column_length * 8]))
+                    offset += column_length * 8
+
+            _shift(columns[1], shift)
+            series = _Rows(
+                columns[:width], int.from_bytes(total, "little", signed=True), values, *columns[width:]
+            )
+            if labels:
+                children[key, labels] = series
+            else:
+                rows[key] = series
+
+    return _Snapshot(
+        ttl or None, maxlen or None, resolution or None, accuracy or None, log_id, rows, children
+    )
+
+
+class _WriteAheadLog:
+    """
+    An append-only log of the values added to counter series.
+
+    Each record holds a series key (and the label set of a labelled child), and the
+    values and timestamps added to the series. Records
+    are flushed to the operating system as they are written, so they survive a crash
+    of the process (but not necessarily of the host).
+
+    The log is rotated, rather than truncated, for each snapshot: its records are
+    renamed to a log of their own, with an increasing ID, which is only deleted once
+    a snapshot covering it has been written.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._lock = threading.Lock()
+        self.path = path
+        self.__file: BinaryIO = Path(path).open("ab")  # noqa: SIM115
+        self.__clock_offset = _clock_offset()
+        self.__log_id = max((log_id for log_id, _ in _rotated_logs(path)), default=0)
+
+    def write(
+        self,
+        key: str,
+        values: Sequence[int],
+        timestamps: Sequence[int],
+        labels: tuple[tuple[str, Hashable], ...] = (),
+    ) -> None:
+        """Append a record of the values (and timestamps) added to a series, or to its labelled child."""
+        name = key.encode()
+        encoded = _to_json(labels)
+        with self._lock:
+            self.__file.write(_RECORD_HEADER.pack(len(name), len(encoded), len(values)))
+            self.__file.write(name)
+            self.__file.write(encoded)
+            self.__file.write(_to_bytes(array("q", values)))
+            # Wall clock timestamps, so that the log may be replayed after a reboot
+            self.__file.write(_to_bytes(array("q", [ts + self.__clock_offset for ts in timestamps])))
+            self.__file.flush()
+
+    def rotate(self) -> int:
+        """
+        Move all records to a rotated log, and continue with an empty log.
+
+        Return the ID of the rotated log, to be written with the snapshot that covers it.
+        """
+        path = Path(self.path)
+        with self._lock:
+            self.__file.close()
+            self.__log_id = max(self.__log_id + 1, time.time_ns())
+            path.replace(path.with_name(f"{path.name}.{self.__log_id}"))
+            self.__file = path.open("ab")
+            return self.__log_id
+
+    def discard(self, log_id: int) -> None:
+        """Delete the rotated logs up to (and including) an ID, once covered by a snapshot."""
+        for rotated_id, rotated in _rotated_logs(self.path):
+            if rotated_id <= log_id:
+                rotated.unlink()
+
+    def close(self) -> None:
+        """Close the log file."""
+        with self._lock:
+            self.__file.close()
+
+
+def _rotated_logs(path: str | os.PathLike[str]) -> list[tuple[int, Path]]:
+    """Return the ID and path of each rotated log of a write-ahead log, in order."""
+    path = Path(path)
+    prefix = f"{path.name}."
+    logs = [
+        (int(rotated.name[len(prefix) :]), rotated)
+        for rotated in path.parent.glob(f"{glob.escape(prefix)}*")
+        if rotated.name[len(prefix) :].isdigit()
+    ]
+    return sorted(logs)
+
+
+def _read_wal(
+    path: str | os.PathLike[str],
+) -> Iterator[tuple[str, tuple[tuple[str, Hashable], ...], array[int], array[int]]]:
+    """
+    Yield the series key, label set, values and (monotonic) timestamps of each write-ahead log record.
+
+    The label set is empty for a record of a series, rather than of a labelled child.
+
+    A truncated final record, as from a crash part way through a write, is ignored.
+    """
+    data = Path(path).read_bytes()
+
+    shift = -_clock_offset()
+    offset = 0
+    while offset + _RECORD_HEADER.size <= len(data):
+        name_length, labels_length, length = _RECORD_HEADER.unpack_from(data, offset)
+        end = offset + _RECORD_HEADER.size + name_length + labels_length + length * 16
+        if end > len(data):
+            break
+
+        offset += _RECORD_HEADER.size
+        key = data[offset : offset + name_length].decode()
+        offset += name_length
+        labels = _from_json(data[offset : offset + labels_length])
+        offset += labels_length
+        values = _from_bytes(data[offset : offset + length * 8])
+        offset += length * 8
+        timestamps = _from_bytes(data[offset : offset + length * 8])
+        _shift(timestamps, shift)
+        offset += length * 8
+
+        yield key, labels, values, timestamps
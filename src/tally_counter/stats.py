@@ -0,0 +1,80 @@
+"""Self-instrumentation, of counter data series."""
+
+from __future__ import annotations
+
+import time
+
+from typing import Any
+
+from .series import _Series
+
+
+class _SeriesStats:
+    """Lock wait and prune statistics of one data series, only updated with its lock held."""
+
+    __slots__ = ("expired", "lock_wait_ns", "lock_waits", "prune_ns", "prunes")
+
+    def __init__(self) -> None:
+        self.lock_waits = 0
+        self.lock_wait_ns = 0
+        self.prunes = 0
+        self.prune_ns = 0
+        self.expired = 0
+
+
+class _TimedLock:
+    """
+    A lock wrapper, that counts and times the acquisitions that had to wait.
+
+    An uncontended acquisition is a single non-blocking attempt, and is not timed.
+    """
+
+    def __init__(self, lock: Any, stats: _SeriesStats) -> None:  # noqa: ANN401
+        self.__lock = lock
+        self.__stats = stats
+
+    def __enter__(self) -> bool:
+        if not self.__lock.acquire(blocking=False):
+            start = time.perf_counter_ns()
+            self.__lock.acquire()
+            # Recorded with the lock held, so no other lock is needed
+            self.__stats.lock_waits += 1
+            self.__stats.lock_wait_ns += time.perf_counter_ns() - start
+
+        return True
+
+    def __exit__(self, *args: object) -> None:
+        self.__lock.release()
+
+
+class _InstrumentedSeries(_Series):
+    """A data series mixin, that records the series' lock waits and prunes."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        self._series_stats = _SeriesStats()
+        super().__init__(*args, **kwargs)
+
+        if hasattr(self._lock, "acquire"):  # Not e.g. the `nullcontext` of an asyncio series
+            self._lock = _TimedLock(self._lock, self._series_stats)
+
+    def _prune(self, *, ttl: bool = True) -> int:
+        start = time.perf_counter_ns()
+        expired = super()._prune(ttl=ttl)
+
+        stats = self._series_stats
+        stats.prunes += 1
+        stats.prune_ns += time.perf_counter_ns() - start
+        stats.expired += expired
+        return expired
+
+
+_INSTRUMENTED_CLASSES: dict[type[_Series], type[_Series]] = {}
+
+
+def _instrumented(series_class: type[_Series]) -> type[_Series]:
+    """Return a subclass of a series class, that records its lock waits and prunes."""
+    if series_class not in _INSTRUMENTED_CLASSES:
+        name = f"_Instrumented{series_class.__name__[1:]}"
+        _INSTRUMENTED_CLASSES[series_class] = type(name, (_InstrumentedSeries, series_class), {})
+
+    return _INSTRUMENTED_CLASSES[series_class]
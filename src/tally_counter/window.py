@@ -0,0 +1,71 @@
+"""The `_Window` model."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .series import _Series
+
+
+class _Window:
+    """
+    A read-only view of the data points of a series, within a time range.
+
+    The range runs from `start_ns` (inclusive) to `end_ns` (exclusive), where a bound of
+    `None` is open. Its bounds are found by bisecting the timestamp column of the
+    series on each query, so the series is neither copied nor pruned. Data points that
+    have passed the TTL (or exceed the maxlen) of the series are left out, as for the
+    series itself.
+    """
+
+    def __init__(self, series: _Series, start_ns: int | None, end_ns: int | None) -> None:
+        self.__series = series
+        self.__start_ns = start_ns
+        self.__end_ns = end_ns
+
+    @property
+    def start_ns(self) -> int | None:
+        """Return the (inclusive) start time of this window, if any."""
+        return self.__start_ns
+
+    @property
+    def end_ns(self) -> int | None:
+        """Return the (exclusive) end time of this window, if any."""
+        return self.__end_ns
+
+    @property
+    def sum(self) -> int:
+        """Return the sum of the data points in this window."""
+        return self.__series._range(self.__start_ns, self.__end_ns)[0]  # noqa: SLF001
+
+    def len(self) -> int:
+        """Return the number of data points in this window."""
+        return self.__series._range(self.__start_ns, self.__end_ns)[1]  # noqa: SLF001
+
+    def mean(self) -> float:
+        """Return the mean value of the data points in this window."""
+        total, count, _, _ = self.__series._range(self.__start_ns, self.__end_ns)  # noqa: SLF001
+        return total / count
+
+    def min(self) -> int:
+        """Return the minimum value of the data points in this window."""
+        low = self.__series._range(self.__start_ns, self.__end_ns, extrema=True)[2]  # noqa: SLF001
+        if low is None:
+            message = "min() arg is an empty sequence"
+            raise ValueError(message)
+
+        return low
+
+    def max(self) -> int:
+        """Return the maximum value of the data points in this window."""
+        high = self.__series._range(self.__start_ns, self.__end_ns, extrema=True)[3]  # noqa: SLF001
+        if high is None:
+            message = "max() arg is an empty sequence"
+            raise ValueError(message)
+
+        return high
+
+    def __repr__(self) -> str:
+        """Return the representation of this instance."""
+        return f"{self.sum}"
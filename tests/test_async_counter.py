@@ -0,0 +1,115 @@
+"""`AsyncCounter` unit tests."""
+
+import asyncio
+import math
+
+import pytest
+
+
+def test_attribute_and_item_access():
+    from tally_counter import AsyncCounter
+
+    counter = AsyncCounter("foo", bar=10)
+    counter.foo.incr(5)
+    counter["bar"].decr(3)
+
+    assert counter.foo == 5
+    assert counter["bar"] == 7
+    assert counter.baz == 0
+
+
+def test_series_are_not_locked():
+    from tally_counter import AsyncCounter
+    from tally_counter.async_counter import _AsyncSeries
+
+    counter = AsyncCounter()
+
+    assert isinstance(counter.foo, _AsyncSeries)
+    assert not hasattr(counter.foo._lock, "acquire")
+
+
+def test_async_queries():
+    from tally_counter import AsyncCounter
+
+    async def main():
+        counter = AsyncCounter()
+        for i in range(100, 0, -1):
+            counter.latency.incr(i, timestamp=1000 + i)
+
+        series = counter.latency
+        assert await series.sum_async() == 5050
+        assert await series.len_async() == 100
+        assert await series.mean_async() == 50.5
+        assert await series.mean_async(percentile=50) == 25.5
+        assert await series.min_async() == 1
+        assert await series.max_async() == 100
+        assert await series.max_async(percentile=95) == 95
+        assert await series.quantile_async(0.5) == 50.0
+        assert await series.quantiles_async([0, 1]) == [1.0, 100.0]
+        assert (await series.data_async())[:2] == [(1, 1001), (2, 1002)]
+
+    asyncio.run(main())
+
+
+def test_async_quantiles_from_sketch():
+    from tally_counter import AsyncCounter
+
+    async def main():
+        counter = AsyncCounter(accuracy=0.01)
+        for i in range(1, 1001):
+            counter.latency.incr(i)
+
+        assert math.isclose(await counter.latency.quantile_async(0.99), 990, rel_tol=0.01)
+
+    asyncio.run(main())
+
+
+def test_async_quantile_invalid():
+    from tally_counter import AsyncCounter
+
+    async def main():
+        counter = AsyncCounter(foo=1)
+        await counter.foo.quantile_async(2)
+
+    with pytest.raises(ValueError, match="Quantile must be from 0 to 1, not 2."):
+        asyncio.run(main())
+
+
+def test_async_series_given_lock():
+    import threading
+
+    from tally_counter.async_counter import _AsyncSeries
+
+    lock = threading.RLock()
+
+    assert _AsyncSeries(1, lock=lock)._lock is lock
+
+
+def test_run_reaper(mocker):
+    from tally_counter import AsyncCounter
+
+    mocker.patch("time.monotonic_ns", return_value=6_000_000)
+
+    counter = AsyncCounter(ttl=2, reap_interval=1)
+    counter.requests.incr(1, timestamp=0)
+    counter.requests.incr(5, timestamp=5_000_000)
+
+    assert counter._reaper is None  # No reaper thread
+
+    async def main():
+        task = asyncio.create_task(counter.run_reaper())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+
+    assert counter.requests._footprint()[0] == 1  # Reaped
+
+
+def test_run_reaper_requires_interval():
+    from tally_counter import AsyncCounter
+
+    with pytest.raises(ValueError, match="run_reaper\\(\\) requires a counter with a 'reap_interval'"):
+        asyncio.run(AsyncCounter().run_reaper())
@@ -194,3 +194,428 @@ def test_thread_safety(patch_time):  # noqa: ARG001
 
     # Check if the shared instance has the expected length
     assert counter.cnt.len() == 230001
+
+
+def test_init__valid_accuracy_kwarg():
+    from tally_counter import Counter
+
+    counter = Counter(accuracy="0.02")
+    for i in range(1, 101):
+        counter.latency.incr(i)
+
+    assert counter.latency._Series__sketch.relative_accuracy == 0.02
+    assert 49 <= counter.latency.quantile(0.5) <= 51
+
+
+def test_init__invalid_accuracy_kwarg():
+    from tally_counter import Counter
+
+    with pytest.raises(TypeError, match="'float' expected for argument 'accuracy'"):
+        Counter(accuracy="foo")
+
+
+def test_init__resolution_kwarg(mocker):
+    from tally_counter import Counter
+
+    mocker.patch("time.monotonic_ns", return_value=1_500_000_000)
+
+    counter = Counter(ttl=60000, resolution=1000)
+    for _ in range(100):
+        counter.requests.incr()
+
+    assert counter.requests.data == [(100, 1_000_000_000)]
+    assert counter.requests.len() == 100
+
+
+def test_series_locks():
+    from tally_counter import Counter
+
+    counter = Counter("foo", "bar")
+
+    # Each series has its own lock, distinct from the counter lock
+    assert counter.foo._lock is not counter.bar._lock
+    assert counter.foo._lock is not counter._lock
+    assert counter.baz._lock is not counter._lock
+
+
+def test_thread_safety__disjoint_series(patch_time):  # noqa: ARG001
+    from tally_counter import Counter
+
+    counter = Counter()
+
+    def thread_function(key: str):
+        for _ in range(2000):
+            counter[key].incr()
+
+    threads = [threading.Thread(target=thread_function, args=(f"series_{i % 4}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.data.keys() == {"series_0", "series_1", "series_2", "series_3"}
+    for i in range(4):
+        assert counter[f"series_{i}"].len() == 4000
+
+
+def test_update__mapping(mocker):
+    from tally_counter import Counter
+
+    mocker.patch("time.monotonic_ns", return_value=1000)
+
+    counter = Counter(a=1)
+    counter.update({"a": 3, "b": 5})
+
+    assert counter.data == {"a": [(1, 1000), (3, 1000)], "b": [(5, 1000)]}
+
+
+def test_update__iterable(mocker):
+    from tally_counter import Counter
+
+    mocker.patch("time.monotonic_ns", return_value=3000)
+
+    counter = Counter()
+    counter.update([("a", 3, 1000), ("b", 5, 2000), ("a", 7, None)])
+
+    assert counter.data == {"a": [(3, 1000), (7, 3000)], "b": [(5, 2000)]}
+
+
+def test_init__buffer_size_kwarg():
+    from tally_counter import Counter
+
+    counter = Counter(buffer_size=100)
+    counter.requests.incr()
+    counter.requests.incr()
+
+    assert counter.requests.len() == 2
+    assert counter.requests._Series__buffer_size == 100
+
+
+def test_summary():
+    from tally_counter import Counter
+
+    counter = Counter("errors")
+    counter.requests.incr_many([10, 30, 20])
+
+    assert counter.summary() == {
+        "errors": (0, 0, None, None, None),
+        "requests": (60, 3, 20.0, 10, 30),
+    }
+
+
+def test_summary__keys_and_stats():
+    from tally_counter import Counter
+
+    counter = Counter()
+    counter.requests.incr_many([10, 30, 20])
+    counter.errors.incr(5)
+
+    assert counter.summary(["requests", "missing"], stats=("max", "len")) == {"requests": (30, 3)}
+    assert "missing" not in counter.data  # Not created
+
+
+def test_summary__pruned(mocker):
+    from tally_counter import Counter
+
+    mocker.patch("time.monotonic_ns", return_value=3_000_000)
+
+    counter = Counter(ttl=2)
+    counter.requests.incr_many([10, 30, 20], [0, 2_000_000, 3_000_000])
+
+    assert counter.summary(stats=["sum", "min"]) == {"requests": (50, 20)}
+
+
+def test_summary__resolution():
+    from tally_counter import Counter
+
+    counter = Counter(resolution=1000)
+    counter.latency.incr_many([10, 30, 20])
+
+    assert counter.summary() == {"latency": (60, 3, 20.0, 10, 30)}
+
+
+def test_summary__unknown_stat():
+    from tally_counter import Counter
+
+    with pytest.raises(ValueError, match="Unknown summary statistic 'p99'; expected any of sum, len, mean"):
+        Counter().summary(stats=["sum", "p99"])
+
+
+def test_reap(mocker):
+    from tally_counter import Counter
+
+    mocker.patch("time.monotonic_ns", return_value=1_000_000)
+
+    counter = Counter(ttl=2)
+    counter.requests.incr(1, timestamp=0)
+    counter.errors.incr(1, timestamp=1_000_000)
+
+    counter.errors.labels(status=500).incr(1, timestamp=0)
+
+    mocker.patch("time.monotonic_ns", return_value=2_500_000)
+    assert counter.reap() == 2
+    assert counter.reap_interval is None
+    assert counter._reaper is None
+    counter.stop_reaper()  # No reaper to stop
+
+
+def test_reaper(mocker):
+    import time
+
+    from tally_counter import Counter
+
+    mocker.patch("time.monotonic_ns", return_value=6_000_000)
+
+    counter = Counter(ttl=2, reap_interval=1)
+    counter.requests.incr(1, timestamp=0)
+    counter.requests.incr(5, timestamp=5_000_000)
+
+    # Writes do not expire data by TTL, but reads skip expired data
+    assert counter.requests._footprint()[0] == 2
+    assert counter.requests.sum == 5
+
+    for _ in range(500):
+        if counter.requests._footprint()[0] == 1:
+            break
+        time.sleep(0.01)
+
+    assert counter.requests._footprint()[0] == 1  # Reaped
+    assert counter._reaper.name == "tally-counter-reaper"
+
+    counter.stop_reaper()
+    counter._reaper.join(5)
+    assert not counter._reaper.is_alive()
+
+
+def test_reaper__logs_errors(mocker, caplog):
+    import time
+
+    from tally_counter import Counter
+
+    def on_evict(key, _series):
+        raise RuntimeError(key)
+
+    mocker.patch("time.monotonic_ns", return_value=0)
+    counter = Counter("requests", idle_ttl=1, reap_interval=1, on_evict=on_evict)
+    mocker.patch("time.monotonic_ns", return_value=2_000_000)
+
+    for _ in range(500):
+        if caplog.records:
+            break
+        time.sleep(0.01)
+
+    assert caplog.records[0].getMessage() == "Failed to reap counter"
+    assert counter.data == {}
+    assert counter._reaper.is_alive()  # Still reaping
+    counter.stop_reaper()
+
+
+def test_stop_reaper__expires_inline(mocker):
+    from tally_counter import Counter
+
+    mocker.patch("time.monotonic_ns", return_value=6_000_000)
+
+    counter = Counter(ttl=2, reap_interval=60000)
+    counter.requests.incr(1, timestamp=0)
+    counter.requests.labels(status=500).incr(1, timestamp=0)
+    counter.requests.incr(5, timestamp=5_000_000)
+    assert counter.requests._footprint()[0] == 2  # Not yet reaped
+
+    counter.stop_reaper()
+    assert counter.requests._footprint()[0] == 1
+    assert counter.requests.labels(status=500)._footprint()[0] == 0
+
+    # Series then expire data as it is added, as without a reaper
+    counter.errors.incr(1, timestamp=0)
+    counter.errors.incr(1, timestamp=5_000_000)
+    assert counter.errors._footprint()[0] == 1
+
+
+@pytest.mark.parametrize("reap_interval", [0, -5])
+def test_reap_interval__not_positive(reap_interval):
+    from tally_counter import Counter
+
+    with pytest.raises(ValueError, match=f"Reap interval must be positive, not {reap_interval}."):
+        Counter(reap_interval=reap_interval)
+
+
+def test_reaper__stops_with_counter():
+    import gc
+
+    from tally_counter import Counter
+
+    counter = Counter(ttl=1000, reap_interval=1)
+    reaper = counter._reaper
+
+    del counter
+    gc.collect()
+    reaper.join(5)
+
+    assert not reaper.is_alive()
+
+
+def test_max_series():
+    from tally_counter import Counter
+
+    evicted = []
+    counter = Counter(
+        "a", "b", "c", max_series=2, on_evict=lambda key, series: evicted.append((key, series.sum))
+    )
+    assert counter.max_series == 2
+    assert evicted == [("a", 0)]  # Initial series beyond the limit are evicted at once
+
+    counter.b.incr(1)
+    counter.c.incr(2)
+    counter.b.incr(3)  # "b" is now the most recently used
+    counter["d"].incr(4)
+
+    assert evicted == [("a", 0), ("c", 2)]
+    assert counter.data.keys() == {"b", "d"}
+    assert counter.b.sum == 4
+
+    stats = counter.stats()
+    assert stats.series_evicted == 2
+
+    assert Counter().stats().data.keys() == {"points", "points_allocated", "bytes"}
+
+
+def test_max_series__children():
+    from tally_counter import Counter
+
+    evicted = []
+    counter = Counter(max_series=4, on_evict=lambda key, _series: evicted.append(key))
+    counter.a.incr()
+    counter.b.labels(status=200).incr()
+    counter.c.incr()
+    counter.b.labels(status=500).incr()  # 5 series and children, so "a" is evicted
+
+    assert evicted == ["a"]
+    assert counter.data.keys() == {"b", "c"}
+
+    series = counter.c
+    counter.b.labels(status=404)  # "b" is used, so "c" is evicted
+    series.labels(status=200)  # Not counted, as "c" was evicted
+
+    assert evicted == ["a", "c"]
+    assert counter.data.keys() == {"b"}
+    with pytest.raises(ValueError, match="Series has the maximum of 3 labelled children."):
+        counter.b.labels(status=503)
+
+    counter.d.incr()  # "b" and its 3 children are evicted, as the least recently used
+    assert evicted == ["a", "c", "b"]
+    counter.e.labels(status=200)
+    assert evicted == ["a", "c", "b"]
+
+
+def test_idle_ttl__children(mocker):
+    from tally_counter import Counter
+
+    mocker.patch("time.monotonic_ns", return_value=0)
+    counter = Counter("a", max_series=3, idle_ttl=10)
+    counter.b.labels(status=200)
+
+    mocker.patch("time.monotonic_ns", return_value=20_000_000)
+    counter.c.labels(status=200)  # "a" and "b" are idle, so evicted with the child of "b"
+    counter.d.incr()
+
+    assert counter.data.keys() == {"c", "d"}
+
+
+def test_idle_ttl__held_reference(mocker):
+    from tally_counter import Counter
+
+    mocker.patch("time.monotonic_ns", return_value=0)
+    counter = Counter(idle_ttl=50, resolution=5)
+    series = counter.requests
+    child = counter.errors.labels(status=500)
+    for now in range(0, 100_000_000, 10_000_000):
+        mocker.patch("time.monotonic_ns", return_value=now)
+        series.incr()
+        child.incr()
+
+    counter.reap()
+    assert counter.requests.sum == 10
+    assert counter.errors.labels(status=500).sum == 10
+
+    mocker.patch("time.monotonic_ns", return_value=200_000_000)
+    counter.reap()
+    assert counter.data == {}
+
+
+def test_max_series__without_callback():
+    from tally_counter import Counter
+
+    counter = Counter(max_series=1, instrument=True)
+    counter.a.incr()
+    counter.a.incr()
+    counter.b.incr()
+
+    assert list(counter.data) == ["b"]
+    assert counter.stats().series_created == 2
+    assert counter.idle_ttl is None
+
+
+def test_idle_ttl(mocker):
+    from tally_counter import Counter
+
+    mocker.patch("time.monotonic_ns", return_value=0)
+
+    evicted = []
+    counter = Counter("a", idle_ttl=10, on_evict=lambda key, _series: evicted.append(key))
+    assert counter.idle_ttl == 10
+    assert counter.max_series is None
+
+    mocker.patch("time.monotonic_ns", return_value=5_000_000)
+    counter.b.incr()
+
+    mocker.patch("time.monotonic_ns", return_value=10_000_000)
+    counter.c.incr()  # "a" has been idle for 10ms, and is not yet evicted
+    assert evicted == []
+
+    mocker.patch("time.monotonic_ns", return_value=11_000_000)
+    counter.c.incr()
+    assert evicted == ["a"]
+
+    mocker.patch("time.monotonic_ns", return_value=20_000_000)
+    assert counter.reap() == 0  # Evicts "b", then reaps "c"
+    assert evicted == ["a", "b"]
+    assert list(counter.data) == ["c"]
+
+    mocker.patch("time.monotonic_ns", return_value=40_000_000)
+    counter.reap()
+    assert counter.data == {}
+    assert counter.stats().series_evicted == 3
+
+
+def test_histogram():
+    from tally_counter import Counter, HistogramSeries
+
+    counter = Counter(ttl=60000)
+    histogram = counter.histogram("latency")
+
+    assert isinstance(histogram, HistogramSeries)
+    assert counter.histogram("latency") is histogram
+    assert histogram.ttl == 60000
+    assert counter.histogram("sizes", buckets=[10, 100]).bounds == (10, 100)
+    assert "latency" not in counter.data  # Held apart from data series
+
+    with pytest.raises(ValueError, match="Histogram 'latency' exists, with other buckets."):
+        counter.histogram("latency", buckets=[10, 100])
+    with pytest.raises(ValueError, match="Histogram 'sizes' exists, with other buckets."):
+        counter.histogram("sizes", significant_figures=3, buckets=[10, 100])
+
+
+def test_iter_data():
+    from tally_counter import Counter
+
+    counter = Counter()
+    counter.requests.incr_many([1, 2, 3], [1000, 2000, 3000])
+    counter.errors.incr(4, timestamp=2500)
+
+    assert list(counter.iter_data(chunk_size=2)) == [
+        ("requests", 1, 1000),
+        ("requests", 2, 2000),
+        ("requests", 3, 3000),
+        ("errors", 4, 2500),
+    ]
+    assert list(counter.iter_data(since_ns=2500)) == [("requests", 3, 3000), ("errors", 4, 2500)]
@@ -0,0 +1,227 @@
+"""Counter delta unit tests."""
+
+import json
+
+import pytest
+
+from tally_counter import Counter
+from tally_counter.delta import _Delta
+from tally_counter.series import _Series
+from tally_counter.sketch import _Sketch
+
+
+def test_delta():
+    delta = _Delta()
+    delta.add_many([5, -3, 10])
+
+    assert (delta.count, delta.sum, delta.low, delta.high) == (3, 12, -3, 10)
+    assert delta.to_dict() == {"count": 3, "sum": 12, "min": -3, "max": 10, "sketch": None}
+
+    other = _Delta()
+    other.merge(delta)
+    other.merge(_Delta())  # Empty
+    assert other.to_dict() == delta.to_dict()
+
+
+def test_delta__sketch():
+    delta = _Delta(0.01)
+    delta.add_many(range(1, 101))
+
+    restored = _Delta.from_dict(json.loads(json.dumps(delta.to_dict())))
+    assert restored.to_dict() == delta.to_dict()
+    assert restored.sketch.quantile(0.5) == pytest.approx(50, rel=0.01)
+
+    # Values without a sketch are added at their mean
+    merged = _Delta(0.01)
+    merged.merge(_Delta.from_dict({"count": 2, "sum": 400, "min": 100, "max": 300}))
+    assert merged.sketch.count == 2
+    assert merged.sketch.quantile(0) == pytest.approx(200, rel=0.01)
+
+
+def test_sketch__from_dict():
+    sketch = _Sketch(0.01, max_bins=4)
+    for value in [-5, 0, *range(1, 100)]:
+        sketch.add(value)
+
+    restored = _Sketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+    assert restored.to_dict() == sketch.to_dict()
+    assert restored.count == sketch.count == 101
+    assert restored.quantile(0.5) == sketch.quantile(0.5)
+
+
+def test_take_delta(mocker):
+    mocker.patch("time.monotonic_ns", return_value=1_000_000)
+    series = _Series(ttl=10)
+    series.incr_many([1, 2, 3], [0, 500_000, 1_000_000])
+
+    # The first delta is of all live data
+    assert series._take_delta().to_dict() == {"count": 3, "sum": 6, "min": 1, "max": 3, "sketch": None}
+    assert series._take_delta().count == 0
+
+    series.incr(-4)
+    series.incr_many([10, 20])
+    assert series._take_delta().to_dict() == {"count": 3, "sum": 26, "min": -4, "max": 20, "sketch": None}
+
+
+def test_take_delta__sketches(mocker):
+    mocker.patch("time.monotonic_ns", return_value=5_000_000)
+    series = _Series(ttl=3, accuracy=0.01, reaped=True)
+    series.incr_many([100, 200, 300], [1_000_000, 4_000_000, 5_000_000])
+
+    delta = series._take_delta()  # Without the expired, not yet reaped, value
+    assert (delta.count, delta.sum) == (2, 500)
+    assert delta.sketch.count == 2
+
+    bucketed = _Series(resolution=1, accuracy=0.01)
+    bucketed.incr_many([100, 200, 300], [1_000_000, 1_000_000, 2_000_000])
+    assert bucketed._take_delta().sketch.count == 3
+
+    assert _Series(accuracy=0.01)._take_delta().to_dict()["count"] == 0
+
+
+def test_take_delta__buffered():
+    series = _Series(buffer_size=100)
+    series._take_delta()
+    series.incr(5)
+
+    assert series._take_delta().sum == 5
+
+
+def test_merge_delta():
+    series = _Series(resolution=1, buffer_size=100)
+    series.incr(1, timestamp=0)
+
+    delta = _Delta()
+    series._merge_delta(delta, 0)  # Empty
+    delta.add(5)
+    series._merge_delta(delta, 0)
+
+    assert series.data == [(6, 0)]
+    assert series.len() == 2
+
+    with pytest.raises(ValueError, match="Merging deltas requires a series with a 'resolution'"):
+        _Series()._merge_delta(delta, 0)
+
+
+def test_counters(mocker):
+    mocker.patch("time.monotonic_ns", return_value=10_000_000)
+    hosts = [Counter(accuracy=0.01), Counter(accuracy=0.01), Counter(accuracy=0.01)]
+    fleet = Counter(resolution=1000, accuracy=0.01)
+
+    for i, host in enumerate(hosts):
+        host.requests.incr_many(range(1, 1001))
+        host.errors.incr(i)
+
+    for host in hosts:
+        fleet.merge(json.loads(json.dumps(host.delta())))
+
+    assert fleet.requests.len() == 3000
+    assert fleet.requests.sum == 3 * 500500
+    assert (fleet.requests.min(), fleet.requests.max()) == (1, 1000)
+    assert fleet.requests.quantile(0.5) == pytest.approx(500, rel=0.02)
+    assert fleet.errors.len() == 3
+    assert fleet.errors.sum == 3
+
+    # Only data added since the last delta is merged
+    hosts[0].requests.incr(5000)
+    hosts[0].latency.incr(7)  # A series created since the last delta
+    delta = hosts[0].delta()
+    assert delta["series"].keys() == {"requests", "latency"}
+
+    fleet.merge(delta)
+    assert fleet.requests.len() == 3001
+    assert fleet.requests.max() == 5000
+    assert fleet.latency.sum == 7
+    assert hosts[1].delta() == {"version": 1, "series": {}}
+
+
+def test_merge__buckets(mocker):
+    mocker.patch("time.monotonic_ns", return_value=10_000_000)
+    fleet = Counter(resolution=1)
+    fleet.requests.incr(1, timestamp=11_000_000)  # A later bucket
+    host = Counter()
+    host.requests.incr_many([5, 10])
+
+    fleet.merge(host.delta())
+    fleet.merge(host.delta())  # Nothing new
+    host.requests.incr(20)
+    fleet.merge(host.delta())  # Into the same bucket
+
+    assert fleet.requests.data == [(35, 10_000_000), (1, 11_000_000)]
+    assert (fleet.requests.len(), fleet.requests.min(), fleet.requests.max()) == (4, 1, 20)
+
+    # Merged data may also be passed on, as a delta of the merging counter
+    assert fleet.delta()["series"]["requests"]["count"] == 4
+    host.requests.incr(30)
+    fleet.merge(host.delta())
+    assert fleet.delta()["series"]["requests"] == {
+        "count": 1,
+        "sum": 30,
+        "min": 30,
+        "max": 30,
+        "sketch": None,
+    }
+
+
+def test_merge__invalid():
+    with pytest.raises(ValueError, match="Unsupported counter delta version 2; expected 1."):
+        Counter(resolution=1000).merge({"version": 2, "series": {}})
+
+    with pytest.raises(ValueError, match="merge\\(\\) requires a counter with a 'resolution'"):
+        Counter().merge(Counter().delta())
+
+
+def test_merge__accuracy_mismatch(mocker):
+    mocker.patch("time.monotonic_ns", return_value=10_000_000)
+    fleet = Counter(resolution=1, accuracy=0.01)
+    host = Counter(accuracy=0.05)
+    host.errors.incr(1)
+    host.requests.incr(5)
+    fleet.requests.incr(2)
+
+    with pytest.raises(ValueError, match="Cannot merge sketches of differing relative accuracy."):
+        fleet.merge(host.delta())
+
+    # Nothing is merged, as the whole delta is checked first
+    assert fleet.data == {"requests": [(2, 10_000_000)]}
+    assert (fleet.requests.len(), fleet.requests.max()) == (1, 2)
+
+    delta = _Delta(accuracy=0.05)
+    delta.add(5)
+    with pytest.raises(ValueError, match="Cannot merge sketches of differing relative accuracy."):
+        fleet.requests._merge_delta(delta, 10_000_000)
+
+    assert (fleet.requests.sum, fleet.requests.len()) == (2, 1)
+
+
+def test_merge__children(mocker):
+    mocker.patch("time.monotonic_ns", return_value=10_000_000)
+    host = Counter()
+    host.requests.labels(status=200, method="GET").incr_many([1, 2])
+    host.requests.labels(status=500, method="GET")  # Empty
+    host.errors.incr(3)
+
+    delta = json.loads(json.dumps(host.delta()))
+    assert delta["series"]["requests"] == {
+        "count": 0,
+        "sum": 0,
+        "min": 0,
+        "max": 0,
+        "sketch": None,
+        "children": [
+            [
+                [["method", "GET"], ["status", 200]],
+                {"count": 2, "sum": 3, "min": 1, "max": 2, "sketch": None},
+            ]
+        ],
+    }
+    assert "children" not in delta["series"]["errors"]
+
+    fleet = Counter(resolution=1)
+    fleet.merge(delta)
+    host.requests.labels(method="GET", status=200).incr(5)
+    fleet.merge(host.delta())
+
+    assert fleet.requests.group_by("status", ["sum", "len"]) == {200: (8, 3)}
+    assert fleet.requests.len() == 0
+    assert fleet.errors.sum == 3
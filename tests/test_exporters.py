@@ -0,0 +1,229 @@
+"""Exporter unit tests."""
+
+import urllib.request
+
+import pytest
+
+from tally_counter import AsyncCounter, Counter
+from tally_counter.exporters import PrometheusExporter, start_http_server
+
+
+def test_render():
+    counter = Counter()
+    counter.requests.incr_many([10, 20, 30, 40])
+
+    # Without an accuracy, no quantiles are rendered, as that would sort the data points
+    assert PrometheusExporter(counter).render() == (
+        "# TYPE tally_requests summary\n"
+        "tally_requests_sum 100\n"
+        "tally_requests_count 4\n"
+        "# TYPE tally_requests_min gauge\n"
+        "tally_requests_min 10\n"
+        "# TYPE tally_requests_max gauge\n"
+        "tally_requests_max 40\n"
+    )
+
+
+def test_render__empty_series():
+    counter = Counter("errors")
+
+    assert PrometheusExporter(counter, prefix="").render() == (
+        "# TYPE errors summary\nerrors_sum 0\nerrors_count 0\n"
+    )
+
+
+def test_render__openmetrics():
+    counter = Counter()
+
+    assert PrometheusExporter(counter).render(openmetrics=True) == "# EOF\n"
+
+
+def test_render__quantiles_from_sketch():
+    counter = Counter(accuracy=0.01)
+    counter.latency.incr_many(range(1, 1001))
+
+    text = PrometheusExporter(counter, quantiles=[0.5]).render()
+    median = float(text.splitlines()[1].split()[-1])
+
+    assert median == pytest.approx(500, rel=0.01)
+
+
+def test_render__windowed(mocker):
+    mocker.patch("time.monotonic_ns", return_value=0)
+    counter = Counter(ttl=1000, accuracy=0.01)
+    counter.requests.incr(10)
+
+    # The count and sum fall as data expires, so they are not summary counters
+    lines = PrometheusExporter(counter, quantiles=[1]).render().splitlines(keepends=True)
+
+    assert lines.pop(1).startswith('tally_requests{quantile="1"} ')
+    assert "".join(lines) == (
+        "# TYPE tally_requests gauge\n"
+        "# TYPE tally_requests_sum gauge\n"
+        "tally_requests_sum 10\n"
+        "# TYPE tally_requests_count gauge\n"
+        "tally_requests_count 1\n"
+        "# TYPE tally_requests_min gauge\n"
+        "tally_requests_min 10\n"
+        "# TYPE tally_requests_max gauge\n"
+        "tally_requests_max 10\n"
+    )
+    assert "# TYPE tally_errors gauge\n" in PrometheusExporter(Counter("errors", maxlen=5)).render()
+
+
+def test_render__children():
+    counter = Counter()
+    counter.requests.incr(1)
+    counter.requests.labels(status=200, path='/a"b\\c\n').incr(3)
+    counter.requests.labels(status=500)
+    exporter = PrometheusExporter(counter)
+
+    assert exporter.render() == (
+        "# TYPE tally_requests summary\n"
+        "tally_requests_sum 1\n"
+        "tally_requests_count 1\n"
+        'tally_requests_sum{path="/a\\"b\\\\c\\n",status="200"} 3\n'
+        'tally_requests_count{path="/a\\"b\\\\c\\n",status="200"} 1\n'
+        'tally_requests_sum{status="500"} 0\n'
+        'tally_requests_count{status="500"} 0\n'
+        "# TYPE tally_requests_min gauge\n"
+        "tally_requests_min 1\n"
+        'tally_requests_min{path="/a\\"b\\\\c\\n",status="200"} 3\n'
+        "# TYPE tally_requests_max gauge\n"
+        "tally_requests_max 1\n"
+        'tally_requests_max{path="/a\\"b\\\\c\\n",status="200"} 3\n'
+    )
+
+    counter.requests.labels(status=500).incr(7)  # The series is rendered again, for its child
+    assert 'tally_requests_sum{status="500"} 7\n' in exporter.render()
+
+
+def test_render__windowed_children(mocker):
+    mocker.patch("time.monotonic_ns", return_value=0)
+    counter = Counter(maxlen=5, accuracy=0.01)
+    counter.requests.labels(status=200).incr(10)
+
+    text = PrometheusExporter(counter, quantiles=[0.5]).render()
+
+    assert 'tally_requests{status="200",quantile="0.5"} ' in text
+    assert (
+        '# TYPE tally_requests_sum gauge\ntally_requests_sum 0\ntally_requests_sum{status="200"} 10\n'
+        in text
+    )
+
+
+def test_render__resolution_without_accuracy():
+    counter = Counter(resolution=1000)
+    counter.latency.incr_many([10, 20])
+
+    text = PrometheusExporter(counter).render()
+
+    assert "quantile" not in text
+    assert "tally_latency_count 2\n" in text
+
+
+def test_render__histograms():
+    counter = Counter()
+    latency = counter.histogram("latency")
+    latency.incr(1)
+    latency.incr(1000)
+    sizes = counter.histogram("sizes", buckets=[10, 100])
+    sizes.incr(50)
+
+    assert PrometheusExporter(counter).render() == (
+        "# TYPE tally_latency histogram\n"
+        'tally_latency_bucket{le="1"} 1\n'
+        'tally_latency_bucket{le="1003"} 2\n'
+        'tally_latency_bucket{le="+Inf"} 2\n'
+        "tally_latency_sum 1001\n"
+        "tally_latency_count 2\n"
+        "# TYPE tally_sizes histogram\n"
+        'tally_sizes_bucket{le="10"} 0\n'
+        'tally_sizes_bucket{le="100"} 1\n'
+        'tally_sizes_bucket{le="+Inf"} 1\n'
+        "tally_sizes_sum 50\n"
+        "tally_sizes_count 1\n"
+    )
+
+
+@pytest.mark.parametrize(
+    ("prefix", "key", "name"),
+    [
+        ("tally", "http.requests/s", "tally_http_requests_s"),
+        ("", "2xx", "_2xx"),
+        ("app:v1", "hits", "app:v1_hits"),
+    ],
+)
+def test_metric_name(prefix, key, name):
+    assert PrometheusExporter(Counter(), prefix=prefix)._metric_name(key) == name
+
+
+def test_render__cached(mocker):
+    counter = Counter("requests", "errors")
+    exporter = PrometheusExporter(counter)
+    render_series = mocker.spy(exporter, "_render_series")
+
+    exporter.render()
+    assert render_series.call_count == 2
+
+    exporter.render()  # Nothing has changed
+    assert render_series.call_count == 2
+
+    counter.requests.incr()
+    text = exporter.render()
+    assert render_series.call_count == 3
+    assert "tally_requests_count 1\n" in text
+    assert "tally_errors_count 0\n" in text
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"reap_interval": 60000}])
+def test_render__cache_expiry(mocker, kwargs):
+    mocker.patch("time.monotonic_ns", return_value=0)
+
+    counter = Counter(ttl=1, **kwargs)
+    counter.requests.incr()
+    exporter = PrometheusExporter(counter)
+
+    assert "tally_requests_count 1\n" in exporter.render()
+
+    mocker.patch("time.monotonic_ns", return_value=2_000_000)
+    assert "tally_requests_count 0\n" in exporter.render()  # Expired, if not yet reaped
+    counter.stop_reaper()
+
+
+def test_render__async_counter():
+    counter = AsyncCounter()
+    counter.requests.incr(5)
+
+    assert "tally_requests_sum 5\n" in PrometheusExporter(counter).render()
+
+
+@pytest.mark.parametrize(
+    ("accept", "content_type", "eof"),
+    [
+        ("text/plain", "text/plain; version=0.0.4; charset=utf-8", False),
+        (
+            "application/openmetrics-text; version=1.0.0",
+            "application/openmetrics-text; version=1.0.0; charset=utf-8",
+            True,
+        ),
+    ],
+)
+def test_start_http_server(accept, content_type, eof):
+    counter = Counter()
+    counter.requests.incr(5)
+
+    server = start_http_server(counter, 0, "127.0.0.1")
+    try:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_port}/metrics", headers={"Accept": accept}
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:  # noqa: S310
+            body = response.read().decode()
+            assert response.headers["Content-Type"] == content_type
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert "tally_requests_sum 5\n" in body
+    assert body.endswith("# EOF\n") is eof
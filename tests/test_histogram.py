@@ -0,0 +1,188 @@
+"""`HistogramSeries` unit tests."""
+
+import math
+
+import pytest
+
+from tally_counter import HistogramSeries
+
+
+def test_incr():
+    histogram = HistogramSeries()
+    for value in range(1, 101):
+        histogram.incr(value)
+
+    assert histogram.sum == 5050
+    assert histogram.len() == 100
+    assert histogram.mean() == 50.5
+    assert histogram.min() == 1
+    assert histogram.max() == 100
+    assert histogram.quantile(0.5) == 50.0  # Values below 256 are counted exactly
+    assert histogram.quantiles([0, 1]) == [1.0, 100.0]
+    assert histogram.ttl is None
+    assert histogram.significant_figures == 2
+    assert histogram.bounds is None
+    assert repr(histogram) == "5050"
+
+
+@pytest.mark.parametrize("significant_figures", [1, 2, 3])
+def test_log_linear_buckets(significant_figures):
+    histogram = HistogramSeries(significant_figures=significant_figures)
+
+    previous = (-1, -1)
+    for value in [*range(5000), 2**40 - 1, 2**40, 2**62]:
+        lower, upper = histogram._range(histogram._index(value))
+
+        assert lower <= value <= upper
+        assert (upper - lower) / max(lower, 1) < 10**-significant_figures
+        if value < 5000 and (lower, upper) != previous:
+            assert lower == previous[1] + 1  # Buckets are contiguous
+            previous = (lower, upper)
+
+
+def test_quantiles__accuracy():
+    histogram = HistogramSeries()
+    for value in range(1, 100_001):
+        histogram.incr(value * 1000)
+
+    for q in (0.5, 0.9, 0.99):
+        assert histogram.quantile(q) == pytest.approx(q * 100_000_000, rel=0.01)
+
+    assert histogram.quantile(1) <= histogram.max() == 100_000_000  # Bounded by the maximum value
+
+
+def test_bucket_counts():
+    histogram = HistogramSeries()
+    histogram.incr(1)
+    histogram.incr(1)
+    histogram.incr(1000)
+
+    assert histogram.bucket_counts() == [(1, 2), (1003, 1)]
+
+
+def test_buckets():
+    histogram = HistogramSeries(buckets=[10, 100])
+    for value in [5, -50, 10, 50, 500]:
+        histogram.incr(value)
+
+    assert histogram.bounds == (10, 100)
+    assert histogram.bucket_counts() == [(10, 3), (100, 1), (math.inf, 1)]
+    assert histogram.quantile(0) == -20.0  # The middle of the minimum value, and the bound
+    assert histogram.quantile(0.75) == 55.5
+    assert histogram.quantile(1) == 300.5
+
+    assert HistogramSeries(buckets=[10, 100]).bucket_counts() == [(10, 0), (100, 0), (math.inf, 0)]
+
+
+def test_empty():
+    histogram = HistogramSeries()
+
+    assert histogram.sum == 0
+    assert histogram.len() == 0
+    with pytest.raises(ValueError, match=r"min\(\) arg is an empty sequence"):
+        histogram.min()
+    with pytest.raises(ValueError, match=r"max\(\) arg is an empty sequence"):
+        histogram.max()
+    with pytest.raises(ValueError, match=r"quantile\(\) arg is an empty sequence"):
+        histogram.quantile(0.5)
+    with pytest.raises(ZeroDivisionError):
+        histogram.mean()
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"significant_figures": 0}, "Significant figures must be from 1 to 5, not 0."),
+        ({"significant_figures": 6}, "Significant figures must be from 1 to 5, not 6."),
+        ({"buckets": []}, r"Histogram buckets must be strictly increasing, not \[\]."),
+        ({"buckets": [10, 10]}, r"Histogram buckets must be strictly increasing, not \[10, 10\]."),
+    ],
+)
+def test_init__invalid(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        HistogramSeries(**kwargs)
+
+
+def test_incr__invalid():
+    with pytest.raises(ValueError, match="Histogram values must not be negative, not -1."):
+        HistogramSeries().incr(-1)
+
+    with pytest.raises(ValueError, match="Quantile must be from 0 to 1, not 2."):
+        HistogramSeries().quantile(2)
+
+
+def test_merge():
+    histogram = HistogramSeries()
+    histogram.incr(10)
+    other = HistogramSeries()
+    other.incr(5)
+    other.incr(1000)
+
+    histogram.merge(other)
+    histogram.merge(HistogramSeries())  # Empty
+
+    assert histogram.len() == 3
+    assert histogram.sum == 1015
+    assert (histogram.min(), histogram.max()) == (5, 1000)
+    assert other.len() == 2
+
+    empty = HistogramSeries()
+    empty.merge(other)
+    assert (empty.min(), empty.max()) == (5, 1000)
+
+    with pytest.raises(ValueError, match="Cannot merge histograms of differing buckets, or time slices."):
+        histogram.merge(HistogramSeries(significant_figures=3))
+    with pytest.raises(ValueError, match="Cannot merge histograms of differing buckets, or time slices."):
+        histogram.merge(HistogramSeries(ttl=1000))
+
+
+def test_ttl(mocker):
+    histogram = HistogramSeries(ttl=60, slices=6)  # 10ms time slices
+    assert histogram.ttl == 60
+
+    mocker.patch("time.monotonic_ns", return_value=5_000_000)
+    histogram.incr(1)
+
+    mocker.patch("time.monotonic_ns", return_value=25_000_000)
+    histogram.incr(2)
+    histogram.incr(3, timestamp=15_000_000)  # Out of order, into an earlier slice
+    histogram.incr(4, timestamp=21_000_000)
+    assert histogram.len() == 4
+
+    mocker.patch("time.monotonic_ns", return_value=75_000_000)
+    histogram.incr(5, timestamp=1_000_000)  # Already expired, so not counted
+    assert histogram.sum == 9  # The first slice has expired
+    assert histogram.quantile(0) == 2.0
+
+    mocker.patch("time.monotonic_ns", return_value=100_000_000)
+    assert histogram.len() == 0
+
+
+def test_merge__ttl(mocker):
+    mocker.patch("time.monotonic_ns", return_value=5_000_000)
+    histogram = HistogramSeries(ttl=60)
+    histogram.incr(1)
+
+    mocker.patch("time.monotonic_ns", return_value=25_000_000)
+    other = HistogramSeries(ttl=60)
+    other.incr(2)
+    other.incr(3, timestamp=5_000_000)
+
+    histogram.merge(other)
+    assert histogram.len() == 3
+
+    mocker.patch("time.monotonic_ns", return_value=75_000_000)
+    assert histogram.sum == 2  # Merged counts expire with their time slice
+
+
+def test_merge__expired_meanwhile(mocker):
+    mocker.patch("time.monotonic_ns", return_value=5_000_000)
+    other = HistogramSeries(ttl=60)
+    other.incr(1)
+    histogram = HistogramSeries(ttl=60)
+
+    # The slice of the other histogram expires between copying and merging it
+    mocker.patch("time.monotonic_ns", side_effect=[5_000_000, 100_000_000, 100_000_000])
+    histogram.merge(other)
+
+    assert histogram.len() == 0
@@ -0,0 +1,138 @@
+"""`RateLimiter` unit tests."""
+
+import threading
+
+import pytest
+
+from tally_counter import Counter, RateLimiter
+
+
+def test_allow__limit_per_window():
+    limiter = RateLimiter(3, 1000)
+
+    assert [limiter.allow(timestamp=0) for _ in range(4)] == [True, True, True, False]
+
+
+def test_allow__sliding_window():
+    limiter = RateLimiter(2, 1000)  # One request per 500 ms, in a burst of up to 2
+
+    assert limiter.allow(timestamp=0)
+    assert limiter.allow(timestamp=0)
+    assert not limiter.allow(timestamp=499_999_999)
+    assert limiter.allow(timestamp=500_000_000)
+    assert not limiter.allow(timestamp=500_000_000)
+    assert limiter.allow(timestamp=2_000_000_000)
+    assert limiter.allow(timestamp=2_000_000_000)
+    assert not limiter.allow(timestamp=2_000_000_000)
+
+
+def test_allow__monotonic_clock(mocker):
+    mocker.patch("time.monotonic_ns", side_effect=[0, 0, 1_000_000_000])
+    limiter = RateLimiter(1, 1000)
+
+    assert limiter.allow()
+    assert not limiter.allow()
+    assert limiter.allow()
+
+
+def test_try_acquire():
+    limiter = RateLimiter(10, 1000)
+
+    assert limiter.try_acquire(6, timestamp=0)
+    assert not limiter.try_acquire(5, timestamp=0)  # Nothing is recorded if not allowed
+    assert limiter.try_acquire(4, timestamp=0)
+    assert not limiter.try_acquire(timestamp=0)
+    assert not RateLimiter(10, 1000).try_acquire(11, timestamp=0)
+
+
+@pytest.mark.parametrize("n", [0, -4])
+def test_try_acquire__not_positive(n):
+    limiter = RateLimiter(1, 1000)
+
+    with pytest.raises(ValueError, match=f"Requests must be positive, not {n}."):
+        limiter.try_acquire(n, timestamp=0)
+
+
+def test_remaining():
+    limiter = RateLimiter(10, 1000)
+
+    assert limiter.remaining(timestamp=0) == 10
+    limiter.try_acquire(10, timestamp=0)
+    assert limiter.remaining(timestamp=0) == 0
+    assert limiter.remaining(timestamp=250_000_000) == 2
+    assert limiter.remaining(timestamp=5_000_000_000) == 10
+
+
+def test_remaining__monotonic_clock(mocker):
+    mocker.patch("time.monotonic_ns", return_value=0)
+
+    assert RateLimiter(10, 1000).remaining() == 10
+
+
+def test_properties():
+    limiter = RateLimiter(100, 60000)
+
+    assert limiter.limit == 100
+    assert limiter.window == 60000
+    assert repr(limiter) == "RateLimiter(100, 60000)"
+
+
+@pytest.mark.parametrize(("limit", "window_ms"), [(0, 1000), (10, 0), (-1, 1000)])
+def test_init__invalid(limit, window_ms):
+    with pytest.raises(ValueError, match=f"Rate limits must be positive, not {limit} per {window_ms} ms."):
+        RateLimiter(limit, window_ms)
+
+
+def test_thread_safety(mocker):
+    mocker.patch("time.monotonic_ns", return_value=0)
+    limiter = RateLimiter(500, 1000)
+    allowed = []
+
+    def thread_function():
+        allowed.extend(limiter.allow() for _ in range(200))
+
+    threads = [threading.Thread(target=thread_function) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert allowed.count(True) == 500
+
+
+def test_counter_limit():
+    counter = Counter()
+
+    limiter = counter.limit("client-1", 100, 60000)
+
+    assert counter.limit("client-1", 100, 60000) is limiter
+    assert counter.limit("client-2", 100, 60000) is not limiter
+    assert (limiter.limit, limiter.window) == (100, 60000)
+    assert counter.data == {}  # Rate limiters are not data series
+
+
+def test_counter_limit__differing_limit():
+    counter = Counter()
+    counter.limit("client-1", 100, 60000)
+
+    with pytest.raises(
+        ValueError, match="Rate limiter 'client-1' exists, with a limit of 100 per 60000 ms."
+    ):
+        counter.limit("client-1", 10, 60000)
+
+
+def test_counter_limit__reaped(mocker):
+    mocker.patch("time.monotonic_ns", return_value=0)
+    counter = Counter()
+    assert counter.limit("client-1", 1, 1000).allow()
+    counter.limit("client-2", 1, 1000)
+
+    counter.reap()  # "client-2" has seen no requests
+    assert not counter.limit("client-1", 1, 1000).allow()
+
+    mocker.patch("time.monotonic_ns", return_value=1_000_000_000)
+    limiter = counter.limit("client-1", 1, 1000)
+    counter.reap()  # "client-1" has no requests left in its window
+
+    assert counter.limit("client-1", 1, 1000) is not limiter
+    assert counter._Counter__limiters.keys() == {"client-1"}
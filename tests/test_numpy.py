@@ -0,0 +1,70 @@
+"""NumPy interop unit tests."""
+
+import sys
+
+import pytest
+
+from tally_counter import Counter
+from tally_counter.series import _NUMPY_MIN_LENGTH, _Series
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def no_numpy(monkeypatch):
+    """Make `import numpy` fail, as if NumPy were not installed."""
+    monkeypatch.setitem(sys.modules, "numpy", None)
+
+
+def test_to_numpy():
+    series = _Series()
+    series.incr_many([1, 2, 3], [1000, 2000, 3000])
+
+    values, timestamps = series.to_numpy()
+
+    assert values.dtype == np.int64
+    assert values.tolist() == [1, 2, 3]
+    assert timestamps.tolist() == [1000, 2000, 3000]
+
+    series.incr(4)  # The arrays do not stop the series from growing
+    assert values.tolist() == [1, 2, 3]
+
+
+def test_counter_to_numpy():
+    counter = Counter("errors")
+    counter.requests.incr_many([1, 2], [1000, 2000])
+
+    arrays = counter.to_numpy()
+
+    assert arrays.keys() == {"errors", "requests"}
+    assert arrays["requests"][0].tolist() == [1, 2]
+    assert arrays["errors"][1].tolist() == []
+
+
+def test_to_numpy__no_numpy(no_numpy):  # noqa: ARG001
+    with pytest.raises(ImportError, match="to_numpy\\(\\) requires NumPy"):
+        _Series(1).to_numpy()
+
+
+@pytest.mark.parametrize("length", [10, _NUMPY_MIN_LENGTH, 5000])
+def test_quantiles__vectorized(length, request):
+    values = [(i * 7919) % length for i in range(length)]  # A permutation of range(length)
+    qs = [0, 0.25, 0.5, 0.99, 1]
+
+    expected = _Series._exact_quantiles(values, qs)
+    request.getfixturevalue("no_numpy")
+
+    assert _Series._exact_quantiles(values, qs) == expected
+    assert expected == [float(int(q * (length - 1))) for q in qs]
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_percentile__vectorized(vectorized, request):
+    if not vectorized:
+        request.getfixturevalue("no_numpy")
+
+    series = _Series()
+    series.incr_many(range(2000, 0, -1))
+
+    assert series.max(percentile=50) == series.quantile(0.5) == 1000
+    assert series.mean(percentile=50) == 500.5
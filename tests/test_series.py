@@ -1,7 +1,11 @@
 """`_Series` unit tests."""
 
 import math
+import random
 import re
+import threading
+
+from array import array
 
 import pytest
 
@@ -49,6 +53,12 @@ def test_invalid_equality_type():
     assert _Series(1) != ["foo"]
 
 
+def test_init__shared_lock():
+    lock = threading.RLock()
+
+    assert _Series(lock=lock)._lock is lock
+
+
 def test_repr():
     assert f"{_Series(1)}" == "1"
 
@@ -101,7 +111,7 @@ def test_mean_p95(series):
     for i in range(1, 1001):
         series.incr(i)
 
-    expected = sum(range(1, 950)) / 949
+    expected = sum(range(1, 951)) / 950
     assert math.isclose(series.mean(95), expected)
 
 
@@ -118,7 +128,7 @@ def test_max_p95():
     for i in range(1, 1001):
         series.incr(i)
 
-    assert series.max(95) == 949
+    assert series.max(95) == 950
 
 
 def test_age(mocker):
@@ -212,3 +222,752 @@ def test_data():
 def test_get_percentile_exception(series):
     with pytest.raises(ValueError, match="Percentile must be an integer from 1 to 99, not 100."):
         series._get_percentile(series._pruned(), 100)
+
+
+def test_columnar_storage():
+    series = _Series()
+    series.incr(1022, timestamp=1000)
+    series.incr(-1023, timestamp=1001)
+
+    # Values and timestamps are held in packed, parallel int64 columns
+    assert series._Series__values.typecode == "q"
+    assert series._Series__timestamps.typecode == "q"
+    assert list(series._Series__values) == [1022, -1023]
+    assert list(series._Series__timestamps) == [1000, 1001]
+
+
+def test_value_out_of_range():
+    with pytest.raises(OverflowError):
+        _Series().incr(2**63)
+
+
+def test_out_of_order_timestamp():
+    series = _Series()
+    series.incr(1, timestamp=1000)
+    series.incr(3, timestamp=1002)
+    series.incr(2, timestamp=1001)
+
+    # Data points are kept in timestamp order
+    assert series.data == [(1, 1000), (2, 1001), (3, 1002)]
+    assert series.span() == 2
+
+
+def test_prune_expires_prefix(mocker):
+    mocker.patch("time.monotonic_ns", return_value=10_000_000)
+
+    series = _Series(ttl=5)  # ttl=5ms == 5000000ns
+    for ts in range(1_000_000, 10_000_001, 1_000_000):
+        series.incr(ts // 1_000_000, timestamp=ts)
+
+    # Points timestamped before 5000000 have expired
+    assert series.data == [
+        (5, 5000000),
+        (6, 6000000),
+        (7, 7000000),
+        (8, 8000000),
+        (9, 9000000),
+        (10, 10000000),
+    ]
+
+
+def test_prune_moves_start_offset_then_compacts():
+    series = _Series(maxlen=4)
+    for i in range(1, 7):
+        series.incr(i, timestamp=i)
+
+    # Two expired points are skipped, but not yet removed from the columns
+    assert series._Series__start == 2
+    assert len(series._Series__values) == 6
+    assert series.data == [(3, 3), (4, 4), (5, 5), (6, 6)]
+
+    series.incr(7, timestamp=7)
+    series.incr(8, timestamp=8)
+
+    # Half of the columns had expired, so these were compacted
+    assert series._Series__start == 0
+    assert list(series._Series__values) == [5, 6, 7, 8]
+    assert series.data == [(5, 5), (6, 6), (7, 7), (8, 8)]
+
+
+@pytest.mark.parametrize("method", ["min", "max"])
+def test_extremum_empty_series(method):
+    with pytest.raises(ValueError, match=rf"{method}\(\) arg is an empty sequence"):
+        getattr(_Series(), method)()
+
+
+def test_running_aggregates_follow_window():
+    rng = random.Random(1234)  # noqa: S311
+    series = _Series(maxlen=50)
+    expected = []
+    for ts in range(1, 2001):
+        value = rng.randint(-1000, 1000)
+        series.incr(value, timestamp=ts)
+        expected = [*expected, value][-50:]
+
+        assert series.sum == sum(expected)
+        assert series.len() == len(expected)
+        assert series.min() == min(expected)
+        assert series.max() == max(expected)
+        assert math.isclose(series.mean(), sum(expected) / len(expected))
+
+
+def test_running_aggregates_out_of_order():
+    series = _Series(maxlen=3)
+    series.incr(5, timestamp=10)
+    series.incr(1, timestamp=30)
+    series.incr(9, timestamp=20)  # Out of order, so the min/max deques are rebuilt
+
+    assert series.data == [(5, 10), (9, 20), (1, 30)]
+    assert (series.sum, series.min(), series.max()) == (15, 1, 9)
+
+    series.incr(2, timestamp=40)
+
+    assert series.data == [(9, 20), (1, 30), (2, 40)]
+    assert (series.sum, series.min(), series.max()) == (12, 1, 9)
+
+    series.incr(3, timestamp=50)
+
+    assert (series.sum, series.min(), series.max()) == (6, 1, 3)
+
+
+def test_percentile_is_value_ordered():
+    series = _Series()
+    for i in range(100, 0, -1):  # Inserted in descending value order
+        series.incr(i)
+
+    assert series.max(percentile=95) == series.quantile(0.95) == 95
+    assert series.mean(percentile=50) == 25.5
+
+
+def test_percentile__short_series():
+    series = _Series()
+    for i in (3, 1, 2):
+        series.incr(i)
+
+    assert series.max(percentile=50) == series.quantile(0.5) == 2
+    assert series.mean(percentile=10) == 1.0
+
+
+@pytest.mark.parametrize("accuracy", [None, 0.01])
+def test_quantile(accuracy):
+    series = _Series(accuracy=accuracy)
+    for i in range(1000, 0, -1):
+        series.incr(i)
+
+    assert math.isclose(series.quantile(0.5), 500, rel_tol=0.01)
+    assert math.isclose(series.quantile(0.99), 990, rel_tol=0.01)
+    p50, p90, p100 = series.quantiles([0.5, 0.9, 1])
+    assert math.isclose(p50, 500, rel_tol=0.01)
+    assert math.isclose(p90, 900, rel_tol=0.01)
+    assert math.isclose(p100, 1000, rel_tol=0.01)
+
+
+def test_quantile_exact():
+    series = _Series()
+    for i in (5, 1, 4, 2, 3):
+        series.incr(i)
+
+    assert series.quantiles([0, 0.25, 0.5, 0.75, 1]) == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+@pytest.mark.parametrize("accuracy", [None, 0.01])
+def test_quantile_follows_window(accuracy):
+    series = _Series(maxlen=100, accuracy=accuracy)
+    for i in range(1, 1001):
+        series.incr(i)
+
+    assert math.isclose(series.quantile(0), 901, rel_tol=0.01)
+    assert math.isclose(series.quantile(1), 1000, rel_tol=0.01)
+
+
+@pytest.mark.parametrize("accuracy", [None, 0.01])
+def test_quantile_invalid(accuracy):
+    series = _Series(1, accuracy=accuracy)
+
+    with pytest.raises(ValueError, match="Quantile must be from 0 to 1, not 1.5."):
+        series.quantile(1.5)
+
+
+@pytest.mark.parametrize("accuracy", [None, 0.01])
+def test_quantile_empty(accuracy):
+    with pytest.raises(ValueError, match=r"quantile\(\) arg is an empty sequence"):
+        _Series(accuracy=accuracy).quantile(0.5)
+
+
+def test_resolution_aggregates_time_buckets():
+    series = _Series(resolution=1)  # 1ms == 1000000ns buckets
+    series.incr(5, timestamp=1_000_000)
+    series.incr(-3, timestamp=1_500_000)
+    series.incr(7, timestamp=1_999_999)
+    series.incr(2, timestamp=2_000_000)
+    series.decr(4, timestamp=3_250_000)
+
+    # One row (sum, bucket start time) per time bucket
+    assert series.data == [(9, 1_000_000), (2, 2_000_000), (-4, 3_000_000)]
+    assert len(series._Series__values) == 3
+    assert series.sum == 7
+    assert series.len() == 5  # Number of increments counted
+    assert series.mean() == 7 / 5
+    assert series.min() == -4
+    assert series.max() == 7
+    assert series.span() == 2_000_000
+
+
+def test_resolution_out_of_order():
+    series = _Series(resolution=1)
+    series.incr(5, timestamp=1_000_000)
+    series.incr(1, timestamp=3_000_000)
+    series.incr(-8, timestamp=1_200_000)  # Updates an earlier bucket
+    series.incr(9, timestamp=2_000_000)  # Inserts a new bucket between the others
+
+    assert series.data == [(-3, 1_000_000), (9, 2_000_000), (1, 3_000_000)]
+    assert (series.sum, series.len(), series.min(), series.max()) == (7, 4, -8, 9)
+
+
+def test_resolution_follows_window(mocker):
+    mocker.patch("time.monotonic_ns", return_value=10_000_000)
+
+    series = _Series(ttl=5, resolution=1)
+    for ts in range(0, 10_000_000, 100_000):  # Ten increments per bucket
+        series.incr(ts // 100_000, timestamp=ts)
+
+    # Buckets starting before 5000000 have expired
+    assert [ts for _, ts in series.data] == [5_000_000, 6_000_000, 7_000_000, 8_000_000, 9_000_000]
+    assert series.len() == 50
+    assert series.sum == sum(range(50, 100))
+    assert series.min() == 50
+    assert series.max() == 99
+
+    # Buckets are compacted, so memory does not depend on the increment rate
+    assert len(series._Series__values) < 10
+    assert len(series._Series__counts) == len(series._Series__values)
+
+
+def test_resolution_quantile():
+    series = _Series(maxlen=5, resolution=1, accuracy=0.01)
+    for i in range(1, 1001):
+        series.incr(i, timestamp=i * 10_000)  # 100 increments per bucket
+
+    assert len(series._Series__bucket_sketches) == len(series._Series__values)
+    # The latest five buckets hold the values 600 to 1000
+    assert math.isclose(series.quantile(0), 600, rel_tol=0.01)
+    assert math.isclose(series.quantile(0.5), 800, rel_tol=0.01)
+    assert math.isclose(series.quantile(1), 1000, rel_tol=0.01)
+
+
+def test_resolution_quantile_requires_accuracy():
+    series = _Series(resolution=1)
+    series.incr()
+
+    with pytest.raises(ValueError, match="Quantiles of a series with a resolution require an accuracy."):
+        series.quantile(0.5)
+
+
+def test_equal_timestamps():
+    series = _Series()
+    series.incr(3, timestamp=1000)
+    series.incr(1, timestamp=1000)
+    series.incr(2, timestamp=1000)
+
+    # Data points with equal timestamps are kept in insertion order
+    assert series.data == [(3, 1000), (1, 1000), (2, 1000)]
+    assert (series.min(), series.max()) == (1, 3)
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"maxlen": 50}, {"accuracy": 0.01}])
+def test_incr_many(kwargs):
+    rng = random.Random(4321)  # noqa: S311
+    values = [rng.randint(-1000, 1000) for _ in range(200)]
+
+    one_by_one = _Series(**kwargs)
+    for ts, value in enumerate(values):
+        one_by_one.incr(value, timestamp=ts)
+
+    bulk = _Series(**kwargs)
+    bulk.incr_many(values[:100], range(100))
+    bulk.incr_many(array("q", values[100:]), range(100, 200))
+
+    assert bulk.data == one_by_one.data
+    assert (bulk.sum, bulk.len(), bulk.min(), bulk.max()) == (
+        one_by_one.sum,
+        one_by_one.len(),
+        one_by_one.min(),
+        one_by_one.max(),
+    )
+    assert bulk.quantile(0.5) == one_by_one.quantile(0.5)
+    assert _extrema(bulk) == _extrema(one_by_one)
+
+
+def _extrema(series):
+    """Return the live min and max deque entries of a series."""
+    return (
+        series._Series__min_indexes[series._Series__min_head :].tolist(),
+        series._Series__max_indexes[series._Series__max_head :].tolist(),
+    )
+
+
+def _rebuilt_extrema(series):
+    """Return the min and max deque entries of a series, as rebuilt from its live rows."""
+    base, lows, highs = series._Series__base, series._Series__lows, series._Series__highs
+    min_indexes, max_indexes = [], []
+    for i in range(series._Series__start, len(lows)):
+        while min_indexes and lows[min_indexes[-1] - base] >= lows[i]:
+            min_indexes.pop()
+        while max_indexes and highs[max_indexes[-1] - base] <= highs[i]:
+            max_indexes.pop()
+        min_indexes.append(base + i)
+        max_indexes.append(base + i)
+
+    return min_indexes, max_indexes
+
+
+def test_incr_many_stamps_once(mocker):
+    mocker.patch("time.monotonic_ns", side_effect=[1000, 2000])
+
+    series = _Series()
+    series.incr_many([1, 2, 3])
+
+    assert series.data == [(1, 1000), (2, 1000), (3, 1000)]
+
+
+def test_incr_many_out_of_order():
+    series = _Series()
+    series.incr(5, timestamp=10)
+    series.incr_many([1, 2, 3], [30, 20, 5])
+
+    assert series.data == [(3, 5), (5, 10), (2, 20), (1, 30)]
+    assert (series.min(), series.max()) == (1, 5)
+
+
+def test_extrema_compacted():
+    series = _Series(maxlen=10)
+    for i in range(1000):
+        series.incr(i, timestamp=i)
+
+    assert _extrema(series) == (list(range(990, 1000)), [999])
+    assert len(series._Series__min_indexes) < 20
+    assert (series.min(), series.max()) == (990, 999)
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"maxlen": 40}, {"resolution": 1}, {"resolution": 1, "maxlen": 10}])
+def test_out_of_order_extrema_repaired(kwargs):
+    rng = random.Random(2468)  # noqa: S311
+    series = _Series(**kwargs)
+    for _ in range(100):
+        if rng.random() < 0.5:
+            series.incr(rng.randint(-1000, 1000), timestamp=rng.randint(0, 20_000_000))
+        else:
+            size = rng.randint(1, 10)
+            values = [rng.randint(-1000, 1000) for _ in range(size)]
+            series.incr_many(values, [rng.randint(0, 20_000_000) for _ in range(size)])
+
+        assert _extrema(series) == _rebuilt_extrema(series)
+        assert series.data == sorted(series.data, key=lambda point: point[1])
+
+
+def test_incr_many_out_of_order_merges_once(mocker):
+    series = _Series()
+    series.incr_many(range(10), range(0, 100, 10))
+    repair = mocker.spy(series, "_repair_extrema")
+
+    series.incr_many([100, -100, 50], [55, 15, 95])
+    series.incr(7, timestamp=85)
+
+    assert series.data[:4] == [(0, 0), (1, 10), (-100, 15), (2, 20)]
+    assert (series.min(), series.max(), series.len()) == (-100, 100, 14)
+    assert [call.args for call in repair.call_args_list] == [(2,), (11,)]
+
+
+def test_incr_many_resolution():
+    series = _Series(resolution=1)
+    series.incr_many([1, 2, 3, 4], [0, 500_000, 1_000_000, 1_500_000])
+
+    assert series.data == [(3, 0), (7, 1_000_000)]
+    assert series.len() == 4
+
+
+def test_incr_many_empty():
+    series = _Series()
+    series.incr_many([])
+
+    assert series.len() == 0
+
+
+def test_incr_many_raises_type_error():
+    with pytest.raises(TypeError, match=re.escape("incr_many() argument must be an iterable of integers")):
+        _Series().incr_many(["foo"])
+
+
+def test_incr_many_raises_value_error():
+    with pytest.raises(
+        ValueError, match=re.escape("incr_many() values and timestamps must be of equal length")
+    ):
+        _Series().incr_many([1, 2], [1000])
+
+
+def test_buffered_merges_on_read():
+    series = _Series(buffer_size=100)
+    series.incr(1, timestamp=1000)
+    series.incr(2, timestamp=1001)
+
+    # Buffered data points are not yet in the columns
+    assert len(series._Series__values) == 0
+
+    assert series.data == [(1, 1000), (2, 1001)]
+    assert len(series._Series__values) == 2
+    assert (series.sum, series.len(), series.min(), series.max()) == (3, 2, 1, 2)
+
+
+def test_buffered_merges_when_full():
+    series = _Series(buffer_size=3)
+    series.incr(1, timestamp=1000)
+    series.incr(2, timestamp=1001)
+
+    assert len(series._Series__values) == 0
+
+    series.decr(3, timestamp=1002)
+
+    assert list(series._Series__values) == [1, 2, -3]
+
+
+def test_buffered_incr_many_merges_first():
+    series = _Series(buffer_size=100)
+    series.incr(1, timestamp=1000)
+    series.incr_many([2, 3], [1001, 1002])
+
+    assert series.data == [(1, 1000), (2, 1001), (3, 1002)]
+
+
+def test_buffered_threads(mocker):
+    mocker.patch("time.monotonic_ns", return_value=1000)
+
+    series = _Series(maxlen=25000, buffer_size=64)
+
+    def thread_function(value: int):
+        for _ in range(5000):
+            series.incr(value)
+
+    threads = [threading.Thread(target=thread_function, args=(i,)) for i in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert series.len() == 25000
+    assert len(series.data) == 25000
+
+    # The buffers of finished threads are merged, then forgotten
+    assert series._Series__buffers == []
+
+
+def test_buffered_ttl(mocker):
+    mocker.patch("time.monotonic_ns", return_value=10_000_000)
+
+    series = _Series(ttl=5, buffer_size=100)
+    for ts in range(1_000_000, 10_000_001, 1_000_000):
+        series.incr(ts // 1_000_000, timestamp=ts)
+
+    assert series.sum == sum(range(5, 11))
+    assert series.data[0] == (5, 5_000_000)
+
+
+def test_rate(mocker):
+    mocker.patch("time.monotonic_ns", return_value=2_000_000_000)
+
+    series = _Series()
+    series.incr(10, timestamp=0)
+    series.incr(20, timestamp=1_000_000_000)
+
+    assert series.rate() == 15.0
+    assert series.rate(per="ms") == 0.015
+    assert series.rate(per="m") == 900.0
+    assert series.rate(per="h") == 54000.0
+
+
+def test_rate_empty(mocker):
+    mocker.patch("time.monotonic_ns", return_value=1000)
+
+    series = _Series()
+    assert series.rate() == 0.0
+
+    series.incr(10)  # At the time of the query
+    assert series.rate() == 0.0
+
+
+def test_rate_outlives_ttl(mocker):
+    mocker.patch("time.monotonic_ns", return_value=4_000_000_000)
+
+    series = _Series(ttl=1000)
+    series.incr_many([10, 20], [2_000_000_000, 3_000_000_000])
+    series.incr(30, timestamp=0)  # Out of order, and expired
+
+    assert series.sum == 20
+    assert series.rate() == 15.0
+
+
+def test_rate_invalid_unit():
+    with pytest.raises(ValueError, match="Rate time units must be one of 'ms', 's', 'm' or 'h', not 'd'."):
+        _Series().rate(per="d")
+
+
+def test_rates(mocker):
+    mocker.patch("time.monotonic_ns", return_value=600_000_000_000)
+
+    series = _Series(maxlen=10)
+    for ts in range(0, 600_000_000_000, 1_000_000_000):
+        series.incr(10, timestamp=ts)  # 10 per second, for 10 minutes
+
+    assert series.rates() == pytest.approx((10.0, 10.0, 10.0))
+    assert series.rates(per="m") == pytest.approx((600.0, 600.0, 600.0))
+
+
+def test_rates_decay(mocker):
+    mocker.patch("time.monotonic_ns", return_value=60_000_000_000)
+
+    series = _Series()
+    series.incr(50, timestamp=0)  # 10 per second, over the first tick only
+
+    one, five, fifteen = series.rates()
+
+    # Decayed over the 11 ticks after the first
+    assert one == pytest.approx(10 * math.exp(-55 / 60))
+    assert five == pytest.approx(10 * math.exp(-55 / 300))
+    assert fifteen == pytest.approx(10 * math.exp(-55 / 900))
+
+
+def test_rates_before_first_tick(mocker):
+    mocker.patch("time.monotonic_ns", return_value=4_999_999_999)
+
+    series = _Series()
+    assert series.rates() == (0.0, 0.0, 0.0)
+
+    series.incr(10, timestamp=0)
+    assert series.rates() == (0.0, 0.0, 0.0)
+
+
+def test_rates_buffered(mocker):
+    mocker.patch("time.monotonic_ns", return_value=5_000_000_000)
+
+    series = _Series(buffer_size=100)
+    series.incr(25, timestamp=0)
+
+    assert series.rates() == (5.0, 5.0, 5.0)
+
+
+def test_rates_incr_many(mocker):
+    mocker.patch("time.monotonic_ns", return_value=600_000_000_000)
+
+    series = _Series()
+    series.incr_many([])  # Meters nothing
+    series.incr_many([10] * 600, range(599_000_000_000, -1, -1_000_000_000))  # Spans many ticks
+
+    assert series.rate() == 10.0
+    assert series.rates() == pytest.approx((10.0, 10.0, 10.0))
+
+
+def test_reaped(mocker):
+    mocker.patch("time.monotonic_ns", return_value=6_000_000)
+
+    series = _Series(ttl=2, reaped=True)
+    series.incr(1, timestamp=0)
+    series.incr(5, timestamp=5_000_000)
+
+    # Reads skip the expired data point by timestamp, without expiring it
+    assert series.sum == 5
+    assert series.len() == 1
+    assert series.mean() == 5.0
+    assert series.min() == 5
+    assert series.max() == 5
+    assert series.quantile(0.5) == 5.0
+    assert series.data == [(5, 5_000_000)]
+    assert series.age() == 1_000_000
+    assert series.span() == 0
+    assert series._summary(["sum", "len", "min"]) == (5, 1, 5)
+    assert series._footprint()[:2] == (2, 2)
+
+    # Until it is reaped
+    assert series._prune() == 1
+    assert series._footprint()[:2] == (1, 1)
+    assert series.sum == 5
+
+
+def test_reaped_maxlen(mocker):
+    mocker.patch("time.monotonic_ns", return_value=1000)
+
+    series = _Series(maxlen=2, reaped=True)
+    series.incr_many([1, 2, 3])
+
+    assert series._footprint()[:2] == (2, 3)  # Writes still apply the maxlen
+    assert series.data == [(2, 1000), (3, 1000)]
+
+
+def test_reaped_sketch(mocker):
+    mocker.patch("time.monotonic_ns", return_value=6_000_000)
+
+    series = _Series(ttl=2, accuracy=0.01, reaped=True)
+    series.incr(100, timestamp=0)
+    series.incr(5, timestamp=5_000_000)
+
+    assert series.len() == 1
+    assert series._footprint()[0] == 2
+
+    # The sketch follows the window, so a sketch quantile reaps first
+    assert series.quantile(0) == pytest.approx(5, rel=0.01)
+    assert series._footprint()[0] == 1
+
+
+def test_reaped_resolution(mocker):
+    mocker.patch("time.monotonic_ns", return_value=6_000_000)
+
+    series = _Series(ttl=2, resolution=1, accuracy=0.01, reaped=True)
+    series.incr_many([100, 200], [0, 0])
+    series.incr_many([5, 7], [5_000_000, 5_000_000])
+
+    assert series.len() == 2
+    assert series.sum == 12
+    assert series.quantile(1) == pytest.approx(7, rel=0.01)
+    assert series._footprint()[0] == 2  # Bucket sketches are merged from the cutoff
+
+
+def test_reaped_buffered(mocker):
+    mocker.patch("time.monotonic_ns", return_value=1000)
+
+    series = _Series(ttl=1000, buffer_size=100, reaped=True)
+    series.incr(3)
+
+    assert series.sum == 3
+
+
+def test_reaped_empty(mocker):
+    mocker.patch("time.monotonic_ns", return_value=6_000_000)
+
+    series = _Series(ttl=2, reaped=True)
+    series.incr(1, timestamp=0)
+
+    assert series._summary(["len", "min"]) == (0, None)
+    with pytest.raises(ValueError, match="min\\(\\) arg is an empty sequence"):
+        series.min()
+
+
+def test_labels():
+    series = _Series(ttl=1000, maxlen=10, accuracy=0.01, resolution=100, buffer_size=4, reaped=True)
+    child = series.labels(status=200, method="GET")
+
+    assert series.labels(status=200, method="GET") is child
+    assert series.labels(method="GET", status=200) is child  # Interned, whatever the label order
+    assert series.labels(status=404, method="GET") is not child
+    assert series._children()[0] == ((("method", "GET"), ("status", 200)), child)
+
+    assert child.accuracy == series.accuracy
+    assert child.resolution == series.resolution
+    assert child.labels() is not series
+
+
+def test_labels__max_children(mocker):
+    series = _Series(max_children=2)
+    on_child = series._on_child = mocker.Mock()
+    series.labels(status=200)
+    series.labels(status=500).labels(method="GET")  # Grandchildren are within their own limit
+    series.labels(status=200)  # Not a new child
+
+    with pytest.raises(ValueError, match="Series has the maximum of 2 labelled children."):
+        series.labels(status=404)
+
+    assert len(series._children()) == 2
+    assert on_child.call_count == 2
+
+
+def test_aggregate():
+    series = _Series()
+    series.labels(status=200, method="GET").incr_many([1, 2])
+    series.labels(status=500, method="GET").incr(10)
+    series.labels(status=200, method="POST").incr(3)
+    series.labels(status=404, method="POST")  # Empty
+
+    assert series.aggregate() == (16, 4, 4.0, 1, 10)
+    assert series.aggregate(["sum", "len"], method="GET") == (13, 3)
+    assert series.aggregate(["max"], status=200) == (3,)
+    assert series.aggregate(status=404) == (0, 0, None, None, None)
+    assert series.aggregate(["sum"], status=201) == (0,)
+    assert series == 0  # The series' own data is apart from its children
+
+
+def test_group_by():
+    series = _Series()
+    series.labels(status=200, method="GET").incr_many([1, 2])
+    series.labels(status=500, method="GET").incr(10)
+    series.labels(status=200, method="POST").incr(3)
+    series.labels(region="eu").incr(100)
+
+    assert series.group_by("status", ["sum", "len"]) == {200: (6, 3), 500: (10, 1)}
+    assert series.group_by("method") == {"GET": (13, 3, 13 / 3, 1, 10), "POST": (3, 1, 3.0, 3, 3)}
+    assert series.group_by("missing") == {}
+
+
+def test_aggregate__unknown_stat():
+    with pytest.raises(ValueError, match="Unknown summary statistic 'p99'"):
+        _Series().aggregate(["p99"])
+
+    with pytest.raises(ValueError, match="Unknown summary statistic 'p99'"):
+        _Series().group_by("status", ["p99"])
+
+
+def test_iter_points():
+    series = _Series()
+    series.incr_many(range(10), [t * 1000 for t in range(10)])
+
+    assert list(series.iter_points(chunk_size=3)) == series.data
+    assert list(series.iter_points(since_ns=7000)) == [(7, 7000), (8, 8000), (9, 9000)]
+    assert list(series.iter_points(since_ns=10_000)) == []
+    assert [len(values) for values, _ in series.iter_chunks(chunk_size=4)] == [4, 4, 2]
+    assert list(_Series().iter_points()) == []
+
+
+def test_iter_points__repeated_timestamps():
+    series = _Series()
+    series.incr_many([1, 2, 3, 4, 5, 6], [0, 1000, 1000, 1000, 1000, 2000])
+
+    for chunk_size in (1, 2, 3, 5):
+        assert list(series.iter_points(chunk_size=chunk_size)) == series.data
+
+    assert list(series.iter_points(since_ns=1000, chunk_size=2)) == series.data[1:]
+
+
+def test_iter_points__changes_between_chunks():
+    series = _Series(maxlen=4)
+    series.incr_many([1, 2, 3, 4], [1000, 2000, 3000, 4000])
+
+    points = series.iter_points(chunk_size=2)
+    assert next(points) == (1, 1000)
+    assert next(points) == (2, 2000)
+
+    series.incr(5, timestamp=5000)  # Expires the first data point
+    series.incr(0, timestamp=1500)  # Before the latest timestamp yielded
+
+    assert list(points) == [(3, 3000), (4, 4000), (5, 5000)]
+
+
+def test_iter_points__expiry_between_chunks():
+    series = _Series(maxlen=4)
+    series.incr_many([1, 2, 3, 4], [5, 5, 5, 5])
+
+    points = series.iter_points(chunk_size=2)
+    assert [next(points), next(points)] == [(1, 5), (2, 5)]
+
+    series.incr(9, timestamp=6)  # Expires a data point of the timestamp yielded last
+
+    assert list(points) == [(3, 5), (4, 5), (9, 6)]
+
+
+def test_iter_points__invalid_chunk_size():
+    with pytest.raises(ValueError, match="Chunk size must be positive, not 0."):
+        list(_Series().iter_points(chunk_size=0))
+
+
+@pytest.mark.parametrize(("kwargs", "expected"), [({"buffer_size": 4}, 5), ({"resolution": 1}, 1_000_000)])
+def test_written(kwargs, expected):
+    series = _Series(**kwargs)
+    assert series._written() is None
+
+    series.incr(1, timestamp=5)
+    assert series._written() == expected
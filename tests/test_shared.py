@@ -0,0 +1,229 @@
+"""`SharedCounter` unit tests."""
+
+import gc
+import math
+import multiprocessing
+
+import pytest
+
+from tally_counter import SharedCounter
+
+
+@pytest.fixture
+def shared():
+    counters = []
+
+    def factory(*args, **kwargs):
+        counter = SharedCounter(*args, **kwargs)
+        counters.append(counter)
+        return counter
+
+    yield factory
+
+    for counter in counters:
+        counter.close()
+        counter.unlink()
+
+
+def attach(counter):
+    """Attach a second handle to a counter's shared memory, as another process would."""
+    from multiprocessing.shared_memory import SharedMemory
+
+    other = SharedCounter.__new__(SharedCounter)
+    other.__setstate__({**counter.__getstate__(), "memory": SharedMemory(counter.name)})
+    return other
+
+
+def test_init(shared):
+    counter = shared("foo", bar=100)
+
+    assert counter.foo == 0
+    assert counter["bar"] == 100
+    assert counter.ttl is None
+    assert counter.name
+
+
+def test_incr_decr_and_queries(shared):
+    counter = shared()
+    series = counter.numbers
+    for i in range(1, 101):
+        series.incr(i, timestamp=1000 + i)
+    series.decr(50, timestamp=1200)
+
+    assert series.sum == 5000
+    assert series.len() == 101
+    assert math.isclose(series.mean(), 5000 / 101)
+    assert series.min() == -50
+    assert series.max() == 100
+    assert series.quantile(0.5) == 50.0
+    assert series.span() == 199
+    assert series.data[:2] == [(1, 1001), (2, 1002)]
+    assert repr(series) == "5000"
+
+
+def test_incr_raises_type_error(shared):
+    counter = shared()
+
+    with pytest.raises(TypeError, match=r"incr\(\) argument must be an integer, not 'str'"):
+        counter.foo.incr("foo")
+    with pytest.raises(TypeError, match=r"decr\(\) argument must be an integer, not 'str'"):
+        counter.foo.decr("foo")
+
+
+def test_equality(shared):
+    from tally_counter.series import _Series
+
+    counter = shared(foo=10, bar=10)
+
+    assert counter.foo == 10
+    assert counter.foo == counter.bar
+    assert counter.foo == _Series(10)
+    assert counter.foo != "10"
+    assert len({counter.foo, counter.bar}) == 2
+
+
+def test_age(shared, mocker):
+    mocker.patch("time.monotonic_ns", side_effect=[1001, 1002, 1005])
+
+    counter = shared()
+    counter.foo.incr()
+    counter.foo.incr()
+
+    assert counter.foo.age() == 4  # 1005 - 1001
+
+
+def test_ttl(shared, mocker):
+    mocker.patch("time.monotonic_ns", return_value=10_000_000)
+
+    counter = shared(ttl=5)
+    for ts in range(1_000_000, 10_000_001, 1_000_000):
+        counter.foo.incr(ts // 1_000_000, timestamp=ts)
+
+    assert counter.ttl == 5
+    assert counter.foo.data[0] == (5, 5_000_000)
+    assert counter.foo.sum == sum(range(5, 11))
+
+
+@pytest.mark.parametrize(("kwargs", "expected"), [({"maxlen": 10}, 10), ({"maxlen": 8, "capacity": 8}, 8)])
+def test_maxlen(shared, kwargs, expected):
+    counter = shared(**kwargs)
+    for i in range(1, 101):
+        counter.foo.incr(i, timestamp=i)
+
+    # The ring buffer has wrapped, and holds the latest data points
+    assert counter.foo.len() == expected
+    assert counter.foo.data == [(i, i) for i in range(101 - expected, 101)]
+    assert counter.foo.sum == sum(range(101 - expected, 101))
+
+
+def test_capacity(shared, mocker):
+    mocker.patch("time.monotonic_ns", return_value=0)
+    counter = shared(ttl=1, capacity=8)
+    for i in range(8):
+        counter.foo.incr(i, timestamp=0)
+
+    # Live data points are not dropped to make room
+    with pytest.raises(ValueError, match="SharedCounter series is full, with 8 live data points"):
+        counter.foo.incr(8, timestamp=0)
+    assert (counter.foo.len(), counter.foo.sum) == (8, 28)
+
+    # Data points that have passed the TTL make room
+    mocker.patch("time.monotonic_ns", return_value=1_500_000)
+    counter.foo.incr(8, timestamp=1_500_000)
+    assert counter.foo.data == [(8, 1_500_000)]
+
+
+def test_maxlen_exceeds_capacity():
+    with pytest.raises(ValueError, match="SharedCounter maxlen must not exceed its capacity of 8, not 9."):
+        SharedCounter(maxlen=9, capacity=8)
+
+
+def test_out_of_order(shared):
+    counter = shared(maxlen=4, capacity=4)
+    for value, ts in [(1, 10), (3, 30), (2, 20), (4, 40), (0, 5), (5, 25)]:
+        counter.foo.incr(value, timestamp=ts)
+
+    assert counter.foo.data == [(2, 20), (5, 25), (3, 30), (4, 40)]
+
+
+def test_series_names(shared):
+    counter = shared(max_series=2)
+    counter["ü" * 32].incr()  # 64 bytes
+
+    with pytest.raises(ValueError, match="Series names must be 1 to 64 bytes long, not 65."):
+        counter["x" * 65].incr()
+
+    counter.foo.incr()
+    with pytest.raises(ValueError, match="SharedCounter is full, with 2 series."):
+        counter.bar.incr()
+
+    assert counter.data == {"ü" * 32: counter["ü" * 32].data, "foo": counter.foo.data}
+
+
+def test_not_a_series(shared):
+    counter = shared()
+
+    with pytest.raises(AttributeError):
+        counter.__getnewargs_ex__  # noqa: B018
+
+
+def test_attached_handles_share_series(shared):
+    counter = shared()
+    other = attach(counter)
+
+    counter.foo.incr(5)
+    other.foo.incr(7)
+    other.bar.incr(1)
+
+    assert counter.foo == 12
+    assert counter.data.keys() == {"foo", "bar"}
+    other.close()
+
+
+def test_close(shared):
+    counter = shared()
+    with attach(counter) as other:
+        other.foo.incr()
+
+    other.close()  # Already closed
+    assert counter.foo == 1
+
+
+@pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+def test_collected_without_close(shared):
+    counter = shared()
+    other = attach(counter)
+    other.foo.incr()
+    del other
+    gc.collect()
+
+    assert counter.foo == 1
+
+
+def _worker(counter, n):
+    for _ in range(n):
+        counter.requests.incr()
+    counter.close()
+
+
+def test_processes_share_series(shared):
+    counter = shared(capacity=10000)
+    processes = [multiprocessing.Process(target=_worker, args=(counter, 250)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert counter.requests.len() == 1000
+    assert counter.requests.sum == 1000
+
+
+def test_spawned_processes_share_series(shared):
+    context = multiprocessing.get_context("spawn")
+    counter = shared(context=context)
+    process = context.Process(target=_worker, args=(counter, 10))
+    process.start()
+    process.join()
+
+    assert process.exitcode == 0
+    assert counter.requests.sum == 10
@@ -0,0 +1,105 @@
+"""`_Sketch` unit tests."""
+
+import math
+import random
+
+import pytest
+
+from tally_counter.sketch import _Sketch
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+@pytest.mark.parametrize("accuracy", [0, 1, -0.5, 1.5])
+def test_init_invalid_accuracy(accuracy):
+    with pytest.raises(ValueError, match="Relative accuracy must be between 0 and 1"):
+        _Sketch(accuracy)
+
+
+@pytest.mark.parametrize("q", [0, 0.25, 0.5, 0.9, 0.95, 0.99, 1])
+def test_quantile_relative_accuracy(q):
+    rng = random.Random(42)  # noqa: S311
+    values = [rng.randint(-(10**9), 10**12) for _ in range(10000)] + [0] * 100
+
+    sketch = _Sketch(0.01)
+    for value in values:
+        sketch.add(value)
+
+    expected = exact_quantile(values, q)
+    assert sketch.count == 10100
+    assert math.isclose(sketch.quantile(q), expected, rel_tol=0.01, abs_tol=0.5)
+
+
+def test_quantile_zero():
+    sketch = _Sketch()
+    sketch.add(-1)
+    sketch.add(0, count=2)
+    sketch.add(1)
+
+    assert sketch.quantile(0.5) == 0.0
+
+
+@pytest.mark.parametrize("q", [-0.1, 1.1])
+def test_quantile_invalid(q):
+    sketch = _Sketch()
+    sketch.add(1)
+
+    with pytest.raises(ValueError, match="Quantile must be from 0 to 1"):
+        sketch.quantile(q)
+
+
+def test_quantile_empty():
+    with pytest.raises(ValueError, match=r"quantile\(\) arg is an empty sequence"):
+        _Sketch().quantile(0.5)
+
+
+def test_remove():
+    sketch = _Sketch()
+    for value in (-100, -10, 0, 10, 100, 100):
+        sketch.add(value)
+
+    for value in (-100, -10, 0, 100):
+        sketch.remove(value)
+
+    assert sketch.count == 2
+    assert math.isclose(sketch.quantile(0), 10, rel_tol=0.01)
+    assert math.isclose(sketch.quantile(1), 100, rel_tol=0.01)
+
+
+def test_max_bins_collapses_smallest_magnitudes():
+    sketch = _Sketch(0.01, max_bins=10)
+    for value in range(1, 1001):
+        sketch.add(value)
+        sketch.add(-value)
+
+    assert len(sketch._Sketch__positive) == 10
+    assert len(sketch._Sketch__negative) == 10
+    assert math.isclose(sketch.quantile(1), 1000, rel_tol=0.01)
+    assert math.isclose(sketch.quantile(0), -1000, rel_tol=0.01)
+
+    # Values below the floor are counted in (and removed from) the collapsed bin
+    sketch.add(1)
+    sketch.remove(1)
+    sketch.remove(-1)
+    assert sketch.count == 1999
+
+
+def test_merge():
+    left, right, both = _Sketch(), _Sketch(), _Sketch()
+    for value in range(-500, 1000):
+        (left if value % 2 else right).add(value)
+        both.add(value)
+
+    left.merge(right)
+
+    assert left.count == both.count
+    for q in (0, 0.1, 0.5, 0.9, 1):
+        assert left.quantile(q) == both.quantile(q)
+
+
+def test_merge_differing_accuracy():
+    with pytest.raises(ValueError, match="Cannot merge sketches of differing relative accuracy."):
+        _Sketch(0.01).merge(_Sketch(0.02))
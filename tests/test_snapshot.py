@@ -0,0 +1,352 @@
+"""Snapshot and write-ahead log unit tests."""
+
+from array import array
+
+import pytest
+
+from tally_counter import Counter
+from tally_counter.point import _Point
+from tally_counter.series import _Rows, _Series
+from tally_counter.snapshot import _read_snapshot, _read_wal, _rotated_logs, _write_snapshot, _WriteAheadLog
+
+
+@pytest.fixture
+def clock_offset(mocker):
+    """Fix the monotonic clock offset from the wall clock, so that timestamps round trip exactly."""
+    return mocker.patch("tally_counter.snapshot._clock_offset", return_value=0)
+
+
+def test_snapshot__round_trip(tmp_path, clock_offset):  # noqa: ARG001
+    path = tmp_path / "counter.snapshot"
+    rows = {
+        "requests": _Rows(
+            [array("q", [2**62, 1, 2**62]), array("q", [1000, 2000, 3000])],
+            2**63 + 1,
+            3,
+            array("q", [1, 2]),
+            array("q", [2]),
+        ),
+        "errors": _Rows([array("q"), array("q")], 0, 0, array("q"), array("q")),
+        "ünïcode": _Rows([array("q", [-5]), array("q", [4000])], -5, 1, array("q", [0]), array("q", [0])),
+    }
+
+    _write_snapshot(path, ttl=60000, maxlen=None, resolution=None, accuracy=0.01, log_id=7, rows=rows)
+    snapshot = _read_snapshot(path)
+
+    assert snapshot.ttl == 60000
+    assert snapshot.maxlen is None
+    assert snapshot.resolution is None
+    assert snapshot.accuracy == 0.01
+    assert snapshot.log_id == 7
+    assert snapshot.rows == rows
+    assert not (tmp_path / "counter.snapshot.tmp").exists()
+
+
+def test_snapshot__bucket_columns(tmp_path, clock_offset):  # noqa: ARG001
+    path = tmp_path / "counter.snapshot"
+    rows = {
+        "latency": _Rows(
+            [array("q", [30, 5]), array("q", [0, 1000]), *(array("q", [2, 1]),) * 3],
+            35,
+            3,
+            array("q", [1]),
+            array("q", [0, 1]),
+        )
+    }
+
+    _write_snapshot(path, ttl=None, maxlen=10, resolution=1, accuracy=None, rows=rows)
+
+    assert _read_snapshot(path).rows == rows
+
+
+def test_snapshot__children(tmp_path, clock_offset):  # noqa: ARG001
+    path = tmp_path / "counter.snapshot"
+    rows = {
+        "requests": _Rows([array("q", [1]), array("q", [1000])], 1, 1, array("q", [0]), array("q", [0])),
+    }
+    children = {
+        ("requests", (("method", "GET"), ("status", 200))): _Rows(
+            [array("q", [2]), array("q", [2000])], 2, 1, array("q", [0]), array("q", [0])
+        ),
+        ("requests", (("ok", True),)): _Rows([array("q"), array("q")], 0, 0, array("q"), array("q")),
+    }
+
+    _write_snapshot(
+        path, ttl=None, maxlen=None, resolution=None, accuracy=None, rows=rows, children=children
+    )
+    snapshot = _read_snapshot(path)
+
+    assert snapshot.rows == rows
+    assert snapshot.children == children
+
+
+def test_snapshot__rebases_timestamps(tmp_path, clock_offset):
+    path = tmp_path / "counter.snapshot"
+
+    clock_offset.return_value = 5000
+    _write_snapshot(
+        path,
+        ttl=None,
+        maxlen=None,
+        resolution=None,
+        accuracy=None,
+        rows={"a": _Series(_Point(1, 7000))._rows()},
+    )
+    clock_offset.return_value = 2000  # e.g. after a reboot
+
+    assert _read_snapshot(path).rows["a"].columns == [array("q", [1]), array("q", [10000])]
+
+
+def test_snapshot__invalid_file(tmp_path):
+    path = tmp_path / "counter.snapshot"
+    path.write_bytes(b"\0" * 64)
+
+    with pytest.raises(ValueError, match="is not a version 4 counter snapshot"):
+        _read_snapshot(path)
+
+
+def test_wal__round_trip(tmp_path, clock_offset):
+    path = tmp_path / "counter.wal"
+
+    clock_offset.return_value = 100
+    wal = _WriteAheadLog(path)
+    wal.write("requests", (1,), (1000,))
+    wal.write("errors", array("q", [2, 3]), array("q", [2000, 3000]))
+    wal.write("requests", (4,), (4000,), labels=(("method", "GET"), ("status", 200)))
+    wal.close()
+    clock_offset.return_value = 0
+
+    assert list(_read_wal(path)) == [
+        ("requests", (), array("q", [1]), array("q", [1100])),
+        ("errors", (), array("q", [2, 3]), array("q", [2100, 3100])),
+        ("requests", (("method", "GET"), ("status", 200)), array("q", [4]), array("q", [4100])),
+    ]
+
+
+def test_wal__rotate(tmp_path, clock_offset, mocker):  # noqa: ARG001
+    mocker.patch("time.time_ns", return_value=5)
+    path = tmp_path / "counter.wal"
+
+    wal = _WriteAheadLog(path)
+    wal.write("requests", (1,), (1000,))
+    first = wal.rotate()
+    second = wal.rotate()  # An ID greater than the last, even with a clock that has not moved
+    wal.write("errors", (2,), (2000,))
+    wal.close()
+
+    assert (first, second) == (5, 6)
+    assert _rotated_logs(path) == [(5, tmp_path / "counter.wal.5"), (6, tmp_path / "counter.wal.6")]
+    assert list(_read_wal(tmp_path / "counter.wal.5")) == [
+        ("requests", (), array("q", [1]), array("q", [1000])),
+    ]
+    assert list(_read_wal(path)) == [("errors", (), array("q", [2]), array("q", [2000]))]
+
+    wal.discard(5)
+    assert _rotated_logs(path) == [(6, tmp_path / "counter.wal.6")]
+    assert _WriteAheadLog(path).rotate() == 7  # IDs continue from existing rotated logs
+
+
+def test_rotated_logs(tmp_path):
+    path = tmp_path / "counter.wal"
+    for name in ("counter.wal", "counter.wal.20", "counter.wal.3", "counter.wal.tmp", "other.wal.1"):
+        (tmp_path / name).touch()
+
+    assert _rotated_logs(path) == [(3, tmp_path / "counter.wal.3"), (20, tmp_path / "counter.wal.20")]
+
+
+def test_wal__truncated_record(tmp_path, clock_offset):  # noqa: ARG001
+    path = tmp_path / "counter.wal"
+
+    wal = _WriteAheadLog(path)
+    wal.write("requests", (1,), (1000,))
+    wal.write("requests", (2,), (2000,))
+    wal.close()
+    path.write_bytes(path.read_bytes()[:-3])  # As from a crash, part way through a write
+
+    assert list(_read_wal(path)) == [("requests", (), array("q", [1]), array("q", [1000]))]
+
+
+def test_counter__snapshot_restore(tmp_path, clock_offset):  # noqa: ARG001
+    path = tmp_path / "counter.snapshot"
+
+    counter = Counter(maxlen=5, accuracy=0.01)
+    counter.requests.incr_many(range(10), range(1000, 11000, 1000))
+    counter.errors.incr(3, timestamp=1500)
+    counter.snapshot(path)
+
+    restored = Counter.restore(path)
+
+    assert restored.data == counter.data
+    assert restored.requests.accuracy == 0.01
+    assert restored.requests.quantile(0.5) == counter.requests.quantile(0.5)
+    assert restored.requests.min() == 5
+    assert restored.requests.max() == 9
+    assert restored.requests.len() == 5
+
+
+def test_counter__snapshot_restore__aggregates(tmp_path, clock_offset):  # noqa: ARG001
+    path = tmp_path / "counter.snapshot"
+
+    counter = Counter(maxlen=2000)
+    counter.requests.incr_many(range(3000), range(3000))
+    counter.requests.incr_many([5000, -5000], [1500, 2500])
+    counter.snapshot(path)
+
+    restored = Counter.restore(path)
+
+    assert restored.requests._rows() == counter.requests._rows()
+    assert restored.requests.sum == counter.requests.sum
+    assert (restored.requests.min(), restored.requests.max()) == (-5000, 5000)
+    assert restored.requests.len() == 2000
+
+
+def test_counter__snapshot_restore__children(tmp_path, clock_offset):  # noqa: ARG001
+    path = tmp_path / "counter.snapshot"
+
+    counter = Counter(resolution=1)
+    counter.requests.incr(1, timestamp=1000)
+    counter.requests.labels(status=200, method="GET").incr_many([3, 4], [0, 1_000_000])
+    counter.requests.labels(status=500, method="GET").incr(5, timestamp=0)
+    counter.snapshot(path)
+
+    restored = Counter.restore(path)
+
+    assert restored.data == counter.data == {"requests": [(1, 0)]}
+    assert restored.requests.group_by("status") == {200: (7, 2, 3.5, 3, 4), 500: (5, 1, 5.0, 5, 5)}
+    assert restored.requests.labels(method="GET", status=200).data == [(3, 0), (4, 1_000_000)]
+
+
+def test_counter__snapshot_restore__resolution(tmp_path, clock_offset):  # noqa: ARG001
+    path = tmp_path / "counter.snapshot"
+
+    counter = Counter(resolution=1, accuracy=0.01)
+    counter.latency.incr_many([10, 30, 20, 5], [0, 1, 2, 1_000_000])
+    counter.snapshot(path)
+
+    restored = Counter.restore(path)
+
+    assert restored.data == counter.data == {"latency": [(60, 0), (5, 1_000_000)]}
+    assert restored.latency.resolution == 1
+    assert restored.latency.len() == 4
+    assert restored.latency.min() == 5
+    assert restored.latency.max() == 30
+    assert restored.latency.quantile(0) == pytest.approx(5, rel=0.01)
+    assert restored.latency.quantile(1) == pytest.approx(20, rel=0.01)  # A bucket's mean value
+
+
+def test_counter__snapshot_restore__resolution_rebased(tmp_path, clock_offset, mocker):
+    path = tmp_path / "counter.snapshot"
+    mocker.patch("time.monotonic_ns", return_value=120_000_000_000)
+
+    counter = Counter(resolution=60000)
+    counter.latency.incr(5)
+    clock_offset.return_value = 5000
+    counter.snapshot(path)
+    clock_offset.return_value = 2000  # e.g. after a reboot
+
+    restored = Counter.restore(path)
+    restored.latency.incr(7)
+
+    assert restored.latency.data == [(12, 120_000_000_000)]
+
+
+def test_counter__restore__wal(tmp_path, clock_offset):  # noqa: ARG001
+    path = tmp_path / "counter.snapshot"
+    wal = tmp_path / "counter.wal"
+
+    counter = Counter("errors", buffer_size=2)
+    counter.open_wal(wal)
+    counter.requests.incr(1, timestamp=1000)
+    counter.requests.incr(2, timestamp=2000)
+    counter.snapshot(path)  # Rotates the log, and deletes the rotated log
+
+    counter.requests.incr(3, timestamp=3000)
+    counter.update([("requests", 4, 4000), ("errors", 5, 5000)])
+
+    restored = Counter.restore(path, wal=wal)
+
+    assert (
+        restored.data
+        == counter.data
+        == {
+            "errors": [(5, 5000)],
+            "requests": [(1, 1000), (2, 2000), (3, 3000), (4, 4000)],
+        }
+    )
+    assert _rotated_logs(wal) == []
+
+
+def test_counter__restore__wal__children(tmp_path, clock_offset):  # noqa: ARG001
+    path = tmp_path / "counter.snapshot"
+    wal = tmp_path / "counter.wal"
+
+    counter = Counter()
+    counter.requests.labels(method="GET").incr(1, timestamp=1000)  # Logged from when the log is opened
+    counter.open_wal(wal)
+    counter.snapshot(path)
+
+    counter.requests.labels(method="GET").incr(2, timestamp=2000)
+    counter.requests.labels(method="POST").incr(3, timestamp=3000)
+    counter.requests.incr(4, timestamp=4000)
+
+    restored = Counter.restore(path, wal=wal)
+
+    assert restored.data == {"requests": [(4, 4000)]}
+    assert restored.requests.labels(method="GET").data == [(1, 1000), (2, 2000)]
+    assert restored.requests.labels(method="POST").data == [(3, 3000)]
+
+
+def test_counter__snapshot__failed_write(tmp_path, clock_offset, mocker):  # noqa: ARG001
+    path = tmp_path / "counter.snapshot"
+    wal = tmp_path / "counter.wal"
+
+    counter = Counter()
+    counter.open_wal(wal)
+    counter.requests.incr(1, timestamp=1000)
+    counter.snapshot(path)
+    counter.requests.incr(2, timestamp=2000)
+
+    mocker.patch("tally_counter.counter._write_snapshot", side_effect=OSError("No space left on device"))
+    with pytest.raises(OSError, match="No space left on device"):
+        counter.snapshot(path)  # The log is rotated, but the rotated log is kept
+
+    counter.requests.incr(3, timestamp=3000)
+
+    assert len(_rotated_logs(wal)) == 1
+    assert Counter.restore(path, wal=wal).data == {"requests": [(1, 1000), (2, 2000), (3, 3000)]}
+
+
+def test_counter__open_wal__replaces_log(tmp_path, clock_offset):  # noqa: ARG001
+    first, second = tmp_path / "first.wal", tmp_path / "second.wal"
+
+    counter = Counter()
+    counter.open_wal(first)
+    counter.requests.incr(1, timestamp=1000)
+    counter.open_wal(second)
+    counter.requests.incr(2, timestamp=2000)
+
+    assert [key for key, *_ in _read_wal(first)] == ["requests"]
+    assert list(_read_wal(second)) == [("requests", (), array("q", [2]), array("q", [2000]))]
+
+
+def test_clock_offset(mocker):
+    from tally_counter.snapshot import _clock_offset
+
+    mocker.patch("time.time_ns", return_value=1_700_000_000_000_000_000)
+    mocker.patch("time.monotonic_ns", return_value=1_000_000)
+
+    assert _clock_offset() == 1_699_999_999_999_000_000
+
+
+def test_counter__restore__resolution_without_accuracy(tmp_path, clock_offset):  # noqa: ARG001
+    path = tmp_path / "counter.snapshot"
+
+    counter = Counter(resolution=1)
+    counter.latency.incr_many([10, 30], [0, 1])
+    counter.snapshot(path)
+
+    restored = Counter.restore(path)
+
+    assert restored.latency.data == [(40, 0)]
+    assert restored.latency.accuracy is None
+    assert restored.latency.mean() == 20
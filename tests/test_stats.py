@@ -0,0 +1,89 @@
+"""Self-instrumentation unit tests."""
+
+import threading
+
+from tally_counter import AsyncCounter, Counter
+from tally_counter.async_counter import _AsyncSeries
+from tally_counter.series import _Series
+from tally_counter.stats import _instrumented, _SeriesStats, _TimedLock
+
+
+def test_stats__footprint():
+    counter = Counter("errors")
+    counter.requests.incr_many([1, 2, 3])
+
+    stats = counter.stats()
+
+    assert stats["requests.points"] == 3
+    assert stats["requests.points_allocated"] == 3
+    assert stats["requests.bytes"] == (3 * 2 + 4) * 8  # Two columns, and 3 + 1 min and max deque entries
+    assert stats["errors.points"] == 0
+    assert stats["points"] == 3
+    assert stats["bytes"] == stats["requests.bytes"]
+    assert "prunes" not in stats.data  # Not instrumented
+
+
+def test_stats__footprint_resolution():
+    counter = Counter(resolution=1000)
+    counter.latency.incr_many([1, 2, 3])
+
+    assert counter.stats()["latency.bytes"] == (1 * 5 + 2) * 8  # One row of five columns
+
+
+def test_stats__instrumented(mocker):
+    mocker.patch("time.monotonic_ns", return_value=0)
+
+    counter = Counter("errors", maxlen=2, instrument=True)
+    counter.requests.incr_many([1, 2, 3])
+    counter.requests.incr(4)
+    counter["requests"]  # Not created
+
+    stats = counter.stats()
+
+    assert stats["series_created"] == 1  # Only "requests" was created on access
+    assert stats["requests.points_expired"] == 2
+    assert stats["requests.points"] == 2
+    assert stats["requests.prunes"].sum > 0
+    assert stats["prunes"].sum > 0
+    assert stats["points_expired"] == 2
+    assert stats["lock_waits"] == 0
+    assert stats["lock_wait_ns"] == 0
+    assert stats["prune_ns"].sum >= 0
+
+
+def test_instrumented__classes():
+    series_class = _instrumented(_Series)
+
+    assert series_class.__name__ == "_InstrumentedSeries"
+    assert _instrumented(_Series) is series_class
+    assert issubclass(_instrumented(_AsyncSeries), _AsyncSeries)
+    assert Counter(instrument=True).foo.__class__ is series_class
+    assert Counter().foo.__class__ is _Series  # No instrumentation by default
+
+
+def test_instrumented__async_series():
+    counter = AsyncCounter(ttl=60000, instrument=True)
+    counter.requests.incr()
+
+    assert not isinstance(counter.requests._lock, _TimedLock)
+    assert counter.stats()["requests.prunes"].sum > 0
+
+
+def test_timed_lock__waits():
+    stats = _SeriesStats()
+    inner = threading.RLock()
+    lock = _TimedLock(inner, stats)
+
+    with lock:
+        pass
+    assert stats.lock_waits == 0
+
+    inner.acquire()
+    thread = threading.Thread(target=lambda: lock.__enter__() and lock.__exit__())
+    thread.start()
+    thread.join(0.05)
+    inner.release()
+    thread.join()
+
+    assert stats.lock_waits == 1
+    assert stats.lock_wait_ns > 0
@@ -0,0 +1,96 @@
+"""`_Window` unit tests."""
+
+import pytest
+
+from tally_counter.series import _Series
+
+
+def _series(**kwargs):
+    series = _Series(**kwargs)
+    series.incr_many([1, 2, 3, 4, 5, 6], [1_000_000, 2_000_000, 3_000_000, 4_000_000, 5_000_000, 6_000_000])
+    return series
+
+
+def test_between():
+    series = _series()
+    window = series.between(2_000_000, 5_000_000)
+
+    assert (window.start_ns, window.end_ns) == (2_000_000, 5_000_000)
+    assert window.sum == 9
+    assert window.len() == 3
+    assert window.mean() == 3.0
+    assert window.min() == 2
+    assert window.max() == 4
+    assert repr(window) == "9"
+
+    assert series.between(end_ns=2_000_000).sum == 1
+    assert series.between(start_ns=6_000_000).sum == 6
+    assert series.between().sum == 21
+
+
+def test_between__complement():
+    series = _series()
+
+    # Most of the series, so summed from the running aggregates, less the other rows
+    window = series.between(2_000_000, 7_000_000)
+    assert window.sum == 20
+    assert window.len() == 5
+    assert series.between(2_000_000, 6_000_000).sum == 14
+
+
+def test_between__empty():
+    window = _series().between(7_000_000, 8_000_000)
+
+    assert window.sum == 0
+    assert window.len() == 0
+    with pytest.raises(ValueError, match=r"min\(\) arg is an empty sequence"):
+        window.min()
+    with pytest.raises(ValueError, match=r"max\(\) arg is an empty sequence"):
+        window.max()
+    with pytest.raises(ZeroDivisionError):
+        window.mean()
+
+
+def test_window(mocker):
+    mocker.patch("time.monotonic_ns", return_value=6_500_000)
+    series = _series(ttl=5, maxlen=5)
+
+    window = series.window(last_ms=3)
+    assert window.start_ns == 3_500_000
+    assert window.end_ns is None
+    assert window.sum == 15
+
+    # Data points that have passed the TTL are left out, but not pruned
+    assert series.window(last_ms=10).len() == 5
+    assert series._footprint()[0] == 5
+
+
+def test_window__not_pruned(mocker):
+    mocker.patch("time.monotonic_ns", return_value=1_000_000)
+    series = _series(ttl=3)
+
+    mocker.patch("time.monotonic_ns", return_value=6_500_000)
+    assert series.window(last_ms=10).sum == 15
+    assert series._footprint()[0] == 6
+    assert series.sum == 15
+    assert series._footprint()[0] == 3
+
+
+def test_window__resolution():
+    series = _Series(resolution=2)
+    series.incr_many([1, 2, 3, 4], [0, 1_000_000, 2_000_000, 3_000_000])
+    series.decr(1, timestamp=4_000_000)
+
+    window = series.between(2_000_000)
+    assert window.sum == 6
+    assert window.len() == 3
+    assert window.min() == -1
+    assert window.max() == 4
+    assert series.between(0, 4_000_000).len() == 4
+
+
+def test_window__buffered():
+    series = _Series(buffer_size=10)
+    series.incr(5, timestamp=1_000_000)
+
+    assert series.between(0).sum == 5